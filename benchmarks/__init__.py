@@ -0,0 +1,6 @@
+from benchmarks.workloads import BenchmarkWorkload, GRIDS, build_grid
+from benchmarks.calibration import calibrate
+from benchmarks.runner import BenchmarkRunner
+from benchmarks.compare import BenchmarkDelta, BenchmarkComparison
+
+__all__ = ["BenchmarkWorkload", "GRIDS", "build_grid", "calibrate", "BenchmarkRunner", "BenchmarkDelta", "BenchmarkComparison"]
@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from benchmarks.compare import BenchmarkComparison
+from benchmarks.runner import BenchmarkRunner
+from benchmarks.workloads import GRIDS, BenchmarkWorkload, build_grid
+
+
+def _int_list(value: str) -> List[int]:
+    try:
+        return [int(v) for v in value.split(",") if v.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"ожидается список целых через запятую: {value!r}")
+
+
+def _parse_args(argv: Sequence[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Замеры GroupBuilder.build / AHP.solve / Validator.validate / AemCom.run_full / save_result_json",
+    )
+    parser.add_argument("--grid", choices=sorted(GRIDS), help="Готовая сетка n / K / criteria (по умолчанию smoke)")
+    parser.add_argument("--n", type=_int_list, help="Свои значения n через запятую (вместо оси сетки)")
+    parser.add_argument("--experts", type=_int_list, help="Свои значения K через запятую")
+    parser.add_argument("--criteria", type=_int_list, help="Свои значения числа критериев через запятую")
+    parser.add_argument("--cartesian", action="store_true", help="Все сочетания осей вместо звезды вокруг базовой точки")
+    parser.add_argument("--repeat", type=int, default=5, help="Число замеров на задачу")
+    parser.add_argument("--warmup", type=int, default=1, help="Число прогонов без замера перед замерами")
+    parser.add_argument("--seed", type=int, default=42, help="Seed генератора задач")
+    parser.add_argument("--max-iterations", dest="max_iterations", type=int, default=100, help="max_iterations AEM-COM")
+    parser.add_argument("--memory", action="store_true", help="Дополнительный прогон под tracemalloc: peak_bytes по фазам")
+    parser.add_argument("-o", "--output", metavar="PATH", help="Куда записать JSON (по умолчанию stdout)")
+    parser.add_argument(
+        "--baseline",
+        metavar="PATH",
+        help="Сравнить с сохранённым отчётом; код выхода 1 при регрессии. Без --grid/--n/... задачи берутся из baseline",
+    )
+    parser.add_argument("--current", metavar="PATH", help="С --baseline: сравнить готовый отчёт, без замеров")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Допустимый рост времени (0.25 = +25%%)")
+    parser.add_argument("--memory-threshold", dest="memory_threshold", type=float, default=0.25, help="Допустимый рост peak_bytes")
+    parser.add_argument(
+        "--statistic",
+        choices=BenchmarkComparison.STATISTICS,
+        default="min",
+        help="Какая статистика замеров фазы сравнивается с baseline (по умолчанию min)",
+    )
+    parser.add_argument(
+        "--min-seconds",
+        dest="min_seconds",
+        type=float,
+        default=0.02,
+        help="Порог шума: метрики времени короче (в обоих отчётах) не проверяются",
+    )
+    parser.add_argument("--update-baseline", dest="update_baseline", action="store_true", help="Записать результат в файл --baseline")
+    return parser.parse_args(list(argv))
+
+
+def _load(path: str) -> Dict[str, Any]:
+    with Path(path).open("r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _save(path: str, report: Dict[str, Any]) -> None:
+    out = Path(path)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    with out.open("w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+        f.write("\n")
+    print(f"Результат замеров: {out}", file=sys.stderr)
+
+
+def _workloads_from_report(report: Dict[str, Any]) -> List[BenchmarkWorkload]:
+    return [
+        BenchmarkWorkload(
+            n=int(w["n"]),
+            experts=int(w["experts"]),
+            criteria=int(w["criteria"]),
+            seed=int(w["seed"]),
+            max_iterations=int(w["max_iterations"]),
+        )
+        for w in report.get("workloads", [])
+    ]
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = _parse_args(sys.argv[1:] if argv is None else argv)
+
+    baseline = _load(args.baseline) if args.baseline and Path(args.baseline).exists() else None
+    if args.current and baseline is None:
+        print("Ошибка: --current сравнивается только с существующим --baseline", file=sys.stderr)
+        return 2
+
+    if args.current:
+        report = _load(args.current)
+    else:
+        custom_axes = args.grid or args.n or args.experts or args.criteria
+        if baseline is not None and not custom_axes:
+            # повторяем условия baseline: те же задачи, повторы и учёт памяти
+            meta = baseline.get("benchmark", {})
+            grid = str(meta.get("grid", "baseline"))
+            workloads = _workloads_from_report(baseline)
+            repeat = int(meta.get("repeat", args.repeat))
+            warmup = int(meta.get("warmup", args.warmup))
+            memory = args.memory or any("memory" in w for w in baseline.get("workloads", []))
+        else:
+            grid = args.grid or "smoke"
+            axes = GRIDS[grid]
+            workloads = build_grid(
+                args.n or axes["n"],
+                args.experts or axes["experts"],
+                args.criteria or axes["criteria"],
+                cartesian=args.cartesian,
+                seed=args.seed,
+                max_iterations=args.max_iterations,
+            )
+            repeat, warmup, memory = args.repeat, args.warmup, args.memory
+
+        runner = BenchmarkRunner(repeat=repeat, warmup=warmup, memory=memory, progress=sys.stderr.write)
+        report = runner.run(workloads, grid=grid)
+
+        if args.output:
+            _save(args.output, report)
+        elif not args.baseline:
+            json.dump(report, sys.stdout, ensure_ascii=False, indent=2)
+            sys.stdout.write("\n")
+
+    if not args.baseline:
+        return 0
+
+    if args.update_baseline or baseline is None:
+        _save(args.baseline, report)
+        return 0
+
+    comparison = BenchmarkComparison(
+        time_threshold=args.threshold,
+        memory_threshold=args.memory_threshold,
+        min_seconds=args.min_seconds,
+        statistic=args.statistic,
+    ).compare(baseline, report)
+    print(comparison.format(), file=sys.stderr)
+    return 0 if comparison.ok else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import math
+import time
+
+
+def _workload(size: int = 60, rounds: int = 20) -> float:
+    # нарочно без кода проекта: иначе регрессия в Math / GcompiCalculator "съедалась" бы калибровкой.
+    # Смесь того же рода, что в расчёте: вложенные циклы по спискам списков, log/exp, dict, sort
+    a = [[math.exp(((i * 7 + j * 13) % 17 - 8) / 8.0) for j in range(size)] for i in range(size)]
+    acc = 0.0
+    for _ in range(rounds):
+        logs = [[math.log(x) for x in row] for row in a]
+        means = [sum(row) / size for row in logs]
+        cache = {}
+        for i in range(size):
+            row = logs[i]
+            mi = means[i]
+            for j in range(i + 1, size):
+                d = row[j] - mi + means[j]
+                cache[(i, j)] = d * d
+        acc += sum(sorted(cache.values())[: size])
+    return acc
+
+
+def calibrate(repeat: int = 7) -> float:
+    """
+    Минимальное время (секунды) фиксированной микро-задачи на чистом Python: минимум
+    устойчивее медианы к соседним процессам. Отношение калибровок двух машин - множитель
+    для сравнения их замеров
+    """
+    if repeat < 1:
+        raise ValueError("repeat must be >= 1")
+
+    _workload()
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        _workload()
+        samples.append(time.perf_counter() - t0)
+    return min(samples)
@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+
+@dataclass
+class BenchmarkDelta:
+    """
+    Одна метрика отчёта в сравнении с baseline.
+    Для времени baseline уже пересчитан на текущую машину (множитель калибровки)
+    """
+
+    workload: str
+    metric: str
+    kind: str  # "time" (секунды) или "memory" (байты)
+    baseline: float
+    current: float
+    ratio: float
+    regression: bool
+
+
+class BenchmarkComparison:
+    """
+    Сравнение отчёта python -m benchmarks с сохранённым baseline.
+
+    Время: статистика фазы statistic (по умолчанию min - лучший из замеров: помехи машины
+    только добавляют время, поэтому минимум устойчивее медианы) и их сумма (total); baseline
+    умножается на calibration_current / calibration_baseline (калибровки задачи, если они есть
+    в обоих отчётах, иначе общие). Память: peak_bytes фаз (если оба отчёта сняты с --memory),
+    без калибровки. Регрессия - ratio выше 1 + threshold, при этом метрики меньше порога
+    шума (min_seconds / min_bytes в обоих отчётах) не проверяются: фазы в единицы миллисекунд
+    на общей машине колеблются в полтора-два раза
+    """
+
+    STATISTICS = ("min", "median")
+
+    def __init__(
+        self,
+        time_threshold: float = 0.25,
+        memory_threshold: float = 0.25,
+        min_seconds: float = 0.02,
+        min_bytes: int = 64 * 1024,
+        statistic: str = "min",
+    ) -> None:
+        if time_threshold < 0 or memory_threshold < 0:
+            raise ValueError("threshold must be >= 0")
+        if statistic not in self.STATISTICS:
+            raise ValueError(f"statistic must be one of {self.STATISTICS}")
+        self._statistic = statistic
+        self._time_threshold = time_threshold
+        self._memory_threshold = memory_threshold
+        self._min_seconds = min_seconds
+        self._min_bytes = min_bytes
+
+        self.deltas: List[BenchmarkDelta] = []
+        self.notes: List[str] = []
+        self.scale = 1.0
+
+    @property
+    def regressions(self) -> List[BenchmarkDelta]:
+        return [d for d in self.deltas if d.regression]
+
+    @property
+    def ok(self) -> bool:
+        return not self.regressions
+
+    def compare(self, baseline: Dict[str, Any], current: Dict[str, Any]) -> "BenchmarkComparison":
+        self.deltas = []
+        self.notes = []
+
+        base_cal = baseline.get("benchmark", {}).get("calibration")
+        cur_cal = current.get("benchmark", {}).get("calibration")
+        if base_cal and cur_cal:
+            self.scale = float(cur_cal) / float(base_cal)
+        else:
+            self.scale = 1.0
+            self.notes.append("нет calibration в одном из отчётов: время сравнивается без нормировки")
+
+        base_rows = {self._key(w): w for w in baseline.get("workloads", [])}
+        for cur in current.get("workloads", []):
+            key = self._key(cur)
+            base = base_rows.pop(key, None)
+            if base is None:
+                self.notes.append(f"{cur.get('name')}: нет в baseline")
+                continue
+            self._compare_workload(base, cur)
+
+        for base in base_rows.values():
+            self.notes.append(f"{base.get('name')}: нет в текущем отчёте")
+
+        return self
+
+    @staticmethod
+    def _key(row: Dict[str, Any]) -> Tuple:
+        return row.get("name"), row.get("seed"), row.get("max_iterations")
+
+    def _compare_workload(self, base: Dict[str, Any], cur: Dict[str, Any]) -> None:
+        name = str(cur.get("name"))
+
+        if base.get("check") != cur.get("check"):
+            self.notes.append(f"{name}: результат расчёта отличается от baseline ({base.get('check')} -> {cur.get('check')})")
+
+        scale = self.scale
+        if base.get("calibration") and cur.get("calibration"):
+            scale = float(cur["calibration"]) / float(base["calibration"])
+
+        base_phases = base.get("phases", {})
+        cur_phases = cur.get("phases", {})
+        base_total = 0.0
+        cur_total = 0.0
+        for phase, cur_stats in cur_phases.items():
+            base_stats = base_phases.get(phase)
+            if base_stats is None:
+                continue
+            b = float(base_stats[self._statistic]) * scale
+            c = float(cur_stats[self._statistic])
+            base_total += b
+            cur_total += c
+            self._add(name, phase, "time", b, c)
+        self._add(name, "total", "time", base_total, cur_total)
+
+        base_memory = base.get("memory")
+        cur_memory = cur.get("memory")
+        if base_memory and cur_memory:
+            for phase, c in cur_memory.items():
+                if phase in base_memory:
+                    self._add(name, phase, "memory", float(base_memory[phase]), float(c))
+
+    def _add(self, workload: str, metric: str, kind: str, baseline: float, current: float) -> None:
+        if kind == "time":
+            floor, threshold = self._min_seconds, self._time_threshold
+        else:
+            floor, threshold = self._min_bytes, self._memory_threshold
+
+        if baseline < floor and current < floor:
+            return
+
+        ratio = current / baseline if baseline > 0 else float("inf")
+        self.deltas.append(BenchmarkDelta(
+            workload=workload,
+            metric=metric,
+            kind=kind,
+            baseline=baseline,
+            current=current,
+            ratio=ratio,
+            regression=ratio > 1.0 + threshold,
+        ))
+
+    def format(self, only_regressions: bool = False) -> str:
+        rows = self.regressions if only_regressions else self.deltas
+        lines = [
+            f"калибровка: x{self.scale:.3f} (время baseline пересчитано на эту машину), "
+            f"сравнивается {self._statistic} замеров"
+        ]
+
+        if rows:
+            header = ("workload", "metric", "baseline", "current", "ratio", "")
+            table = [header] + [
+                (
+                    d.workload,
+                    f"{d.metric} {d.kind}",
+                    self._fmt(d.baseline, d.kind),
+                    self._fmt(d.current, d.kind),
+                    f"{d.ratio:.2f}x",
+                    "REGRESSION" if d.regression else "",
+                )
+                for d in rows
+            ]
+            widths = [max(len(r[i]) for r in table) for i in range(len(header))]
+            for r in table:
+                lines.append("  ".join(cell.ljust(widths[i]) for i, cell in enumerate(r)).rstrip())
+
+        lines.extend(f"примечание: {note}" for note in self.notes)
+
+        regressions = self.regressions
+        if regressions:
+            lines.append(f"РЕГРЕССИЙ: {len(regressions)} из {len(self.deltas)} метрик")
+        else:
+            lines.append(f"регрессий нет ({len(self.deltas)} метрик выше порога шума)")
+        return "\n".join(lines)
+
+    @staticmethod
+    def _fmt(value: Optional[float], kind: str) -> str:
+        if value is None:
+            return "-"
+        if kind == "memory":
+            return f"{value / 1024:.1f} KiB"
+        if value < 1.0:
+            return f"{value * 1000:.2f} ms"
+        return f"{value:.3f} s"
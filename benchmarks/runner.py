@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import contextlib
+import gc
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from modules import Context, AHP, AemCom, MemoryTracker
+from modules.group_builder import GroupBuilder
+from utils import Validator
+
+from benchmarks.calibration import calibrate
+from benchmarks.workloads import BenchmarkWorkload
+
+
+class BenchmarkRunner:
+    """
+    Замеры фаз конвейера на наборе BenchmarkWorkload: GroupBuilder.build, AHP.solve,
+    Validator.validate, AemCom.run_full, Context.save_result_json - каждая отдельно.
+
+    Каждый повтор начинается с нового контекста из того же словаря задачи, так что фазы
+    не видят результатов прошлого повтора. Время - секунды (perf_counter), по фазе
+    сохраняются все замеры, медиана и разброс.
+
+    memory=True - ещё один прогон под MemoryTracker (его время не учитывается: tracemalloc
+    замедляет расчёт в разы), в memory пишется peak_bytes по фазам. В шапке отчёта -
+    calibration: время микро-задачи calibrate() на этой машине для сравнения с baseline
+    (у каждой задачи своя калибровка, снятая непосредственно перед её замерами)
+    """
+
+    PHASE_BUILD = "build"
+    PHASE_AHP_SOLVE = "ahp_solve"
+    PHASE_VALIDATE = "validate"
+    PHASE_AEM_COM = "aem_com"
+    PHASE_SAVE = "save_result_json"
+
+    PHASES = (PHASE_BUILD, PHASE_AHP_SOLVE, PHASE_VALIDATE, PHASE_AEM_COM, PHASE_SAVE)
+
+    def __init__(
+        self,
+        repeat: int = 5,
+        warmup: int = 1,
+        memory: bool = False,
+        progress: Optional[Callable[[str], object]] = None,
+    ) -> None:
+        if repeat < 1:
+            raise ValueError("repeat must be >= 1")
+        if warmup < 0:
+            raise ValueError("warmup must be >= 0")
+        self._repeat = repeat
+        self._warmup = warmup
+        self._memory = memory
+        self._progress = progress
+
+    def run(self, workloads: Sequence[BenchmarkWorkload], grid: str = "custom") -> Dict[str, Any]:
+        results = []
+        for workload in workloads:
+            if self._progress is not None:
+                self._progress(f"{workload.name}: ")
+            results.append(self.run_workload(workload))
+            if self._progress is not None:
+                median = sum(p["median"] for p in results[-1]["phases"].values())
+                self._progress(f"{median:.4f} s\n")
+        calibrations = [row["calibration"] for row in results]
+
+        return {
+            "benchmark": {
+                "grid": grid,
+                "repeat": self._repeat,
+                "warmup": self._warmup,
+                "unit": "s",
+                "calibration": statistics.median(calibrations) if calibrations else calibrate(),
+                "python": sys.version.split()[0],
+                "implementation": platform.python_implementation(),
+                "platform": platform.platform(),
+                "generated_at": datetime.now().isoformat(timespec="seconds"),
+            },
+            "workloads": results,
+        }
+
+    def run_workload(self, workload: BenchmarkWorkload) -> Dict[str, Any]:
+        data = workload.build_context_data()
+        # калибровка рядом с замерами задачи: скорость машины (частота, соседи) меняется со временем
+        calibration = calibrate()
+        samples: Dict[str, List[float]] = {phase: [] for phase in self.PHASES}
+        check: Dict[str, Any] = {}
+
+        with tempfile.TemporaryDirectory(prefix="aemcom_bench_") as tmp:
+            out_path = str(Path(tmp) / "result.json")
+            for i in range(self._warmup + self._repeat):
+                timings, check = self._run_once(data, out_path)
+                if i < self._warmup:
+                    continue
+                for phase, seconds in timings.items():
+                    samples[phase].append(seconds)
+
+            memory: Optional[Dict[str, int]] = None
+            if self._memory:
+                tracker = MemoryTracker().start()
+                try:
+                    self._run_once(data, out_path, tracker)
+                finally:
+                    tracker.stop()
+                memory = {p["phase"]: p["peak_bytes"] for p in tracker.report()["phases"]}
+
+        row = {
+            "name": workload.name,
+            "n": workload.n,
+            "experts": workload.experts,
+            "criteria": workload.criteria,
+            "seed": workload.seed,
+            "max_iterations": workload.max_iterations,
+            "calibration": calibration,
+            "phases": {phase: self._summary(values) for phase, values in samples.items()},
+            "check": check,
+        }
+        if memory is not None:
+            row["memory"] = memory
+        return row
+
+    def _run_once(self, data: Dict[str, Any], out_path: str, tracker: Optional[MemoryTracker] = None):
+        timings: Dict[str, float] = {}
+
+        def phase(name: str):
+            return tracker.phase(name) if tracker is not None else contextlib.nullcontext()
+
+        # сборщик мусора выключается на время фаз, чтобы паузы GC не попадали в случайную фазу
+        gc.collect()
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            t0 = time.perf_counter()
+            with phase(self.PHASE_BUILD):
+                group_model = GroupBuilder(data).build()
+            timings[self.PHASE_BUILD] = time.perf_counter() - t0
+
+            context = Context(group_model=group_model, result_save_path=out_path)
+
+            t0 = time.perf_counter()
+            with phase(self.PHASE_AHP_SOLVE):
+                AHP(context).solve()
+            timings[self.PHASE_AHP_SOLVE] = time.perf_counter() - t0
+
+            t0 = time.perf_counter()
+            with phase(self.PHASE_VALIDATE):
+                Validator(context).validate(strict=True)
+            timings[self.PHASE_VALIDATE] = time.perf_counter() - t0
+
+            t0 = time.perf_counter()
+            with phase(self.PHASE_AEM_COM):
+                global_result = AemCom(context).run_full()
+            timings[self.PHASE_AEM_COM] = time.perf_counter() - t0
+
+            t0 = time.perf_counter()
+            with phase(self.PHASE_SAVE):
+                context.save_result_json()
+            timings[self.PHASE_SAVE] = time.perf_counter() - t0
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+
+        runs = []
+        if global_result.criteria_result is not None:
+            runs.append(global_result.criteria_result.run)
+        runs.extend(r.run for r in global_result.alternatives_results.values())
+
+        check = {
+            "levels": global_result.levels_count,
+            "iterations": global_result.total_iterations,
+            "gcompi_final_total": sum(float(run.gcompi_final) for run in runs),
+        }
+        return timings, check
+
+    @staticmethod
+    def _summary(values: List[float]) -> Dict[str, Any]:
+        ordered = sorted(values)
+        median = statistics.median(ordered)
+        if len(ordered) >= 2:
+            q1, _, q3 = statistics.quantiles(ordered, n=4, method="inclusive")
+            stdev = statistics.stdev(ordered)
+        else:
+            q1 = q3 = ordered[0]
+            stdev = 0.0
+
+        return {
+            "median": median,
+            "min": ordered[0],
+            "max": ordered[-1],
+            "iqr": q3 - q1,
+            "stdev": stdev,
+            "mad": statistics.median(abs(v - median) for v in ordered),
+            "samples": values,
+        }
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import itertools
+from dataclasses import dataclass
+from typing import Any, Dict, List, Sequence
+
+from modules import ContextGenerator
+
+
+@dataclass(frozen=True)
+class BenchmarkWorkload:
+    """
+    Синтетическая задача для замеров: n альтернатив, K экспертов, criteria критериев.
+    Контекст строится ContextGenerator с фиксированным seed, поэтому одинаков между запусками
+    """
+
+    n: int
+    experts: int
+    criteria: int
+    seed: int = 42
+    max_iterations: int = 100
+
+    @property
+    def name(self) -> str:
+        return f"n{self.n}_k{self.experts}_c{self.criteria}"
+
+    def build_context_data(self) -> Dict[str, Any]:
+        # sigma-шум вместо target_cr: подбор CR степенным методом на n=500 дороже самого расчёта;
+        # P0 - матрица первого эксперта (от AIJ AEM-COM почти сразу останавливается)
+        gen = (
+            ContextGenerator()
+            .set_seed(self.seed)
+            .set_sizes(n_experts=self.experts, n_criteria=self.criteria, n_alternatives=self.n)
+            .set_weights_mode(ContextGenerator.WEIGHTS_RANDOM)
+            .set_matrix_generation(ContextGenerator.MATRIX_INCONSISTENT_SIGMA, sigma=0.25, round_digits=3)
+            .set_collective_mode(ContextGenerator.COLLECTIVE_NONE)
+            .set_aem_settings(
+                p=0.25,
+                strict_decrease=True,
+                max_iterations=self.max_iterations,
+                initial_mode="first_expert",
+                apply_to=["criteria", "alternatives_by_criterion"],
+            )
+        )
+        return gen.build()
+
+
+# базовая точка сетки: остальные оси меняются по одной относительно неё
+BASE_N = 5
+BASE_EXPERTS = 3
+BASE_CRITERIA = 3
+
+GRIDS: Dict[str, Dict[str, List[int]]] = {
+    "smoke": {"n": [3, 5, 25], "experts": [1, 3], "criteria": [1, 3]},
+    "default": {"n": [3, 5, 10, 25, 50], "experts": [1, 3, 10, 100], "criteria": [1, 3, 10, 50]},
+    "full": {
+        "n": [3, 5, 10, 25, 50, 100, 200, 500],
+        "experts": [1, 3, 10, 100, 1000, 10000],
+        "criteria": [1, 3, 10, 50, 100, 200],
+    },
+}
+
+
+def build_grid(
+    n: Sequence[int],
+    experts: Sequence[int],
+    criteria: Sequence[int],
+    *,
+    cartesian: bool = False,
+    seed: int = 42,
+    max_iterations: int = 100,
+) -> List[BenchmarkWorkload]:
+    """
+    Список задач по осям n / K / criteria.
+
+    cartesian=False - "звезда": каждая ось проходится при базовых значениях остальных
+    (полное произведение осей "full" - это тысячи задач и n=500 при K=10000);
+    cartesian=True - все сочетания
+    """
+    if cartesian:
+        points = list(itertools.product(n, experts, criteria))
+    else:
+        points = [(BASE_N, BASE_EXPERTS, BASE_CRITERIA)]
+        points += [(v, BASE_EXPERTS, BASE_CRITERIA) for v in n]
+        points += [(BASE_N, v, BASE_CRITERIA) for v in experts]
+        points += [(BASE_N, BASE_EXPERTS, v) for v in criteria]
+
+    out: List[BenchmarkWorkload] = []
+    seen = set()
+    for point in points:
+        if point in seen:
+            continue
+        seen.add(point)
+        n_value, k_value, c_value = point
+        if n_value < 2:
+            raise ValueError("n must be >= 2")
+        out.append(
+            BenchmarkWorkload(
+                n=n_value,
+                experts=k_value,
+                criteria=c_value,
+                seed=seed,
+                max_iterations=max_iterations,
+            )
+        )
+    return out
@@ -1,17 +1,38 @@
 from __future__ import annotations
 
+import contextlib
 from typing import Optional
 
-from modules import Context, AHP, AemCom
-from utils import Validator
+from modules import Context, AHP, AemCom, MemoryTracker, ComputeBackend
+from utils import Validator, RunProfiler
 from console.utils import MatrixPrinter
 
 import os
 
 class MainMenu:
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        profiler: Optional[RunProfiler] = None,
+        memory_tracker: Optional[MemoryTracker] = None,
+        backend: Optional[ComputeBackend] = None,
+    ) -> None:
         self._context: Optional[Context] = None
         self._matrix_printer = MatrixPrinter(float_format=".4f", padding=1)
+        self._profiler = profiler
+        self._memory_tracker = memory_tracker
+        self._backend = backend
+
+    def _span(self, name: str):
+        """Интервал фазы для --profile (без профилировщика - пустой контекст)"""
+        if self._profiler is None:
+            return contextlib.nullcontext()
+        return self._profiler.span(name)
+
+    def _memory(self, name: str):
+        """Фаза учёта памяти для --memory (без трекера - пустой контекст)"""
+        if self._memory_tracker is None:
+            return contextlib.nullcontext()
+        return self._memory_tracker.phase(name)
 
     @staticmethod
     def _safe_input(prompt: str) -> Optional[str]:
@@ -82,7 +103,10 @@ class MainMenu:
 
     def load_context_from_file(self, path: str, *, output_path: Optional[str], wait_after: bool = False) -> bool:
         try:
-            context = Context.from_json_file(path, result_save_path=output_path)
+            with self._span("load"):
+                context = Context.from_json_file(
+                    path, result_save_path=output_path, memory_tracker=self._memory_tracker
+                )
         except Exception as e:
             print(f"Ошибка при загрузке контекста: {e}")
             if wait_after:
@@ -120,7 +144,8 @@ class MainMenu:
 
         print("\n=== AHP: валидация модели ===")
         validator = Validator(context)
-        percent_ok = validator.validate(strict=True)
+        with self._span("validate"), self._memory("validate"):
+            percent_ok = validator.validate(strict=True)
         print(f"Процент корректности (strict): {percent_ok}%")
 
         errors = validator.get_errors()
@@ -132,9 +157,10 @@ class MainMenu:
             print("Ошибок валидации не обнаружено.")
 
         print("\n=== AHP: расчёт ===")
-        ahp = AHP(context)
+        ahp = AHP(context, backend=self._backend)
         try:
-            result = ahp.solve()
+            with self._span("ahp_solve"), self._memory("solve"):
+                result = ahp.solve()
         except Exception as e:
             print(f"Ошибка при расчёте AHP: {e}")
             self._wait_for_enter()
@@ -205,10 +231,13 @@ class MainMenu:
         assert context is not None
 
         print("\n=== AEM-COM: запуск ===")
-        aem = AemCom(context)
+        aem = AemCom(context, backend=self._backend)
+        if self._profiler is not None:
+            aem.add_observer(self._profiler.level_observer())
 
         try:
-            global_result = aem.run_full()
+            with self._span("aem_com"), self._memory("solve"):
+                global_result = aem.run_full()
         except Exception as e:
             print(f"Ошибка при расчёте AEM-COM: {e}")
             self._wait_for_enter()
@@ -324,7 +353,8 @@ class MainMenu:
 
         if context.result_save_path:
             try:
-                saved_to = context.save_result_json()
+                with self._span("write"):
+                    saved_to = context.save_result_json()
                 print(f"\nРезультат сохранён в: {saved_to}")
             except Exception as e:
                 print(f"\nОшибка авто-сохранения результата: {e}")
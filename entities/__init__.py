@@ -6,17 +6,25 @@ from entities.model import Model
 from entities.aem_com_settings import AemComSettings
 from entities.settings import Settings
 from entities.matrix import PairwiseMatrix
+from entities.reciprocal_matrix import ReciprocalMatrix
+from entities.saaty_matrix import SaatyMatrix
 from entities.matrices import PairwiseMatrices
 from entities.group_model import GroupAhpModel
 from entities.ahp_result import AhpResult
 from entities.aem_com.iteration_record import AemComIterationRecord
 
 from .aem_com import (
+    AemComCheckpoint,
     AemComIterationRecord,
+    AemComPerformance,
+    AemComProblem,
     AemComRunResult,
     CriteriaLevelAemComResult,
     AlternativeLevelAemComResult,
     AemComGlobalResult,
+    ExpertCompatibility,
+    ExpertInfluenceRecord,
+    LevelInfluenceResult,
 )
 
 __all__ = [
@@ -28,13 +36,21 @@ __all__ = [
     "AemComSettings",
     "Settings",
     "PairwiseMatrix",
+    "ReciprocalMatrix",
+    "SaatyMatrix",
     "PairwiseMatrices",
     "GroupAhpModel",
     "AhpResult",
 
+    "AemComCheckpoint",
     "AemComIterationRecord",
+    "AemComPerformance",
+    "AemComProblem",
     "AemComRunResult",
     "CriteriaLevelAemComResult",
     "AlternativeLevelAemComResult",
     "AemComGlobalResult",
+    "ExpertCompatibility",
+    "ExpertInfluenceRecord",
+    "LevelInfluenceResult",
 ]
@@ -1,13 +1,25 @@
 from entities.aem_com.alternative_result import AlternativeLevelAemComResult
+from entities.aem_com.checkpoint import AemComCheckpoint
 from entities.aem_com.criteria_result import CriteriaLevelAemComResult
+from entities.aem_com.expert_compatibility import ExpertCompatibility
+from entities.aem_com.expert_influence import ExpertInfluenceRecord
 from entities.aem_com.global_result import AemComGlobalResult
 from entities.aem_com.iteration_record import AemComIterationRecord
+from entities.aem_com.level_influence import LevelInfluenceResult
+from entities.aem_com.performance import AemComPerformance
+from entities.aem_com.problem import AemComProblem
 from entities.aem_com.run_result import AemComRunResult
 
 __all__ = [
     "AlternativeLevelAemComResult",
     "CriteriaLevelAemComResult",
     "AemComGlobalResult",
+    "AemComCheckpoint",
     "AemComIterationRecord",
+    "AemComPerformance",
+    "AemComProblem",
     "AemComRunResult",
+    "ExpertCompatibility",
+    "ExpertInfluenceRecord",
+    "LevelInfluenceResult",
 ]
\ No newline at end of file
@@ -4,7 +4,7 @@ from dataclasses import dataclass, field
 from .run_result import AemComRunResult
 
 
-@dataclass
+@dataclass(slots=True)
 class AlternativeLevelAemComResult:
     """
     Результат AEM-COM на уровне альтернатив для одного критерия
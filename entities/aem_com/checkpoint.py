@@ -0,0 +1,11 @@
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import List
+
+
+@dataclass(slots=True, frozen=True)
+class AemComCheckpoint:
+    """Полная матрица P сразу после принятой итерации iteration"""
+
+    iteration: int
+    matrix: List[List[float]] = field(default_factory=list)
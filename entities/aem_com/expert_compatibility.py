@@ -0,0 +1,20 @@
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import List
+
+
+@dataclass(slots=True)
+class ExpertCompatibility:
+    """
+    Совместимость экспертов уровня МПС
+
+    expert_ids: порядок экспертов (строки и столбцы matrix)
+    matrix: matrix[k][l] = GCOMPI(A_k, w_l), w_l - вектор приоритетов матрицы эксперта l
+    gcompi_group: GCOMPI(A_k, w_G) для каждого эксперта
+    gcompi_final: GCOMPI(A_k, v') для каждого эксперта (v' - итоговый коллективный вектор)
+    """
+
+    expert_ids: List[str] = field(default_factory=list)
+    matrix: List[List[float]] = field(default_factory=list)
+    gcompi_group: List[float] = field(default_factory=list)
+    gcompi_final: List[float] = field(default_factory=list)
@@ -0,0 +1,29 @@
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from .run_result import AemComRunResult
+
+
+@dataclass(slots=True)
+class ExpertInfluenceRecord:
+    """
+    Влияние одного эксперта на уровень МПС (расчёт без этого эксперта)
+
+    expert_id: исключённый эксперт
+    weight: нормированный вес эксперта на уровне
+    group_priorities: w_G без эксперта
+    gcompi_min: GCOMPI(A без эксперта, w_G без эксперта)
+    gcompi_min_delta: gcompi_min полного семейства минус gcompi_min без эксперта
+        (> 0 - эксперт увеличивает несовместимость)
+    priority_shift: max_i |w_G,i - w_G,i без эксперта|
+    run: результат AEM-COM без эксперта (только если он запрашивался)
+    """
+
+    expert_id: str = ""
+    weight: float = 0.0
+    group_priorities: List[float] = field(default_factory=list)
+    gcompi_min: float = 0.0
+    gcompi_min_delta: float = 0.0
+    priority_shift: float = 0.0
+    run: Optional[AemComRunResult] = None
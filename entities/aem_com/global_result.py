@@ -6,7 +6,7 @@ from .criteria_result import CriteriaLevelAemComResult
 from .alternative_result import AlternativeLevelAemComResult
 
 
-@dataclass
+@dataclass(slots=True)
 class AemComGlobalResult:
     """
     Общий результат AEM-COM по всей модели:
@@ -3,7 +3,7 @@ from dataclasses import dataclass
 from typing import Tuple
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class AemComIterationRecord:
     iteration: int
     pair_indices: Tuple[int, int]
@@ -0,0 +1,26 @@
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from .expert_influence import ExpertInfluenceRecord
+
+
+@dataclass(slots=True)
+class LevelInfluenceResult:
+    """
+    Таблица влияния экспертов для одного уровня МПС
+
+    level: "criteria" или "alternatives"
+    criterion_id: критерий для уровня альтернатив (None - уровень критериев)
+    items: порядок альтернатив/критериев
+    group_priorities: w_G полного семейства
+    gcompi_min: GCOMPI(A, w_G) полного семейства
+    experts: записи по каждому исключённому эксперту
+    """
+
+    level: str = ""
+    criterion_id: Optional[str] = None
+    items: List[str] = field(default_factory=list)
+    group_priorities: List[float] = field(default_factory=list)
+    gcompi_min: float = 0.0
+    experts: List[ExpertInfluenceRecord] = field(default_factory=list)
@@ -0,0 +1,35 @@
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import Dict
+
+
+@dataclass(slots=True)
+class AemComPerformance:
+    """
+    Замеры одного уровня AEM-COM (settings.aem_com.performance)
+
+    timings: секунды по фазам (см. PHASE_*)
+    counters: количество вызовов и шагов (см. COUNTER_*)
+    """
+
+    PHASE_TOTAL = "total"
+    PHASE_FAMILY_EXTRACTION = "family_extraction"
+    PHASE_AIJ_BUILD = "aij_build"
+    PHASE_PRIORITIES = "priorities"
+    PHASE_GCOMPI = "gcompi"
+    PHASE_PAIR_SELECTION = "pair_selection"
+
+    COUNTER_PRIORITIES = "priority_computations"
+    COUNTER_GCOMPI = "gcompi_evaluations"
+    COUNTER_PAIR_SELECTIONS = "pair_selections"
+    COUNTER_ACCEPTED = "accepted_steps"
+    COUNTER_REJECTED = "rejected_steps"
+
+    timings: Dict[str, float] = field(default_factory=dict)
+    counters: Dict[str, int] = field(default_factory=dict)
+
+    def add_time(self, phase: str, seconds: float) -> None:
+        self.timings[phase] = self.timings.get(phase, 0.0) + seconds
+
+    def count(self, counter: str, k: int = 1) -> None:
+        self.counters[counter] = self.counters.get(counter, 0) + k
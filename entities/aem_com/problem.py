@@ -0,0 +1,30 @@
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from .performance import AemComPerformance
+
+
+@dataclass(slots=True)
+class AemComProblem:
+    """
+    Входные данные AEM-COM для одного уровня МПС
+
+    items: порядок альтернатив/критериев
+    family_matrices: матрицы экспертов A_k
+    expert_weights: веса экспертов alpha_k (в порядке family_matrices)
+    initial_matrix: начальная коллективная P0
+    criterion_id: критерий для уровня альтернатив (None - уровень критериев)
+    expert_ids: эксперты в порядке family_matrices
+    performance: замеры подготовки уровня (только при settings.aem_com.performance)
+    family_hash: хэш семейства, если уже посчитан (AemComPool - в основном процессе)
+    """
+
+    items: List[str] = field(default_factory=list)
+    family_matrices: List[List[List[float]]] = field(default_factory=list)
+    expert_weights: List[float] = field(default_factory=list)
+    initial_matrix: List[List[float]] = field(default_factory=list)
+    criterion_id: Optional[str] = None
+    expert_ids: List[str] = field(default_factory=list)
+    performance: Optional[AemComPerformance] = None
+    family_hash: str = ""
@@ -1,11 +1,14 @@
 from __future__ import annotations
 from dataclasses import dataclass, field
-from typing import List
+from typing import List, Optional, Tuple
 
+from .checkpoint import AemComCheckpoint
+from .expert_compatibility import ExpertCompatibility
 from .iteration_record import AemComIterationRecord
+from .performance import AemComPerformance
 
 
-@dataclass
+@dataclass(slots=True)
 class AemComRunResult:
     """
     Результат работы AEM-COM для одного уровня МПС
@@ -21,8 +24,28 @@ class AemComRunResult:
     gcompi_min: GCOMPI(A, w_G) — теоретический минимум в этом контексте
     iterations: фактическое количество итераций
     history: список записей по итерациям
+    termination_reason: причина остановки (см. AemComRunResult.TERMINATION_*)
+    compatibility: совместимость экспертов (только при settings.aem_com.expert_compatibility)
+    checkpoints: полные P каждые settings.aem_com.checkpoint_every итераций (для matrix_at)
+    reciprocal_fixes: (после итерации, r, s) - отклонённые пары, приведённые к взаимно
+        обратному виду без записи в history (strict_decrease)
+    rejected_pairs: (r, s), r < s - пары, выбывшие из J без принятого шага (strict_decrease);
+        вместе с парами history - отработанные пары, которые продолжение расчёта не выбирает
+    performance: замеры фаз и счётчики (только при settings.aem_com.performance)
+    family_hash: хэш семейства (items, матрицы, веса) - для продолжения расчёта (initial_mode="from_result")
+    backend: вычислительный бэкенд уровня (pure, numpy, ...; при --backend auto - выбранный для n и K)
     """
 
+    TERMINATION_TRIVIAL = "trivial_size"
+    TERMINATION_CONVERGED_INITIAL = "converged_initial"
+    TERMINATION_CONVERGED = "converged"
+    TERMINATION_NO_DEVIATION = "no_deviation"
+    TERMINATION_PAIRS_EXHAUSTED = "pairs_exhausted"
+    TERMINATION_MAX_ITERATIONS = "max_iterations"
+    TERMINATION_STALLED = "stalled"
+    TERMINATION_NO_IMPROVEMENT = "no_improvement"
+    TERMINATION_CANCELLED = "cancelled"
+
     items: List[str] = field(default_factory=list)
 
     initial_matrix: List[List[float]] = field(default_factory=list)
@@ -37,4 +60,65 @@ class AemComRunResult:
     gcompi_min: float = 0.0
 
     iterations: int = 0
-    history: List[AemComIterationRecord] = field(default_factory=list)
\ No newline at end of file
+    history: List[AemComIterationRecord] = field(default_factory=list)
+
+    termination_reason: str = ""
+
+    compatibility: Optional[ExpertCompatibility] = None
+    family_hash: str = ""
+    performance: Optional[AemComPerformance] = None
+    backend: str = ""
+
+    checkpoints: List[AemComCheckpoint] = field(default_factory=list)
+    reciprocal_fixes: List[Tuple[int, int, int]] = field(default_factory=list)
+    rejected_pairs: List[Tuple[int, int]] = field(default_factory=list)
+
+    def matrix_at(self, iteration: int) -> List[List[float]]:
+        """
+        P сразу после записи history с номером iteration (0 - initial_matrix).
+        Восстанавливается от ближайшей предыдущей контрольной точки повтором записей истории
+        """
+        steps = len(self.history)
+        if iteration < 0 or iteration > steps:
+            raise ValueError(f"Итерация {iteration} вне диапазона 0..{steps}.")
+
+        base_iteration = 0
+        base = self.initial_matrix
+        for checkpoint in self.checkpoints:
+            if base_iteration <= checkpoint.iteration <= iteration:
+                base_iteration = checkpoint.iteration
+                base = checkpoint.matrix
+
+        P = [row[:] for row in base]
+        fixes = [f for f in self.reciprocal_fixes if base_iteration <= f[0] < iteration]
+        f_pos = 0
+
+        for record in self.history[base_iteration:iteration]:
+            while f_pos < len(fixes) and fixes[f_pos][0] < record.iteration:
+                _, r, s = fixes[f_pos]
+                P[s][r] = 1.0 / P[r][s]
+                f_pos += 1
+            r, s = record.pair_indices
+            P[r][s] = record.new_value
+            P[s][r] = 1.0 / record.new_value
+
+        return P
+
+    def priorities_at(self, iteration: int) -> List[float]:
+        """Вектор приоритетов (среднее геометрическое строк) для matrix_at(iteration)"""
+        P = self.matrix_at(iteration)
+        n = len(P)
+        if n == 0:
+            return []
+
+        geom_means = []
+        for row in P:
+            product = 1.0
+            for value in row:
+                product *= value
+            geom_means.append(product ** (1.0 / n))
+
+        total = sum(geom_means)
+        if total == 0:
+            return [1.0 / n] * n
+        return [g / total for g in geom_means]
\ No newline at end of file
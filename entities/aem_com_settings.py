@@ -3,7 +3,7 @@ from dataclasses import dataclass, field
 from typing import List
 
 
-@dataclass
+@dataclass(slots=True)
 class AemComSettings:
     permissibility: float = 0.15
     apply_to: List[str] = field(
@@ -11,4 +11,31 @@ class AemComSettings:
     )
     max_iterations: int = 100
     initial_mode: str = "aij"
+    # файл результата для initial_mode="from_result"
+    initial_result_path: str = ""
     strict_decrease: bool = False
+    # правило выбора пары: "max_log_q" (как в статье) или "best_gain"
+    selection: str = "max_log_q"
+
+    # "greedy" - попарный цикл из статьи, "log_solver" - прямая минимизация по ln P
+    engine: str = "greedy"
+    solver_max_passes: int = 100
+    solver_tol: float = 1e-9
+    solver_history: bool = False
+
+    # полная P в результате каждые checkpoint_every итераций (0 - только history)
+    checkpoint_every: int = 0
+
+    # критерии ранней остановки относительно gcompi_min = GCOMPI(A, w_G)
+    gcompi_abs_tol: float = 1e-12
+    gcompi_rel_tol: float = 1e-9
+    # детектор застоя: stall_patience принятых итераций подряд с относительным
+    # улучшением GCOMPI не больше stall_tol (0 - выключен)
+    stall_patience: int = 0
+    stall_tol: float = 0.0
+
+    # матрица совместимости экспертов GCOMPI(A_k, w_l) в результате уровня
+    expert_compatibility: bool = False
+
+    # таймеры фаз и счётчики в результате уровня (блок performance)
+    performance: bool = False
@@ -4,7 +4,7 @@ from dataclasses import dataclass, field
 from typing import Dict
 
 
-@dataclass
+@dataclass(slots=True)
 class AhpResult:
     """
     criteria_weights - веса критериев (глобальные, после агрегации)
@@ -14,6 +14,7 @@ class AhpResult:
     alt_consistency_os_by_criterion - OS для матриц альтернатив по критериям
     alt_consistency_percent_by_criterion - OS в процентах
     global_alt_weights - итоговые веса альтернатив (по всем критериям)
+    criteria_backend / alt_backend_by_criterion - вычислительный бэкенд каждого уровня
     """
     criteria_weights: Dict[str, float] = field(default_factory=dict)
     criteria_consistency_os: float = 0.0
@@ -24,3 +25,6 @@ class AhpResult:
     alt_consistency_percent_by_criterion: Dict[str, float] = field(default_factory=dict)
 
     global_alt_weights: Dict[str, float] = field(default_factory=dict)
+
+    criteria_backend: str = ""
+    alt_backend_by_criterion: Dict[str, str] = field(default_factory=dict)
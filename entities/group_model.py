@@ -9,7 +9,7 @@ from entities.settings import Settings
 from entities.matrices import PairwiseMatrices
 
 
-@dataclass
+@dataclass(slots=True)
 class GroupAhpModel:
     problem: Problem
     experts: List[Expert]
@@ -5,7 +5,7 @@ from typing import List
 from entities.matrix import PairwiseMatrix
 
 
-@dataclass
+@dataclass(slots=True)
 class PairwiseMatrices:
     criteria_level: List[PairwiseMatrix] = field(default_factory=list)
     alternative_level: List[PairwiseMatrix] = field(default_factory=list)
@@ -1,12 +1,14 @@
 from __future__ import annotations
 from dataclasses import dataclass, field
-from typing import List, Optional
+from typing import List, Optional, Union
 
+from entities.reciprocal_matrix import ReciprocalMatrix
 
-@dataclass
+
+@dataclass(slots=True)
 class PairwiseMatrix:
     items: List[str]
-    matrix: List[List[float]]
+    matrix: Union[List[List[float]], ReciprocalMatrix]
     expert_id: Optional[str] = None
     criterion_id: Optional[str] = None
 
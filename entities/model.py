@@ -6,7 +6,7 @@ from entities.criterion import Criterion
 from entities.alternative import Alternative
 
 
-@dataclass
+@dataclass(slots=True)
 class Model:
     criteria: List[Criterion]
     alternatives: List[Alternative]
\ No newline at end of file
@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+from array import array
+from typing import Iterable, Iterator, List, Optional, Sequence, Union
+
+
+class ReciprocalMatrix:
+    """
+    Обратносимметричная МПС n x n, хранится только строгий верхний треугольник:
+    a_ij (i < j) построчно в array('d'), n(n-1)/2 чисел по 8 байт.
+    a_ji = 1 / a_ij и a_ii = 1 синтезируются при чтении.
+
+    matrix[i][j] и len / итерация по строкам работают как у списка списков, поэтому
+    код, принимающий List[List[float]], читает её без изменений; горячие пути
+    (Math, GcompiCalculator, AHP, бэкенд pure) обходят upper напрямую
+    """
+
+    __slots__ = ("n", "upper")
+
+    def __init__(self, n: int, upper: Optional[Iterable[float]] = None) -> None:
+        if n < 0:
+            raise ValueError("Размер матрицы должен быть >= 0.")
+        size = n * (n - 1) // 2
+        self.n = n
+        self.upper = array("d", upper) if upper is not None else array("d", [1.0]) * size
+        if len(self.upper) != size:
+            raise ValueError(f"Верхний треугольник матрицы {n}x{n} должен содержать {size} чисел, получено {len(self.upper)}.")
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[Sequence[float]]) -> "ReciprocalMatrix":
+        """Верхний треугольник квадратной матрицы (нижний треугольник и диагональ не читаются)"""
+        n = len(rows)
+        if any(len(row) != n for row in rows):
+            raise ValueError("Matrix must be square")
+        upper = array("d")
+        for i, row in enumerate(rows):
+            upper.extend(float(v) for v in row[i + 1:])
+        return cls(n, upper)
+
+    @classmethod
+    def from_buffer(cls, n: int, upper: memoryview) -> "ReciprocalMatrix":
+        """Без копирования: upper - memoryview формата 'd' (например, блок общей памяти)"""
+        if len(upper) != n * (n - 1) // 2:
+            raise ValueError(f"Верхний треугольник матрицы {n}x{n} должен содержать {n * (n - 1) // 2} чисел, получено {len(upper)}.")
+        matrix = cls.__new__(cls)
+        matrix.n = n
+        matrix.upper = upper
+        return matrix
+
+    def offset(self, i: int) -> int:
+        """Позиция a_i,i+1 в upper: строка i начинается после i строк длиной n-1, n-2, ..."""
+        return i * (2 * self.n - i - 1) // 2
+
+    def get(self, i: int, j: int) -> float:
+        if i < j:
+            return self.upper[i * (2 * self.n - i - 1) // 2 + j - i - 1]
+        if i > j:
+            return 1.0 / self.upper[j * (2 * self.n - j - 1) // 2 + i - j - 1]
+        return 1.0
+
+    def set(self, i: int, j: int, value: float) -> None:
+        """a_ij = value (и a_ji = 1 / value)"""
+        if i == j:
+            raise ValueError("Диагональ обратносимметричной матрицы равна 1.")
+        if i < j:
+            self.upper[self.offset(i) + j - i - 1] = value
+        else:
+            self.upper[self.offset(j) + i - j - 1] = 1.0 / value
+
+    def row(self, i: int) -> List[float]:
+        """Строка i списком: 1 / a_ji слева, 1 на диагонали, верхний треугольник справа"""
+        n = self.n
+        upper = self.upper
+        out = [1.0 / upper[j * (2 * n - j - 1) // 2 + i - j - 1] for j in range(i)]
+        out.append(1.0)
+        start = self.offset(i)
+        out.extend(upper[start:start + n - i - 1])
+        return out
+
+    def to_list(self) -> List[List[float]]:
+        return [self.row(i) for i in range(self.n)]
+
+    @property
+    def nbytes(self) -> int:
+        return self.upper.itemsize * len(self.upper)
+
+    def __len__(self) -> int:
+        return self.n
+
+    def __getitem__(self, i: int) -> "_ReciprocalRow":
+        if i < 0:
+            i += self.n
+        if not 0 <= i < self.n:
+            raise IndexError("row index out of range")
+        return _ReciprocalRow(self, i)
+
+    def __iter__(self) -> Iterator["_ReciprocalRow"]:
+        return (_ReciprocalRow(self, i) for i in range(self.n))
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, ReciprocalMatrix):
+            return self.n == other.n and self.upper == other.upper
+        if isinstance(other, list):
+            return self.to_list() == other
+        return NotImplemented
+
+    def __copy__(self) -> "ReciprocalMatrix":
+        return ReciprocalMatrix(self.n, self.upper)
+
+    def __deepcopy__(self, memo) -> "ReciprocalMatrix":
+        return ReciprocalMatrix(self.n, self.upper)
+
+    def __array__(self, dtype=None, copy=None):
+        import numpy as np
+
+        n = self.n
+        a = np.ones((n, n), dtype=float)
+        if n > 1:
+            iu = np.triu_indices(n, 1)
+            upper = np.frombuffer(self.upper, dtype=float)
+            a[iu] = upper
+            a[iu[1], iu[0]] = 1.0 / upper
+        return a if dtype is None else a.astype(dtype, copy=False)
+
+    def __repr__(self) -> str:
+        return f"ReciprocalMatrix(n={self.n}, upper={self.upper.tolist()!r})"
+
+
+class _ReciprocalRow:
+    """Строка ReciprocalMatrix без копирования: row[j], row[a:b], len, итерация"""
+
+    __slots__ = ("_matrix", "_i")
+
+    def __init__(self, matrix: ReciprocalMatrix, i: int) -> None:
+        self._matrix = matrix
+        self._i = i
+
+    def __len__(self) -> int:
+        return self._matrix.n
+
+    def __getitem__(self, j: Union[int, slice]):
+        if isinstance(j, slice):
+            return self._matrix.row(self._i)[j]
+        if j < 0:
+            j += self._matrix.n
+        if not 0 <= j < self._matrix.n:
+            raise IndexError("column index out of range")
+        return self._matrix.get(self._i, j)
+
+    def __iter__(self) -> Iterator[float]:
+        return iter(self._matrix.row(self._i))
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (list, _ReciprocalRow)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return repr(self._matrix.row(self._i))
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import math
+from array import array
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+from entities.reciprocal_matrix import ReciprocalMatrix
+
+
+class SaatyMatrix(ReciprocalMatrix):
+    """
+    Обратносимметричная МПС со значениями шкалы Саати: верхний треугольник хранится
+    кодами uint8 в array('B') - 1 байт на пару вместо 8 у ReciprocalMatrix.
+
+    Код c от 0 до 16: VALUES[c] = 1/9, ..., 1/2, 1, 2, ..., 9, обратный элемент - код 16 - c.
+    LOGS / LOG_SQ - ln и ln^2 значений шкалы: GCOMPI, AIJ и агрегация AHP читают их из
+    таблиц вместо math.log. upper декодируется в array('d') по запросу - через него
+    работают пути ReciprocalMatrix без таблиц (векторы приоритетов, lambda_max, numpy)
+    """
+
+    __slots__ = ("codes",)
+
+    SCALE_MAX = 9
+    ONE = 8
+    VALUES: Tuple[float, ...] = tuple(
+        [1.0 / r for r in range(SCALE_MAX, 1, -1)] + [float(r) for r in range(1, SCALE_MAX + 1)]
+    )
+    LOGS: Tuple[float, ...] = tuple(math.log(v) for v in VALUES)
+    LOG_SQ: Tuple[float, ...] = tuple(ln * ln for ln in LOGS)
+
+    # допуск при распознавании значений из JSON: 0.3333333333 - это 1/3, 0.333 - уже нет
+    REL_TOL = 1e-9
+
+    def __init__(self, n: int, codes: Optional[Iterable[int]] = None) -> None:
+        if n < 0:
+            raise ValueError("Размер матрицы должен быть >= 0.")
+        size = n * (n - 1) // 2
+        self.n = n
+        self.codes = array("B", codes) if codes is not None else array("B", [self.ONE]) * size
+        if len(self.codes) != size:
+            raise ValueError(f"Верхний треугольник матрицы {n}x{n} должен содержать {size} кодов, получено {len(self.codes)}.")
+        if self.codes and max(self.codes) >= len(self.VALUES):
+            raise ValueError(f"Код шкалы Саати должен быть от 0 до {len(self.VALUES) - 1}.")
+
+    @classmethod
+    def encode(cls, value: float) -> Optional[int]:
+        """Код значения шкалы Саати или None, если value вне шкалы"""
+        if value <= 0.0:
+            return None
+        r = round(value) if value >= 1.0 else round(1.0 / value)
+        if not 1 <= r <= cls.SCALE_MAX:
+            return None
+        if value >= 1.0:
+            if abs(value - r) > cls.REL_TOL * r:
+                return None
+            return cls.ONE + r - 1
+        if abs(1.0 / value - r) > cls.REL_TOL * r:
+            return None
+        return cls.ONE - r + 1
+
+    @classmethod
+    def try_from_rows(cls, rows: Sequence[Sequence[float]]) -> Optional["SaatyMatrix"]:
+        """Коды верхнего треугольника или None, если хотя бы одно значение вне шкалы"""
+        n = len(rows)
+        if any(len(row) != n for row in rows):
+            raise ValueError("Matrix must be square")
+        codes = array("B")
+        for i, row in enumerate(rows):
+            for value in row[i + 1:]:
+                code = cls.encode(float(value))
+                if code is None:
+                    return None
+                codes.append(code)
+        return cls(n, codes)
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[Sequence[float]]) -> "SaatyMatrix":
+        matrix = cls.try_from_rows(rows)
+        if matrix is None:
+            raise ValueError("Матрица содержит значения вне шкалы Саати 1/9 ... 9.")
+        return matrix
+
+    @classmethod
+    def from_buffer(cls, n: int, codes: memoryview) -> "SaatyMatrix":
+        """Без копирования: codes - memoryview формата 'B'"""
+        if len(codes) != n * (n - 1) // 2:
+            raise ValueError(f"Верхний треугольник матрицы {n}x{n} должен содержать {n * (n - 1) // 2} кодов, получено {len(codes)}.")
+        matrix = cls.__new__(cls)
+        matrix.n = n
+        matrix.codes = codes
+        return matrix
+
+    @property
+    def upper(self) -> array:
+        values = self.VALUES
+        return array("d", [values[c] for c in self.codes])
+
+    def code(self, i: int, j: int) -> int:
+        if i < j:
+            return self.codes[i * (2 * self.n - i - 1) // 2 + j - i - 1]
+        if i > j:
+            return 2 * self.ONE - self.codes[j * (2 * self.n - j - 1) // 2 + i - j - 1]
+        return self.ONE
+
+    def get(self, i: int, j: int) -> float:
+        return self.VALUES[self.code(i, j)]
+
+    def set(self, i: int, j: int, value: float) -> None:
+        """a_ij = value (и a_ji = 1 / value), value - значение шкалы Саати"""
+        if i == j:
+            raise ValueError("Диагональ обратносимметричной матрицы равна 1.")
+        code = self.encode(value)
+        if code is None:
+            raise ValueError(f"Значение {value} вне шкалы Саати 1/9 ... 9.")
+        if i < j:
+            self.codes[self.offset(i) + j - i - 1] = code
+        else:
+            self.codes[self.offset(j) + i - j - 1] = 2 * self.ONE - code
+
+    def row(self, i: int) -> List[float]:
+        return [self.VALUES[self.code(i, j)] for j in range(self.n)]
+
+    @property
+    def nbytes(self) -> int:
+        return self.codes.itemsize * len(self.codes)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, SaatyMatrix):
+            return self.n == other.n and self.codes == other.codes
+        return super().__eq__(other)
+
+    def __copy__(self) -> "SaatyMatrix":
+        return SaatyMatrix(self.n, self.codes)
+
+    def __deepcopy__(self, memo) -> "SaatyMatrix":
+        return SaatyMatrix(self.n, self.codes)
+
+    def __repr__(self) -> str:
+        return f"SaatyMatrix(n={self.n}, codes={self.codes.tolist()!r})"
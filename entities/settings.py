@@ -4,7 +4,10 @@ from dataclasses import dataclass
 from entities.aem_com_settings import AemComSettings
 
 
-@dataclass
+@dataclass(slots=True)
 class Settings:
     ahp_scale: str
-    aem_com: AemComSettings
\ No newline at end of file
+    aem_com: AemComSettings
+    # "lists" - списки списков, "upper_triangle" - матрицы экспертов в ReciprocalMatrix,
+    # "saaty_codes" - в SaatyMatrix (коды uint8), вне шкалы Саати - ReciprocalMatrix
+    matrix_storage: str = "lists"
\ No newline at end of file
@@ -1,13 +1,25 @@
 from __future__ import annotations
 
 import argparse
+import contextlib
 import json
 import sys
 from dataclasses import asdict, is_dataclass
-from typing import Any, Dict, List, Optional, Sequence
+from typing import Any, Dict, Iterator, List, Optional, Sequence
 
 from console.interaction import MainMenu
-from modules import Context, AemCom
+from modules import (
+    Context,
+    AemCom,
+    AemComPool,
+    MemoryTracker,
+    BackendRegistry,
+    ComputeBackend,
+    AutoBackend,
+    BackendTuner,
+    BackendTuningTable,
+)
+from utils import RunProfiler, BackendConformance
 
 
 def _expand_short_bundles(argv: Sequence[str]) -> List[str]:
@@ -78,6 +90,58 @@ def _parse_args(argv: Sequence[str]) -> argparse.Namespace:
         metavar="DIR",
         help="Папка (или путь .json) для сохранения результата. Если указано в --auto, stdout будет пустой.",
     )
+    parser.add_argument(
+        "--stream",
+        dest="stream",
+        action="store_true",
+        help="В --auto писать результат по уровням сразу после расчёта (JSON Lines, путь .jsonl или папка в -o)",
+    )
+    parser.add_argument(
+        "--profile",
+        dest="profile",
+        metavar="PATH",
+        help="Профилировать запуск: PATH.pstats, PATH.collapsed.txt (flame graph) и PATH.trace.json (trace events)",
+    )
+
+    parser.add_argument(
+        "--backend",
+        dest="backend",
+        choices=BackendRegistry.names() + [AutoBackend.name],
+        default=BackendRegistry.DEFAULT,
+        help="Вычислительный бэкенд AHP / AEM-COM (по умолчанию эталонный pure; auto - самый быстрый для n и K по таблице --tuning)",
+    )
+    parser.add_argument(
+        "--tuning",
+        dest="tuning",
+        metavar="PATH",
+        help="Таблица автонастройки бэкендов (по умолчанию ~/.cache/aemcom/backend_tuning.json)",
+    )
+    parser.add_argument(
+        "--autotune",
+        dest="autotune",
+        action="store_true",
+        help="Замерить доступные бэкенды по сетке (n, K), сохранить таблицу в --tuning и завершиться",
+    )
+    parser.add_argument(
+        "--conformance",
+        dest="conformance",
+        action="store_true",
+        help="Сверить --backend с эталоном pure на сгенерированном корпусе и завершиться (код 1 при расхождении)",
+    )
+    parser.add_argument(
+        "--processes",
+        dest="processes",
+        type=int,
+        default=1,
+        metavar="N",
+        help="В --auto решать уровни AEM-COM в N процессах (семейства передаются через общую память)",
+    )
+    parser.add_argument(
+        "--memory",
+        dest="memory",
+        action="store_true",
+        help="Учёт памяти по фазам (tracemalloc + RSS): отчёт в stderr и в performance.memory результата",
+    )
 
     return parser.parse_args(list(argv))
 
@@ -90,22 +154,101 @@ def _json_default(obj: Any) -> Any:
     raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
 
 
-def _run_auto(args) -> int:
+def _span(profiler: Optional[RunProfiler], name: str):
+    return profiler.span(name) if profiler is not None else contextlib.nullcontext()
+
+
+def _memory_phase(tracker: Optional[MemoryTracker], name: str):
+    return tracker.phase(name) if tracker is not None else contextlib.nullcontext()
+
+
+def _phased_levels(
+    levels: Iterator[Any],
+    profiler: Optional[RunProfiler],
+    memory: Optional[MemoryTracker],
+) -> Iterator[Any]:
+    """
+    --stream: расчёт и запись уровней чередуются, поэтому фазы те же, что без --stream, но по
+    отрезку на уровень: расчёт (next) - aem_com / solve, запись уровня потребителем (пока
+    генератор стоит на yield) - write / serialize. Отрезки одной фазы MemoryTracker сводит в одну строку
+    """
+    while True:
+        with _span(profiler, "aem_com"), _memory_phase(memory, "solve"):
+            level = next(levels, None)
+        if level is None:
+            return
+        with _span(profiler, "write"), _memory_phase(memory, "serialize"):
+            yield level
+
+
+def _autotune(path: str) -> BackendTuningTable:
+    """Сверка кандидатов с эталоном, замеры прошедших и сохранение таблицы переходов"""
+    reference = BackendRegistry.create(BackendRegistry.DEFAULT)
+    names = [reference.name]
+    for name in BackendRegistry.available():
+        if name == reference.name:
+            continue
+        report = BackendConformance(reference, BackendRegistry.create(name)).run()
+        print(report.format(limit=5), file=sys.stderr)
+        if report.ok:
+            names.append(name)
+
+    table = BackendTuner(backends=names).tune()
+    print(f"Таблица автонастройки сохранена: {table.save(path)}", file=sys.stderr)
+    for k, n in table.crossovers().items():
+        print(f"  K={k}: pure быстрее всех {'при всех n' if n is None else f'при n < {n}'}", file=sys.stderr)
+    return table
+
+
+def _create_backend(args) -> ComputeBackend:
+    if args.backend != AutoBackend.name:
+        return BackendRegistry.create(args.backend)
+
+    path = args.tuning or str(BackendTuningTable.default_path())
+    try:
+        table = BackendTuningTable.load(path)
+    except FileNotFoundError:
+        table = _autotune(path)
+    return AutoBackend(table)
+
+
+def _run_auto(
+    args,
+    profiler: Optional[RunProfiler] = None,
+    memory: Optional[MemoryTracker] = None,
+    backend: Optional[ComputeBackend] = None,
+) -> int:
     if not args.file:
         print("Ошибка: для --auto / -a нужно указать --file / -f <путь к json>", file=sys.stderr)
         return 2
 
-    context = Context.from_json_file(args.file, result_save_path=args.output)
+    with _span(profiler, "load"):
+        context = Context.from_json_file(args.file, result_save_path=args.output, memory_tracker=memory)
 
-    AemCom(context).run_full()
+    if args.processes > 1:
+        aem = AemComPool(context, processes=args.processes, backend=backend)
+    else:
+        aem = AemCom(context, backend=backend)
+    if profiler is not None:
+        aem.add_observer(profiler.level_observer())
 
-    if context.result_save_path:
-        context.save_result_json()
+    if args.stream:
+        levels = _phased_levels(aem.iter_run_full(), profiler, memory)
+        if context.result_save_path:
+            context.save_result_stream(levels)
+        else:
+            context.write_result_stream(sys.stdout, levels)
         return 0
 
-    payload = context.build_result_payload()
-    json.dump(payload, sys.stdout, ensure_ascii=False, indent=2)
-    sys.stdout.write("\n")
+    with _span(profiler, "aem_com"), _memory_phase(memory, "solve"):
+        aem.run_full()
+
+    with _span(profiler, "write"):
+        if context.result_save_path:
+            context.save_result_json()
+            return 0
+
+        context.write_result_json(sys.stdout)
     return 0
 
 
@@ -114,16 +257,41 @@ def main(argv: Optional[Sequence[str]] = None) -> int:
     argv = _expand_short_bundles(argv)
     args = _parse_args(argv)
 
-    if args.auto:
-        return _run_auto(args)
+    if args.autotune:
+        _autotune(args.tuning or str(BackendTuningTable.default_path()))
+        return 0
 
-    menu = MainMenu()
+    try:
+        backend = _create_backend(args)
+    except ValueError as e:
+        print(f"Ошибка: {e}", file=sys.stderr)
+        return 2
 
-    if args.file:
-        menu.load_context_from_file(args.file, output_path=args.output, wait_after=False)
+    if args.conformance:
+        report = BackendConformance(BackendRegistry.create(BackendRegistry.DEFAULT), backend).run()
+        print(report.format())
+        return 0 if report.ok else 1
 
-    menu.run(args)
-    return 0
+    profiler = RunProfiler(args.profile).start() if args.profile else None
+    memory = MemoryTracker().start() if args.memory else None
+    try:
+        if args.auto:
+            return _run_auto(args, profiler, memory, backend)
+
+        menu = MainMenu(profiler=profiler, memory_tracker=memory, backend=backend)
+
+        if args.file:
+            menu.load_context_from_file(args.file, output_path=args.output, wait_after=False)
+
+        menu.run(args)
+        return 0
+    finally:
+        if memory is not None:
+            memory.stop()
+            print(json.dumps({"memory": memory.report()}, ensure_ascii=False), file=sys.stderr)
+        if profiler is not None:
+            for path in profiler.close():
+                print(f"Профиль сохранён: {path}", file=sys.stderr)
 
 
 if __name__ == "__main__":
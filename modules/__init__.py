@@ -1,9 +1,19 @@
 from modules.context import Context
+from modules.aggregation import AggregationCache
+from modules.memory_tracker import MemoryTracker
 from modules.math import Math
 from modules.ahp import AHP
-from modules.gcompi import GcompiCalculator
+from modules.gcompi import GcompiCalculator, GcompiFamilyStats, GcompiTrial
+from modules.backends import ComputeBackend, PureBackend, NumpyBackend, BackendRegistry
+from modules.backend_tuner import BackendTuningEntry, BackendTuningTable, BackendTuner, AutoBackend
+from modules.aem_com_observer import AemComObserver, AemComStreamObserver
 from modules.aem_com import AemCom
+from modules.aem_com_batch import AemComBatch
+from modules.aem_com_session import AemComSession
+from modules.aem_com_influence import AemComInfluence
+from modules.shared_family import SharedFamilyHandle, SharedFamilyBlock, SharedFamilyView
+from modules.aem_com_pool import AemComPool, SharedLevelTask
 from modules.pccm_generator import PairwiseMatrixGenerator
 from modules.context_generator import ContextGenerator
 
-__all__ = ["Context", "Math", "AHP", "GcompiCalculator", "AemCom", "PairwiseMatrixGenerator", "ContextGenerator"]
\ No newline at end of file
+__all__ = ["Context", "AggregationCache", "MemoryTracker", "Math", "AHP", "GcompiCalculator", "GcompiFamilyStats", "GcompiTrial", "ComputeBackend", "PureBackend", "NumpyBackend", "BackendRegistry", "BackendTuningEntry", "BackendTuningTable", "BackendTuner", "AutoBackend", "AemComObserver", "AemComStreamObserver", "AemCom", "AemComBatch", "AemComSession", "AemComInfluence", "SharedFamilyHandle", "SharedFamilyBlock", "SharedFamilyView", "AemComPool", "SharedLevelTask", "PairwiseMatrixGenerator", "ContextGenerator"]
\ No newline at end of file
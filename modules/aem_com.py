@@ -1,25 +1,52 @@
 from __future__ import annotations
 
 import copy
+import hashlib
+import json
 import math
-from typing import Dict, List, Optional, Tuple
+import time
+from array import array
+from typing import Dict, Iterator, List, Optional, Tuple, Union
 
 from modules.context import Context
 from modules.math import Math
-from modules.gcompi import GcompiCalculator
+from modules.gcompi import GcompiCalculator, GcompiFamilyStats, GcompiTrial
+from modules.backends import ComputeBackend, PureBackend
+from modules.log_solver import LogSpaceSolver
+from modules.aem_com_observer import AemComObserver
+from modules.result_loader import AemComResultLoader
 
 from entities import (
     GroupAhpModel,
     PairwiseMatrix,
+    AemComCheckpoint,
     AemComIterationRecord,
+    AemComPerformance,
+    AemComProblem,
     AemComRunResult,
     CriteriaLevelAemComResult,
     AlternativeLevelAemComResult,
     AemComGlobalResult,
+    ExpertCompatibility,
+    ReciprocalMatrix,
+    SaatyMatrix,
 )
 
 
 class AemCom:
+    # правило выбора пары на итерации
+    SELECTION_MAX_LOG_Q = "max_log_q"
+    SELECTION_BEST_GAIN = "best_gain"
+
+    # способ минимизации GCOMPI
+    ENGINE_GREEDY = "greedy"
+    ENGINE_LOG_SOLVER = "log_solver"
+
+    # продолжение расчёта с итоговой P' сохранённого результата
+    INITIAL_FROM_RESULT = "from_result"
+    # причины остановки log_solver, после которых продолжение ещё что-то меняет
+    _RESUMABLE = (AemComRunResult.TERMINATION_MAX_ITERATIONS, AemComRunResult.TERMINATION_CANCELLED)
+
     def __init__(
         self,
         context: Context,
@@ -27,42 +54,84 @@ class AemCom:
         gcompi: Optional[GcompiCalculator] = None,
         permissibility: Optional[float] = None,
         max_iterations: Optional[int] = None,
+        backend: Optional[ComputeBackend] = None,
     ) -> None:
         self._context = context
-        self._math = ahp_math if ahp_math is not None else Math()
-        self._gcompi = gcompi if gcompi is not None else GcompiCalculator()
+        # ahp_math / gcompi, если переданы, важнее объектов бэкенда
+        self._backend = backend if backend is not None else PureBackend()
+        self._ahp_math = ahp_math
+        self._gcompi_override = gcompi
+        self._active_backend = self._backend
+        self._math = ahp_math if ahp_math is not None else self._backend.math
+        self._gcompi = gcompi if gcompi is not None else self._backend.gcompi
 
         settings = self._context.group_model.settings.aem_com
         self._rho = permissibility if permissibility is not None else settings.permissibility
         self._max_iterations = max_iterations if max_iterations is not None else settings.max_iterations
         self._initial_mode = getattr(settings, "initial_mode", "aij")
+        self._initial_result_path = getattr(settings, "initial_result_path", "")
+        self._previous_runs: Optional[Dict[Optional[str], AemComRunResult]] = None
 
         self._strict_decrease = getattr(settings, "strict_decrease", False)
 
-    def run_on_criteria_level(self) -> CriteriaLevelAemComResult:
-        group_model = self._context.group_model
-        matrices = group_model.pairwise_matrices.criteria_level
+        # допуски остановки - только из AemComSettings: значения по умолчанию заданы в одном месте
+        self._abs_tol = float(settings.gcompi_abs_tol)
+        self._rel_tol = float(settings.gcompi_rel_tol)
+        self._stall_patience = int(getattr(settings, "stall_patience", 0))
+        self._stall_tol = float(getattr(settings, "stall_tol", 0.0))
+
+        self._selection = str(getattr(settings, "selection", self.SELECTION_MAX_LOG_Q)).lower()
+        if self._selection not in (self.SELECTION_MAX_LOG_Q, self.SELECTION_BEST_GAIN):
+            raise ValueError(f"Неизвестный режим выбора пары selection='{self._selection}'.")
+
+        self._engine = str(getattr(settings, "engine", self.ENGINE_GREEDY)).lower()
+        if self._engine not in (self.ENGINE_GREEDY, self.ENGINE_LOG_SOLVER):
+            raise ValueError(f"Неизвестный движок AEM-COM engine='{self._engine}'.")
+        self._solver_max_passes = int(getattr(settings, "solver_max_passes", 100))
+        self._solver_tol = float(getattr(settings, "solver_tol", 1e-9))
+        self._solver_history = bool(getattr(settings, "solver_history", False))
+        self._checkpoint_every = int(getattr(settings, "checkpoint_every", 0))
+        if self._engine == self.ENGINE_LOG_SOLVER and self._checkpoint_every > 0:
+            raise ValueError(
+                "engine='log_solver' не сохраняет контрольные точки: checkpoint_every должен быть 0."
+            )
 
-        if not matrices:
-            raise ValueError("Нет матриц уровня критериев (criteria_level).")
+        self._expert_compatibility = bool(getattr(settings, "expert_compatibility", False))
 
-        items = matrices[0].items
-        A_family, alpha = self._extract_family(matrices)
-        P_provided = self._get_provided_collective_matrix(criterion_id=None, items=items)
-        P0 = self._build_initial_matrix(
-            matrices=A_family,
-            expert_weights=alpha,
-            items=items,
-            provided_matrix=P_provided,
-        )
+        self._observers: List[AemComObserver] = []
 
-        run_result = self._run_aem_com(
-            family_matrices=A_family,
-            expert_weights=alpha,
-            items=items,
-            initial_P=P0,
+        # замеры текущего уровня; None - замеры выключены
+        self._performance = bool(getattr(settings, "performance", False))
+        self._perf: Optional[AemComPerformance] = None
+
+        # уровень текущего расчёта (criterion_id, None - критерии) - ключ записи Context.aggregation
+        self._level: Optional[str] = None
+
+    def add_observer(self, observer: AemComObserver) -> None:
+        if self._engine == self.ENGINE_LOG_SOLVER and self._observes_iterations(observer):
+            raise ValueError(
+                "engine='log_solver' не выдаёт события итераций (on_iteration_accepted / "
+                "on_iteration_rejected): доступны только события уровня."
+            )
+        self._observers.append(observer)
+
+    @staticmethod
+    def _observes_iterations(observer: AemComObserver) -> bool:
+        cls = type(observer)
+        return (
+            cls.on_iteration_accepted is not AemComObserver.on_iteration_accepted
+            or cls.on_iteration_rejected is not AemComObserver.on_iteration_rejected
         )
 
+    def remove_observer(self, observer: AemComObserver) -> None:
+        self._observers.remove(observer)
+
+    def _cancel_requested(self) -> bool:
+        return any(o.cancel_requested for o in self._observers)
+
+    def run_on_criteria_level(self) -> CriteriaLevelAemComResult:
+        run_result = self.run_problem(self.prepare_criteria_level(), previous=self._previous_run_for(None))
+
         return CriteriaLevelAemComResult(
             level="criteria",
             run=run_result,
@@ -72,60 +141,228 @@ class AemCom:
             self,
             criterion_id: str,
     ) -> AlternativeLevelAemComResult:
-        group_model = self._context.group_model
-        all_mats = group_model.pairwise_matrices.alternative_level
+        run_result = self.run_problem(
+            self.prepare_alternative_level(criterion_id),
+            previous=self._previous_run_for(criterion_id),
+        )
+
+        return AlternativeLevelAemComResult(
+            level="alternatives",
+            criterion_id=criterion_id,
+            run=run_result,
+        )
+
+    def prepare_criteria_level(self) -> AemComProblem:
+        matrices = self._context.group_model.pairwise_matrices.criteria_level
 
+        if not matrices:
+            raise ValueError("Нет матриц уровня критериев (criteria_level).")
+
+        return self._prepare_problem(matrices, criterion_id=None)
+
+    def prepare_alternative_level(self, criterion_id: str) -> AemComProblem:
+        all_mats = self._context.group_model.pairwise_matrices.alternative_level
         matrices = [m for m in all_mats if m.criterion_id == criterion_id]
 
         if not matrices:
             raise ValueError(f"Нет матриц альтернатив для критерия '{criterion_id}'.")
 
+        return self._prepare_problem(matrices, criterion_id=criterion_id)
+
+    def run_problem(
+            self,
+            problem: AemComProblem,
+            previous: Optional[AemComRunResult] = None,
+    ) -> AemComRunResult:
+        """
+        previous - результат прошлого расчёта этого уровня. Если его family_hash совпадает
+        с текущим семейством, расчёт продолжается: с его P', w_G, gcompi_min, историей
+        и без уже отработанных пар. Иначе - только тёплый старт с его P'.
+        family_hash считается только когда он нужен (см. _wants_family_hash)
+        """
+        self._level = problem.criterion_id
+        if self._performance:
+            self._perf = problem.performance if problem.performance is not None else AemComPerformance()
+            t_start = time.perf_counter()
+
+        family_hash = problem.family_hash
+        if not family_hash and self._wants_family_hash(previous):
+            family_hash = self._family_hash(problem)
+        for observer in self._observers:
+            observer.on_level_start(problem)
+
+        resume: Optional[AemComRunResult] = None
+        initial_P = problem.initial_matrix
+        if previous is not None:
+            if previous.family_hash == family_hash and list(previous.items) == list(problem.items):
+                resume = previous
+            else:
+                initial_P = previous.final_matrix
+
+        run = self._run_aem_com(
+            family_matrices=problem.family_matrices,
+            expert_weights=problem.expert_weights,
+            items=problem.items,
+            initial_P=initial_P,
+            resume=resume,
+        )
+        run.family_hash = family_hash
+        if self._expert_compatibility:
+            self._attach_compatibility(problem, run)
+        if self._perf is not None:
+            self._perf.add_time(AemComPerformance.PHASE_TOTAL, time.perf_counter() - t_start)
+            run.performance = self._perf
+            self._perf = None
+        for observer in self._observers:
+            observer.on_level_finished(problem, run)
+        return run
+
+    def _wants_family_hash(self, previous: Optional[AemComRunResult]) -> bool:
+        """
+        Хэш нужен для сравнения с previous и в результате, который можно продолжить через
+        from_result: при initial_mode="from_result" и при сохранении результата в файл
+        """
+        return (
+            previous is not None
+            or (self._initial_mode or "aij").lower() == self.INITIAL_FROM_RESULT
+            or bool(self._context.result_save_path)
+        )
+
+    @staticmethod
+    def _family_hash(problem: AemComProblem) -> str:
+        """
+        sha256 по сырым буферам семейства без промежуточных списков: коды SaatyMatrix,
+        upper ReciprocalMatrix, строки float64 (memoryview из SharedFamilyView - как есть).
+        Хэш зависит от формы хранения (matrix_storage) - так же, как и сохранённые P'
+        """
+        digest = hashlib.sha256()
+        digest.update(json.dumps(problem.items).encode("utf-8"))
+        digest.update(array("d", ComputeBackend._normalized_weights(problem.expert_weights)))
+
+        for m in problem.family_matrices:
+            if isinstance(m, SaatyMatrix):
+                digest.update(b"saaty")
+                digest.update(m.codes)
+            elif isinstance(m, ReciprocalMatrix):
+                digest.update(b"upper")
+                digest.update(m.upper)
+            else:
+                digest.update(b"dense")
+                for row in m:
+                    digest.update(row if isinstance(row, memoryview) else array("d", row))
+        return digest.hexdigest()
+
+    def _previous_run_for(self, criterion_id: Optional[str]) -> Optional[AemComRunResult]:
+        if (self._initial_mode or "aij").lower() != self.INITIAL_FROM_RESULT:
+            return None
+
+        if self._previous_runs is None:
+            if not self._initial_result_path:
+                raise ValueError("initial_mode='from_result' требует settings.aem_com.initial_result_path.")
+            self._previous_runs = AemComResultLoader(self._initial_result_path).load()
+
+        previous = self._previous_runs.get(criterion_id)
+        if previous is None:
+            level = "критериев" if criterion_id is None else f"альтернатив по критерию '{criterion_id}'"
+            raise ValueError(f"В файле '{self._initial_result_path}' нет результата уровня {level}.")
+        return previous
+
+    def _attach_compatibility(self, problem: AemComProblem, run: AemComRunResult) -> None:
+        expert_ids = problem.expert_ids or [str(k) for k in range(len(problem.family_matrices))]
+        run.compatibility = self._build_compatibility(
+            expert_ids,
+            [self._gcompi.expert_stats(m) for m in problem.family_matrices],
+            run,
+        )
+
+    def _build_compatibility(
+            self,
+            expert_ids: List[str],
+            expert_stats: List[GcompiFamilyStats],
+            run: AemComRunResult,
+    ) -> ExpertCompatibility:
+        return ExpertCompatibility(
+            expert_ids=list(expert_ids),
+            matrix=self._gcompi.compatibility_matrix(expert_stats),
+            gcompi_group=self._gcompi.gcompi_per_expert(expert_stats, run.group_priorities),
+            gcompi_final=self._gcompi.gcompi_per_expert(expert_stats, run.final_priorities),
+        )
+
+    def _prepare_problem(
+            self,
+            matrices: List[PairwiseMatrix],
+            criterion_id: Optional[str],
+    ) -> AemComProblem:
         items = matrices[0].items
+        self._level = criterion_id
+        if self._performance:
+            self._perf = AemComPerformance()
+            t0 = time.perf_counter()
+
         A_family, alpha = self._extract_family(matrices)
-        P_provided = self._get_provided_collective_matrix(criterion_id=criterion_id, items=items)
-        P0 = self._build_initial_matrix(
-            matrices=A_family,
-            expert_weights=alpha,
-            items=items,
-            provided_matrix=P_provided,
-        )
+        if self._perf is not None:
+            self._perf.add_time(AemComPerformance.PHASE_FAMILY_EXTRACTION, time.perf_counter() - t0)
+        self._select_backend(len(items), len(A_family))
+
+        previous = self._previous_run_for(criterion_id)
+        if previous is not None:
+            P0 = [row[:] for row in previous.final_matrix]
+        else:
+            P_provided = self._get_provided_collective_matrix(criterion_id=criterion_id, items=items)
+            P0 = self._build_initial_matrix(
+                matrices=A_family,
+                expert_weights=alpha,
+                items=items,
+                provided_matrix=P_provided,
+            )
 
-        run_result = self._run_aem_com(
+        return AemComProblem(
+            items=items,
             family_matrices=A_family,
             expert_weights=alpha,
-            items=items,
-            initial_P=P0,
-        )
-
-        return AlternativeLevelAemComResult(
-            level="alternatives",
+            initial_matrix=P0,
             criterion_id=criterion_id,
-            run=run_result,
+            expert_ids=[m.expert_id or "" for m in matrices],
+            performance=self._pop_perf(),
         )
 
-    def run_full(self) -> AemComGlobalResult:
+    def _pop_perf(self) -> Optional[AemComPerformance]:
+        perf = self._perf
+        self._perf = None
+        return perf
+
+    def iter_run_full(self) -> Iterator[Union[CriteriaLevelAemComResult, AlternativeLevelAemComResult]]:
+        """
+        Уровни из settings.aem_com.apply_to по одному, сразу после расчёта каждого.
+        Результаты не накапливаются и в контекст не записываются (см. Context.save_result_stream)
+        """
         group_model = self._context.group_model
         apply_to = group_model.settings.aem_com.apply_to
 
+        if "criteria" in apply_to:
+            yield self.run_on_criteria_level()
+
+        if "alternatives_by_criterion" in apply_to:
+            for criterion in group_model.model.criteria:
+                if self._observers and self._cancel_requested():
+                    return
+                yield self.run_on_alternative_level_for_criterion(criterion.id)
+
+    def run_full(self) -> AemComGlobalResult:
         criteria_result: Optional[CriteriaLevelAemComResult] = None
         alternatives_results: Dict[str, AlternativeLevelAemComResult] = {}
 
         total_iterations = 0
         levels_count = 0
 
-        if "criteria" in apply_to:
-            criteria_result = self.run_on_criteria_level()
-            total_iterations += criteria_result.run.iterations
+        for level_result in self.iter_run_full():
+            if isinstance(level_result, CriteriaLevelAemComResult):
+                criteria_result = level_result
+            else:
+                alternatives_results[level_result.criterion_id] = level_result
+            total_iterations += level_result.run.iterations
             levels_count += 1
 
-        if "alternatives_by_criterion" in apply_to:
-            for criterion in group_model.model.criteria:
-                c_id = criterion.id
-                alt_result = self.run_on_alternative_level_for_criterion(c_id)
-                alternatives_results[c_id] = alt_result
-                total_iterations += alt_result.run.iterations
-                levels_count += 1
-
         global_result = AemComGlobalResult(
             criteria_result=criteria_result,
             alternatives_results=alternatives_results,
@@ -174,36 +411,14 @@ class AemCom:
             return pm.matrix
         return None
 
-    @staticmethod
-    def _build_aij_matrix(matrices: List[List[List[float]]], expert_weights: List[float]) -> List[List[float]]:
-        if not matrices:
-            raise ValueError("Пустое семейство матриц для AIJ.")
-
-        n = len(matrices[0])
-        for mat in matrices:
-            if len(mat) != n:
-                raise ValueError("Все матрицы в семействе должны иметь одинаковый размер.")
-
-        total_w = sum(max(w, 0.0) for w in expert_weights)
-        if total_w == 0.0:
-            w_norm = [1.0 / len(expert_weights)] * len(expert_weights)
-        else:
-            w_norm = [max(w, 0.0) / total_w for w in expert_weights]
-
-        aij: List[List[float]] = [[1.0 for _ in range(n)] for _ in range(n)]
-
-        for k, mat in enumerate(matrices):
-            alpha_k = w_norm[k]
-            if alpha_k == 0.0:
-                continue
-            for i in range(n):
-                for j in range(n):
-                    val = mat[i][j]
-                    if val <= 0.0:
-                        continue
-                    aij[i][j] *= val ** alpha_k
-
-        return aij
+    def _select_backend(self, n: int, experts: int) -> ComputeBackend:
+        """Бэкенд уровня n x n с K матрицами (для --backend auto - по таблице автонастройки)"""
+        backend = self._backend.for_shape(n, experts)
+        if backend is not self._active_backend:
+            self._active_backend = backend
+            self._math = self._ahp_math if self._ahp_math is not None else backend.math
+            self._gcompi = self._gcompi_override if self._gcompi_override is not None else backend.gcompi
+        return backend
 
     def _run_aem_com(
         self,
@@ -211,16 +426,48 @@ class AemCom:
         expert_weights: List[float],
         items: List[str],
         initial_P: List[List[float]],
+        family_stats: Optional[GcompiFamilyStats] = None,
+        aij_matrix: Optional[List[List[float]]] = None,
+        resume: Optional[AemComRunResult] = None,
+    ) -> AemComRunResult:
+        """
+        family_stats / aij_matrix - предвычисленные агрегаты семейства (см. AemComSession);
+        если переданы, GCOMPI считается по ним за O(n) без прохода по матрицам экспертов.
+        resume - результат прошлого расчёта по тому же семейству (см. run_problem)
+        """
+        backend = self._select_backend(len(items), len(family_matrices))
+        run = self._solve_level_core(
+            family_matrices=family_matrices,
+            expert_weights=expert_weights,
+            items=items,
+            initial_P=initial_P,
+            family_stats=family_stats,
+            aij_matrix=aij_matrix,
+            resume=resume,
+        )
+        run.backend = backend.name
+        return run
+
+    def _solve_level_core(
+        self,
+        family_matrices: List[List[List[float]]],
+        expert_weights: List[float],
+        items: List[str],
+        initial_P: List[List[float]],
+        family_stats: Optional[GcompiFamilyStats],
+        aij_matrix: Optional[List[List[float]]],
+        resume: Optional[AemComRunResult],
     ) -> AemComRunResult:
         n = len(items)
         history: List[AemComIterationRecord] = []
+        stats = family_stats
 
         if n <= 2:
             P = copy.deepcopy(initial_P)
-            v0 = self._math.compute_priority_vector(P)
+            v0 = self._priorities(P)
             wG = v0[:]
-            gcompi_init = self._gcompi.gcompi_family(family_matrices, expert_weights, v0)
-            gcompi_min = self._gcompi.gcompi_family(family_matrices, expert_weights, wG)
+            gcompi_init = self._family_gcompi(family_matrices, expert_weights, stats, v0)
+            gcompi_min = self._family_gcompi(family_matrices, expert_weights, stats, wG)
 
             return AemComRunResult(
                 items=list(items),
@@ -234,24 +481,100 @@ class AemCom:
                 gcompi_min=gcompi_min,
                 iterations=0,
                 history=history,
+                termination_reason=AemComRunResult.TERMINATION_TRIVIAL,
             )
 
-        P = copy.deepcopy(initial_P)
-        v0 = self._math.compute_priority_vector(P)
+        J: List[Tuple[int, int]] = [(r, s) for r in range(n) for s in range(r + 1, n)]
+        iterations = 0
+        stall_count = 0
+        termination_reason = AemComRunResult.TERMINATION_PAIRS_EXHAUSTED
+        checkpoints: List[AemComCheckpoint] = []
+        reciprocal_fixes: List[Tuple[int, int, int]] = []
+        rejected_pairs: List[Tuple[int, int]] = []
+
+        if resume is not None:
+            # семейство то же: AIJ не строится, w_G и GCOMPI берутся из прошлого результата
+            P = copy.deepcopy(resume.final_matrix)
+            initial_P = resume.initial_matrix
+            v0 = list(resume.initial_priorities)
+            gcompi_initial = resume.gcompi_initial
+            wG = list(resume.group_priorities)
+            gcompi_min = resume.gcompi_min
+
+            v = self._priorities(P)
+            gcompi_current = resume.gcompi_final
+
+            history = list(resume.history)
+            iterations = resume.iterations
+            checkpoints = list(resume.checkpoints)
+            reciprocal_fixes = list(resume.reciprocal_fixes)
+            rejected_pairs = [tuple(pair) for pair in resume.rejected_pairs]
+            if self._engine == self.ENGINE_GREEDY:
+                # у log_solver пары не выбывают: спуск продолжается по всем
+                retired = {(min(h.pair_indices), max(h.pair_indices)) for h in resume.history}
+                retired.update(rejected_pairs)
+                J = [pair for pair in J if pair not in retired]
+            stall_count = self._stall_count(resume)
+        else:
+            P = copy.deepcopy(initial_P)
+            v0 = self._priorities(P)
 
-        AIJ = self._build_aij_matrix(family_matrices, expert_weights)
-        wG = self._math.compute_priority_vector(AIJ)
+            AIJ = aij_matrix if aij_matrix is not None else self._aij(family_matrices, expert_weights)
+            gcompi_initial = self._family_gcompi(family_matrices, expert_weights, stats, v0)
 
-        gcompi_initial = self._gcompi.gcompi_family(family_matrices, expert_weights, v0)
-        gcompi_min = self._gcompi.gcompi_family(family_matrices, expert_weights, wG)
+            # при initial_mode="aij" P0 совпадает с AIJ, значит v0 = w_G и цикл заведомо пустой
+            if AIJ == P:
+                wG = v0[:]
+                gcompi_min = gcompi_initial
+            else:
+                wG = self._priorities(AIJ)
+                gcompi_min = self._family_gcompi(family_matrices, expert_weights, stats, wG)
 
-        v = v0[:]
-        gcompi_current = gcompi_initial
+            v = v0[:]
+            gcompi_current = gcompi_initial
 
-        J: List[Tuple[int, int]] = [(r, s) for r in range(n) for s in range(r + 1, n)]
-        iterations = 0
+        if self._is_converged(gcompi_current, gcompi_min):
+            J = []
+            termination_reason = (
+                AemComRunResult.TERMINATION_CONVERGED if resume is not None
+                else AemComRunResult.TERMINATION_CONVERGED_INITIAL
+            )
+        elif self._stall_patience > 0 and stall_count >= self._stall_patience:
+            # прошлый расчёт остановлен застоем - непрерывный расчёт дальше бы не пошёл
+            J = []
+            termination_reason = AemComRunResult.TERMINATION_STALLED
+
+        if J and self._engine == self.ENGINE_LOG_SOLVER:
+            return self._run_log_solver(
+                family_matrices=family_matrices,
+                expert_weights=expert_weights,
+                items=items,
+                initial_P=initial_P,
+                initial_priorities=v0,
+                group_priorities=wG,
+                gcompi_initial=gcompi_initial,
+                gcompi_min=gcompi_min,
+                family_stats=stats,
+                resume=resume,
+            )
+
+        observers = self._observers
+        trial: Optional[GcompiTrial] = None
+        # разница между GCOMPI текущей P и gcompi_current после приведения отклонённых пар
+        drift = 0.0
+        if J and (self._strict_decrease or self._selection == self.SELECTION_BEST_GAIN):
+            trial_stats = stats if stats is not None else self._gcompi.family_stats(family_matrices, expert_weights)
+            trial = GcompiTrial(trial_stats, P)
+
+        while J:
+            if iterations >= self._max_iterations:
+                termination_reason = AemComRunResult.TERMINATION_MAX_ITERATIONS
+                break
+
+            perf = self._perf
+            if perf is not None:
+                t_select = time.perf_counter()
 
-        while J and iterations < self._max_iterations:
             q_values: Dict[Tuple[int, int], float] = {}
             log_q_values: Dict[Tuple[int, int], float] = {}
 
@@ -280,46 +603,24 @@ class AemCom:
                     chosen_pair = pair
 
             if chosen_pair is None or max_abs_log_q <= 0.0:
+                termination_reason = AemComRunResult.TERMINATION_NO_DEVIATION
                 break
 
-            r_star, s_star = chosen_pair
-
-            if P[r_star][s_star] > 1.0:
-                r = r_star
-                s = s_star
-            else:
-                r = s_star
-                s = r_star
-
-            key_minmax = (min(r, s), max(r, s))
-            q_rs = q_values.get(key_minmax, 1.0)
-            log_q_rs = log_q_values.get(key_minmax, 0.0)
-
-            if q_rs <= 0.0:
-                t_star = 1.0
-            else:
-                t_star = q_rs ** (-n / 2.0)
+            best_delta: Optional[float] = None
+            if self._selection == self.SELECTION_BEST_GAIN:
+                chosen_pair, best_delta = self._select_best_gain(J, P, q_values, log_q_values, trial)
+                if self._strict_decrease and drift + best_delta >= 0.0:
+                    termination_reason = AemComRunResult.TERMINATION_NO_IMPROVEMENT
+                    break
 
-            if log_q_rs < 0.0:
-                t_rs = min(1.0 + self._rho, t_star)
-            elif log_q_rs > 0.0:
-                t_bound = 1.0 / (1.0 + self._rho) if (1.0 + self._rho) != 0.0 else 1.0
-                t_rs = max(t_bound, t_star)
-            else:
-                t_rs = 1.0
-
-            old_val = P[r][s]
-            new_val = old_val * t_rs
-
-            lower = 1.0 / 9.0
-            upper = 9.0
-            if new_val < lower:
-                new_val = lower
-            if new_val > upper:
-                new_val = upper
+            if perf is not None:
+                perf.add_time(AemComPerformance.PHASE_PAIR_SELECTION, time.perf_counter() - t_select)
+                perf.count(AemComPerformance.COUNTER_PAIR_SELECTIONS)
 
-            P[r][s] = new_val
-            P[s][r] = 1.0 / new_val
+            r_star, s_star = chosen_pair
+            r, s, t_rs, old_val, new_val = self._permissible_step(
+                P, r_star, s_star, q_values[chosen_pair], log_q_values[chosen_pair]
+            )
 
             J = [
                 (i, j)
@@ -327,16 +628,49 @@ class AemCom:
                 if not ((i == r_star and j == s_star) or (i == s_star and j == r_star))
             ]
 
-            v_new = self._math.compute_priority_vector(P)
-            gcompi_new = self._gcompi.gcompi_family(family_matrices, expert_weights, v_new)
+            if trial is not None:
+                # решение о шаге принимается до изменения P: отказ стоит O(1)
+                delta = best_delta if best_delta is not None else trial.delta(r, s, new_val / old_val)
+                if self._strict_decrease and drift + delta >= 0.0:
+                    gcompi_rejected = gcompi_current + drift + delta
+                    rejected_pairs.append((min(r, s), max(r, s)))
+                    if perf is not None:
+                        perf.count(AemComPerformance.COUNTER_REJECTED)
+                    if P[s][r] != 1.0 / old_val:
+                        # отклонённая пара, как и раньше, приводится к взаимно обратному виду
+                        drift += trial.delta(r, s, 1.0)
+                        trial.commit(r, s, old_val)
+                        reciprocal_fixes.append((iterations, r, s))
+                    if observers:
+                        rejected = AemComIterationRecord(
+                            iteration=iterations + 1,
+                            pair_indices=(r, s),
+                            pair_items=(items[r], items[s]),
+                            t_rs=t_rs,
+                            old_value=old_val,
+                            new_value=new_val,
+                            gcompi_value=gcompi_rejected,
+                        )
+                        for observer in observers:
+                            observer.on_iteration_rejected(rejected)
+                        if self._cancel_requested():
+                            termination_reason = AemComRunResult.TERMINATION_CANCELLED
+                            break
+                    continue
+                trial.commit(r, s, new_val)
+                drift = 0.0
+            else:
+                P[r][s] = new_val
+                P[s][r] = 1.0 / new_val
 
-            if self._strict_decrease and gcompi_new >= gcompi_current:
-                P[r][s] = old_val
-                P[s][r] = 1.0 / old_val
-                continue
+            v_new = self._priorities(P)
+            gcompi_new = self._family_gcompi(family_matrices, expert_weights, stats, v_new)
 
             iterations += 1
+            if perf is not None:
+                perf.count(AemComPerformance.COUNTER_ACCEPTED)
             v = v_new
+            gcompi_prev = gcompi_current
             gcompi_current = gcompi_new
 
             pair_items = (items[r], items[s])
@@ -351,6 +685,28 @@ class AemCom:
                     gcompi_value=gcompi_current,
                 )
             )
+            if self._checkpoint_every > 0 and iterations % self._checkpoint_every == 0:
+                checkpoints.append(AemComCheckpoint(iteration=iterations, matrix=[row[:] for row in P]))
+
+            if observers:
+                for observer in observers:
+                    observer.on_iteration_accepted(history[-1])
+                if self._cancel_requested():
+                    termination_reason = AemComRunResult.TERMINATION_CANCELLED
+                    break
+
+            if self._is_converged(gcompi_current, gcompi_min):
+                termination_reason = AemComRunResult.TERMINATION_CONVERGED
+                break
+
+            if self._stall_patience > 0:
+                if gcompi_prev - gcompi_current <= self._stall_tol * abs(gcompi_prev):
+                    stall_count += 1
+                else:
+                    stall_count = 0
+                if stall_count >= self._stall_patience:
+                    termination_reason = AemComRunResult.TERMINATION_STALLED
+                    break
 
         return AemComRunResult(
             items=list(items),
@@ -364,8 +720,260 @@ class AemCom:
             gcompi_min=gcompi_min,
             iterations=iterations,
             history=history,
+            termination_reason=termination_reason,
+            checkpoints=checkpoints,
+            reciprocal_fixes=reciprocal_fixes,
+            rejected_pairs=rejected_pairs,
         )
 
+    def _stall_count(self, run: AemComRunResult) -> int:
+        """Счётчик застоя на конец run: принятые итерации подряд в конце history без улучшения"""
+        if self._stall_patience <= 0:
+            return 0
+        values = [run.gcompi_initial] + [h.gcompi_value for h in run.history]
+        count = 0
+        for i in range(len(values) - 1, 0, -1):
+            if values[i - 1] - values[i] > self._stall_tol * abs(values[i - 1]):
+                break
+            count += 1
+        return count
+
+    def _run_log_solver(
+        self,
+        family_matrices: List[List[List[float]]],
+        expert_weights: List[float],
+        items: List[str],
+        initial_P: List[List[float]],
+        initial_priorities: List[float],
+        group_priorities: List[float],
+        gcompi_initial: float,
+        gcompi_min: float,
+        family_stats: Optional[GcompiFamilyStats] = None,
+        resume: Optional[AemComRunResult] = None,
+    ) -> AemComRunResult:
+        """
+        Проходы спуска - итерации уровня: их не больше solver_max_passes и остатка max_iterations.
+        resume - продолжение с P' прошлого расчёта: коробка допустимых значений по-прежнему
+        строится по initial_P, история и счётчик проходов продолжаются. Отмена (cancel())
+        проверяется перед спуском - после on_level_start
+        """
+        stats = family_stats
+        if stats is None:
+            stats = self._gcompi.family_stats(family_matrices, expert_weights)
+
+        start_P = initial_P
+        gcompi_start = gcompi_initial
+        done = 0
+        history: List[AemComIterationRecord] = []
+        reciprocal_fixes: List[Tuple[int, int, int]] = []
+        if resume is not None:
+            start_P = resume.final_matrix
+            gcompi_start = resume.gcompi_final
+            done = resume.iterations
+            history = list(resume.history)
+            reciprocal_fixes = list(resume.reciprocal_fixes)
+
+        if resume is not None and resume.termination_reason not in self._RESUMABLE:
+            # спуск уже сошёлся - непрерывный расчёт дальше бы не пошёл
+            P, passes = copy.deepcopy(start_P), 0
+            termination_reason = resume.termination_reason
+        elif self._observers and self._cancel_requested():
+            P, passes = copy.deepcopy(start_P), 0
+            termination_reason = AemComRunResult.TERMINATION_CANCELLED
+        else:
+            solver = LogSpaceSolver(
+                stats,
+                permissibility=self._rho,
+                max_passes=max(min(self._solver_max_passes, self._max_iterations - done), 0),
+                tol=self._solver_tol,
+            )
+            P, passes, converged = solver.solve(initial_P, start_P)
+            termination_reason = (
+                AemComRunResult.TERMINATION_CONVERGED if converged
+                else AemComRunResult.TERMINATION_MAX_ITERATIONS
+            )
+
+        v = self._priorities(P)
+        gcompi_final = self._family_gcompi(family_matrices, expert_weights, family_stats, v)
+
+        if self._solver_history:
+            self._build_synthetic_history(stats, items, start_P, P, gcompi_start, history)
+
+        return AemComRunResult(
+            items=list(items),
+            initial_matrix=copy.deepcopy(initial_P),
+            final_matrix=P,
+            initial_priorities=list(initial_priorities),
+            final_priorities=list(v),
+            group_priorities=list(group_priorities),
+            gcompi_initial=gcompi_initial,
+            gcompi_final=gcompi_final,
+            gcompi_min=gcompi_min,
+            iterations=done + passes,
+            history=history,
+            termination_reason=termination_reason,
+            reciprocal_fixes=reciprocal_fixes,
+        )
+
+    @staticmethod
+    def _build_synthetic_history(
+        stats: GcompiFamilyStats,
+        items: List[str],
+        initial_P: List[List[float]],
+        final_P: List[List[float]],
+        gcompi_initial: float,
+        history: Optional[List[AemComIterationRecord]] = None,
+    ) -> List[AemComIterationRecord]:
+        """
+        История в формате жадного цикла: по одной записи на каждую изменённую пару.
+        history - уже накопленные записи (продолжение расчёта), новые дописываются в конец
+        """
+        n = len(items)
+        P = [row[:] for row in initial_P]
+        trial = GcompiTrial(stats, P)
+        gcompi_value = gcompi_initial
+        if history is None:
+            history = []
+
+        for r in range(n):
+            for s in range(r + 1, n):
+                old_val = P[r][s]
+                new_val = final_P[r][s]
+                if new_val == old_val and P[s][r] == final_P[s][r]:
+                    continue
+
+                t_rs = new_val / old_val
+                gcompi_value += trial.delta(r, s, t_rs)
+                trial.commit(r, s, new_val)
+
+                history.append(
+                    AemComIterationRecord(
+                        iteration=len(history) + 1,
+                        pair_indices=(r, s),
+                        pair_items=(items[r], items[s]),
+                        t_rs=t_rs,
+                        old_value=old_val,
+                        new_value=new_val,
+                        gcompi_value=gcompi_value,
+                    )
+                )
+
+        return history
+
+    def _permissible_step(
+        self,
+        P: List[List[float]],
+        r_star: int,
+        s_star: int,
+        q_rs: float,
+        log_q_rs: float,
+    ) -> Tuple[int, int, float, float, float]:
+        """Допустимый шаг для пары (r*, s*): (r, s, t_rs, старое P[r][s], новое P[r][s])"""
+        n = len(P)
+
+        if P[r_star][s_star] > 1.0:
+            r = r_star
+            s = s_star
+        else:
+            r = s_star
+            s = r_star
+
+        if q_rs <= 0.0:
+            t_star = 1.0
+        else:
+            t_star = q_rs ** (-n / 2.0)
+
+        if log_q_rs < 0.0:
+            t_rs = min(1.0 + self._rho, t_star)
+        elif log_q_rs > 0.0:
+            t_bound = 1.0 / (1.0 + self._rho) if (1.0 + self._rho) != 0.0 else 1.0
+            t_rs = max(t_bound, t_star)
+        else:
+            t_rs = 1.0
+
+        old_val = P[r][s]
+        new_val = old_val * t_rs
+
+        lower = 1.0 / 9.0
+        upper = 9.0
+        if new_val < lower:
+            new_val = lower
+        if new_val > upper:
+            new_val = upper
+
+        return r, s, t_rs, old_val, new_val
+
+    def _select_best_gain(
+        self,
+        J: List[Tuple[int, int]],
+        P: List[List[float]],
+        q_values: Dict[Tuple[int, int], float],
+        log_q_values: Dict[Tuple[int, int], float],
+        trial: GcompiTrial,
+    ) -> Tuple[Tuple[int, int], float]:
+        """Пара с наибольшим точным уменьшением GCOMPI за допустимый шаг: O(1) на пару, O(n^2) на итерацию"""
+        best_pair = J[0]
+        best_delta = math.inf
+
+        for pair in J:
+            r, s, _, old_val, new_val = self._permissible_step(
+                P, pair[0], pair[1], q_values[pair], log_q_values[pair]
+            )
+            delta = trial.delta(r, s, new_val / old_val)
+            if delta < best_delta:
+                best_delta = delta
+                best_pair = pair
+
+        return best_pair, best_delta
+
+    def _family_gcompi(
+        self,
+        family_matrices: List[List[List[float]]],
+        expert_weights: List[float],
+        stats: Optional[GcompiFamilyStats],
+        u: List[float],
+    ) -> float:
+        perf = self._perf
+        if perf is not None:
+            t0 = time.perf_counter()
+
+        if stats is not None:
+            value = self._gcompi.gcompi_from_stats(stats, u)
+        else:
+            value = self._gcompi.gcompi_family(family_matrices, expert_weights, u)
+
+        if perf is not None:
+            perf.add_time(AemComPerformance.PHASE_GCOMPI, time.perf_counter() - t0)
+            perf.count(AemComPerformance.COUNTER_GCOMPI)
+        return value
+
+    def _priorities(self, P: List[List[float]]) -> List[float]:
+        perf = self._perf
+        if perf is None:
+            return self._math.compute_priority_vector(P)
+
+        t0 = time.perf_counter()
+        v = self._math.compute_priority_vector(P)
+        perf.add_time(AemComPerformance.PHASE_PRIORITIES, time.perf_counter() - t0)
+        perf.count(AemComPerformance.COUNTER_PRIORITIES)
+        return v
+
+    def _aij(self, matrices: List[List[List[float]]], expert_weights: List[float]) -> List[List[float]]:
+        """AIJ из кэша контекста: тот же, что у AHP.solve, и один на P0 и w_G уровня (изменять нельзя)"""
+        aggregation = self._context.aggregation
+        perf = self._perf
+        if perf is None:
+            return aggregation.aij(self._level, matrices, expert_weights, self._active_backend)
+
+        t0 = time.perf_counter()
+        aij = aggregation.aij(self._level, matrices, expert_weights, self._active_backend)
+        perf.add_time(AemComPerformance.PHASE_AIJ_BUILD, time.perf_counter() - t0)
+        return aij
+
+    def _is_converged(self, gcompi_current: float, gcompi_min: float) -> bool:
+        gap = gcompi_current - gcompi_min
+        return gap <= self._abs_tol or gap <= self._rel_tol * abs(gcompi_min)
+
     def _build_initial_matrix(
         self,
         matrices: List[List[List[float]]],
@@ -383,7 +991,7 @@ class AemCom:
             return [row[:] for row in provided_matrix]
 
         if mode == "aij":
-            return self._build_aij_matrix(matrices, expert_weights)
+            return [row[:] for row in self._aij(matrices, expert_weights)]
 
         n = len(items)
 
@@ -397,4 +1005,4 @@ class AemCom:
         if mode == "identity":
             return [[1.0 for _ in range(n)] for _ in range(n)]
 
-        return self._build_aij_matrix(matrices, expert_weights)
+        return [row[:] for row in self._aij(matrices, expert_weights)]
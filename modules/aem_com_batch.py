@@ -0,0 +1,321 @@
+from __future__ import annotations
+
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # numpy не обязателен: без него задачи решаются по одной
+    np = None
+
+from modules.aem_com import AemCom
+from modules.backends import NumpyBackend
+
+from entities import (
+    AemComCheckpoint,
+    AemComIterationRecord,
+    AemComProblem,
+    AemComRunResult,
+)
+
+
+class AemComBatch(AemCom):
+    """
+    Пакетный AEM-COM для множества независимых задач (Монте-Карло и т.п.)
+
+    Задачи одного размера n складываются в массивы (B, K, n, n) и решаются в lockstep:
+    выбор пары, допустимый шаг, пересчёт приоритетов и GCOMPI выполняются сразу для всех
+    задач, закончившие задачи исключаются маской. Настройки берутся из контекста,
+    как у AemCom; результат по каждой задаче совпадает со скалярным AemCom.run_problem
+    (с точностью до округления)
+
+    Lockstep поддержан для engine="greedy" и selection="max_log_q". В остальных случаях,
+    для n <= 2 и без numpy задачи решаются скалярным движком
+    """
+
+    def run_batch(self, problems: List[AemComProblem]) -> List[AemComRunResult]:
+        results: List[Optional[AemComRunResult]] = [None] * len(problems)
+        groups: Dict[int, List[int]] = {}
+
+        lockstep = (
+            np is not None
+            and self._engine == self.ENGINE_GREEDY
+            and self._selection == self.SELECTION_MAX_LOG_Q
+        )
+
+        for idx, problem in enumerate(problems):
+            n = len(problem.items)
+            if not lockstep or n <= 2:
+                results[idx] = self.run_problem(problem)
+            else:
+                groups.setdefault(n, []).append(idx)
+
+        for n, indices in groups.items():
+            for idx in indices:
+                for observer in self._observers:
+                    observer.on_level_start(problems[idx])
+
+            batch_results = self._run_lockstep([problems[i] for i in indices])
+            for idx, res in zip(indices, batch_results):
+                if self._expert_compatibility:
+                    self._attach_compatibility(problems[idx], res)
+                # в lockstep фазы отдельных задач не разделяются: остаются замеры подготовки
+                res.performance = problems[idx].performance
+                # family_hash - по тем же правилам, что в run_problem: результат можно продолжить from_result
+                res.family_hash = problems[idx].family_hash
+                if not res.family_hash and self._wants_family_hash(None):
+                    res.family_hash = self._family_hash(problems[idx])
+                for observer in self._observers:
+                    observer.on_level_finished(problems[idx], res)
+                results[idx] = res
+
+        return [res for res in results if res is not None]
+
+    def _run_lockstep(self, problems: List[AemComProblem]) -> List[AemComRunResult]:
+        B = len(problems)
+        n = len(problems[0].items)
+        K = max(len(p.family_matrices) for p in problems)
+
+        # семейства: ln A_k и нормированные веса, недостающие эксперты - с нулевым весом
+        LA = np.zeros((B, K, n, n))
+        alpha = np.zeros((B, K))
+        for b, problem in enumerate(problems):
+            k_b = len(problem.family_matrices)
+            A = np.asarray(problem.family_matrices, dtype=float)
+            LA[b, :k_b] = np.log(np.where(A > 0.0, A, 1.0))
+            w = np.maximum(np.asarray(problem.expert_weights, dtype=float), 0.0)
+            w_sum = w.sum()
+            alpha[b, :k_b] = w / w_sum if w_sum > 0.0 else 1.0 / k_b
+
+        M = np.einsum("bk,bkij->bij", alpha, LA)
+        S = np.einsum("bk,bkij->b", alpha, LA * LA)
+        D = M.sum(axis=2) - M.sum(axis=1)
+        denom = float((n - 1) * (n - 2))
+
+        def log_priorities(logP):
+            g = logP.mean(axis=2)
+            return g - np.log(np.exp(g).sum(axis=1, keepdims=True))
+
+        P = np.array([p.initial_matrix for p in problems], dtype=float)
+
+        x0 = log_priorities(np.log(P))
+        xG = log_priorities(M)
+        gcompi_initial = self._gcompi_from_log(x0, S, D, denom)
+        gcompi_min = self._gcompi_from_log(xG, S, D, denom)
+
+        x = x0.copy()
+        gcompi_current = gcompi_initial.copy()
+
+        J = np.broadcast_to(np.triu(np.ones((n, n), dtype=bool), 1), (B, n, n)).copy()
+        iterations = np.zeros(B, dtype=int)
+        stall_count = np.zeros(B, dtype=int)
+        drift = np.zeros(B)
+        reasons = [AemComRunResult.TERMINATION_PAIRS_EXHAUSTED] * B
+        histories: List[List[AemComIterationRecord]] = [[] for _ in range(B)]
+        checkpoints: List[List[AemComCheckpoint]] = [[] for _ in range(B)]
+        reciprocal_fixes: List[List[Tuple[int, int, int]]] = [[] for _ in range(B)]
+        rejected_pairs: List[List[Tuple[int, int]]] = [[] for _ in range(B)]
+
+        gap = gcompi_current - gcompi_min
+        converged = (gap <= self._abs_tol) | (gap <= self._rel_tol * np.abs(gcompi_min))
+        for b in np.nonzero(converged)[0]:
+            reasons[b] = AemComRunResult.TERMINATION_CONVERGED_INITIAL
+        active = ~converged
+
+        t_up = 1.0 + self._rho
+        t_down = 1.0 / t_up if t_up != 0.0 else 1.0
+        observers = self._observers
+
+        while True:
+            exhausted = active & ~J.any(axis=(1, 2))
+            active &= ~exhausted
+
+            maxed = active & (iterations >= self._max_iterations)
+            for b in np.nonzero(maxed)[0]:
+                reasons[b] = AemComRunResult.TERMINATION_MAX_ITERATIONS
+            active &= ~maxed
+
+            if observers and self._cancel_requested():
+                for b in np.nonzero(active)[0]:
+                    reasons[b] = AemComRunResult.TERMINATION_CANCELLED
+                break
+
+            idx = np.nonzero(active)[0]
+            if idx.size == 0:
+                break
+
+            xa = x[idx]
+            xg = xG[idx]
+            log_q = (xa[:, :, None] - xa[:, None, :]) - (xg[:, :, None] - xg[:, None, :])
+            score = np.where(J[idx], np.abs(log_q), -1.0).reshape(idx.size, -1)
+            flat = score.argmax(axis=1)
+            best = score[np.arange(idx.size), flat]
+
+            no_dev = best <= 0.0
+            for b in idx[no_dev]:
+                reasons[b] = AemComRunResult.TERMINATION_NO_DEVIATION
+            active[idx[no_dev]] = False
+
+            keep = ~no_dev
+            idx = idx[keep]
+            if idx.size == 0:
+                continue
+            flat = flat[keep]
+            log_q_rs = log_q.reshape(log_q.shape[0], -1)[np.nonzero(keep)[0], flat]
+
+            r_star, s_star = np.divmod(flat, n)
+            swap = ~(P[idx, r_star, s_star] > 1.0)
+            r = np.where(swap, s_star, r_star)
+            s = np.where(swap, r_star, s_star)
+
+            t_star = np.exp(-n / 2.0 * log_q_rs)
+            t_rs = np.where(
+                log_q_rs < 0.0,
+                np.minimum(t_up, t_star),
+                np.where(log_q_rs > 0.0, np.maximum(t_down, t_star), 1.0),
+            )
+
+            old_val = P[idx, r, s]
+            new_val = np.clip(old_val * t_rs, 1.0 / 9.0, 9.0)
+
+            J[idx, r_star, s_star] = False
+
+            if self._strict_decrease:
+                delta = self._lockstep_delta(P, D, idx, r, s, new_val, denom)
+                reject = drift[idx] + delta >= 0.0
+                for b, rr, ss in zip(idx[reject], r_star[reject], s_star[reject]):
+                    rejected_pairs[b].append((int(rr), int(ss)))
+
+                if observers and reject.any():
+                    predicted = gcompi_current[idx] + drift[idx] + delta
+                    for pos in np.nonzero(reject)[0]:
+                        b = idx[pos]
+                        items = problems[b].items
+                        rr = int(r[pos])
+                        ss = int(s[pos])
+                        rejected = AemComIterationRecord(
+                            iteration=int(iterations[b]) + 1,
+                            pair_indices=(rr, ss),
+                            pair_items=(items[rr], items[ss]),
+                            t_rs=float(t_rs[pos]),
+                            old_value=float(old_val[pos]),
+                            new_value=float(new_val[pos]),
+                            gcompi_value=float(predicted[pos]),
+                        )
+                        for observer in observers:
+                            observer.on_iteration_rejected(rejected)
+
+                fix = reject & (P[idx, s, r] != 1.0 / old_val)
+                if fix.any():
+                    # отклонённая пара, как и в скалярном движке, приводится к взаимно обратному виду
+                    f_idx = idx[fix]
+                    drift[f_idx] += self._lockstep_delta(P, D, f_idx, r[fix], s[fix], old_val[fix], denom)
+                    P[f_idx, s[fix], r[fix]] = 1.0 / old_val[fix]
+                    for b, rr, ss in zip(f_idx, r[fix], s[fix]):
+                        reciprocal_fixes[b].append((int(iterations[b]), int(rr), int(ss)))
+
+                accept = ~reject
+                idx, r, s = idx[accept], r[accept], s[accept]
+                t_rs, old_val, new_val = t_rs[accept], old_val[accept], new_val[accept]
+                if idx.size == 0:
+                    continue
+                drift[idx] = 0.0
+
+            P[idx, r, s] = new_val
+            P[idx, s, r] = 1.0 / new_val
+
+            x[idx] = log_priorities(np.log(P[idx]))
+            gcompi_prev = gcompi_current[idx]
+            gcompi_new = self._gcompi_from_log(x[idx], S[idx], D[idx], denom)
+            gcompi_current[idx] = gcompi_new
+            iterations[idx] += 1
+
+            for pos, b in enumerate(idx):
+                items = problems[b].items
+                rr = int(r[pos])
+                ss = int(s[pos])
+                histories[b].append(
+                    AemComIterationRecord(
+                        iteration=int(iterations[b]),
+                        pair_indices=(rr, ss),
+                        pair_items=(items[rr], items[ss]),
+                        t_rs=float(t_rs[pos]),
+                        old_value=float(old_val[pos]),
+                        new_value=float(new_val[pos]),
+                        gcompi_value=float(gcompi_new[pos]),
+                    )
+                )
+                if self._checkpoint_every > 0 and iterations[b] % self._checkpoint_every == 0:
+                    checkpoints[b].append(AemComCheckpoint(iteration=int(iterations[b]), matrix=P[b].tolist()))
+                for observer in observers:
+                    observer.on_iteration_accepted(histories[b][-1])
+
+            gap = gcompi_new - gcompi_min[idx]
+            done = (gap <= self._abs_tol) | (gap <= self._rel_tol * np.abs(gcompi_min[idx]))
+            for b in idx[done]:
+                reasons[b] = AemComRunResult.TERMINATION_CONVERGED
+            active[idx[done]] = False
+
+            if self._stall_patience > 0:
+                stalled = gcompi_prev - gcompi_new <= self._stall_tol * np.abs(gcompi_prev)
+                stall_count[idx] = np.where(stalled, stall_count[idx] + 1, 0)
+                over = idx[(stall_count[idx] >= self._stall_patience) & ~done]
+                for b in over:
+                    reasons[b] = AemComRunResult.TERMINATION_STALLED
+                active[over] = False
+
+        v0 = np.exp(x0)
+        v = np.exp(x)
+        wG = np.exp(xG)
+
+        results: List[AemComRunResult] = []
+        for b, problem in enumerate(problems):
+            results.append(
+                AemComRunResult(
+                    items=list(problem.items),
+                    initial_matrix=[row[:] for row in problem.initial_matrix],
+                    final_matrix=P[b].tolist(),
+                    initial_priorities=v0[b].tolist(),
+                    final_priorities=v[b].tolist(),
+                    group_priorities=wG[b].tolist(),
+                    gcompi_initial=float(gcompi_initial[b]),
+                    gcompi_final=float(gcompi_current[b]),
+                    gcompi_min=float(gcompi_min[b]),
+                    iterations=int(iterations[b]),
+                    history=histories[b],
+                    termination_reason=reasons[b],
+                    checkpoints=checkpoints[b],
+                    reciprocal_fixes=reciprocal_fixes[b],
+                    rejected_pairs=rejected_pairs[b],
+                    backend=NumpyBackend.name,
+                )
+            )
+
+        return results
+
+    @staticmethod
+    def _gcompi_from_log(x, S, D, denom: float):
+        """GCOMPI по ln v для набора задач, формула GcompiFamilyStats.numerator"""
+        n = x.shape[1]
+        s1 = x.sum(axis=1)
+        return (S - 2.0 * (x * D).sum(axis=1) + 2.0 * n * (x * x).sum(axis=1) - 2.0 * s1 * s1) / denom
+
+    @staticmethod
+    def _lockstep_delta(P, D, idx, r, s, new_val, denom: float):
+        """Изменение GCOMPI после P[r][s] = new_val (и обратного элемента) для задач idx, как в GcompiTrial"""
+        n = P.shape[1]
+        x = np.log(P[idx]).sum(axis=2) / n
+        rows = np.arange(idx.size)
+
+        d_r = (np.log(new_val) - np.log(P[idx, r, s])) / n
+        d_s = (-np.log(new_val) - np.log(P[idx, s, r])) / n
+
+        x_r = x[rows, r]
+        x_s = x[rows, s]
+        s1 = x.sum(axis=1)
+        s1_new = s1 + d_r + d_s
+
+        d_s2 = 2.0 * x_r * d_r + d_r * d_r + 2.0 * x_s * d_s + d_s * d_s
+        d_sd = d_r * D[idx, r] + d_s * D[idx, s]
+
+        delta = -2.0 * d_sd + 2.0 * n * d_s2 - 2.0 * (s1_new * s1_new - s1 * s1)
+        return np.where((d_r == 0.0) & (d_s == 0.0), 0.0, delta) / denom
@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+from typing import List, Optional
+
+from modules.aem_com import AemCom
+from modules.aem_com_session import _LevelAggregate, _level_rows
+from modules.backends import ComputeBackend
+from modules.context import Context
+from modules.gcompi import GcompiCalculator
+from modules.math import Math
+
+from entities import (
+    PairwiseMatrix,
+    ExpertInfluenceRecord,
+    LevelInfluenceResult,
+)
+
+
+class AemComInfluence(AemCom):
+    """
+    Анализ влияния экспертов (leave-one-expert-out).
+
+    Семейство уровня один раз сворачивается в суммы логарифмов (как в AemComSession),
+    после чего вклад каждого эксперта вычитается из них за O(n^2): AIJ, w_G и gcompi_min
+    без эксперта получаются без пересборки семейства. При run_aem_com=True для каждого
+    исключённого эксперта дополнительно выполняется AEM-COM по тем же агрегатам
+    """
+
+    def __init__(
+        self,
+        context: Context,
+        ahp_math: Optional[Math] = None,
+        gcompi: Optional[GcompiCalculator] = None,
+        permissibility: Optional[float] = None,
+        max_iterations: Optional[int] = None,
+        run_aem_com: bool = False,
+        backend: Optional[ComputeBackend] = None,
+    ) -> None:
+        super().__init__(
+            context,
+            ahp_math=ahp_math,
+            gcompi=gcompi,
+            permissibility=permissibility,
+            max_iterations=max_iterations,
+            backend=backend,
+        )
+        self._with_runs = run_aem_com
+
+    def analyze_criteria_level(self) -> LevelInfluenceResult:
+        matrices = self._context.group_model.pairwise_matrices.criteria_level
+
+        if not matrices:
+            raise ValueError("Нет матриц уровня критериев (criteria_level).")
+
+        return self._analyze_level(matrices, criterion_id=None)
+
+    def analyze_alternative_level(self, criterion_id: str) -> LevelInfluenceResult:
+        all_mats = self._context.group_model.pairwise_matrices.alternative_level
+        matrices = [m for m in all_mats if m.criterion_id == criterion_id]
+
+        if not matrices:
+            raise ValueError(f"Нет матриц альтернатив для критерия '{criterion_id}'.")
+
+        return self._analyze_level(matrices, criterion_id=criterion_id)
+
+    def analyze_full(self) -> List[LevelInfluenceResult]:
+        """Таблицы влияния по уровням из settings.aem_com.apply_to"""
+        group_model = self._context.group_model
+        apply_to = group_model.settings.aem_com.apply_to
+
+        results: List[LevelInfluenceResult] = []
+
+        if "criteria" in apply_to:
+            results.append(self.analyze_criteria_level())
+
+        if "alternatives_by_criterion" in apply_to:
+            for criterion in group_model.model.criteria:
+                results.append(self.analyze_alternative_level(criterion.id))
+
+        return results
+
+    def _analyze_level(
+            self,
+            matrices: List[PairwiseMatrix],
+            criterion_id: Optional[str],
+    ) -> LevelInfluenceResult:
+        items = matrices[0].items
+        weights_by_id = {e.id: e.weight for e in self._context.group_model.experts}
+
+        # матрицы с другим порядком элементов переставляются в порядок уровня, как в AemComSession
+        family_rows = [_level_rows(m, items) for m in matrices]
+
+        level = _LevelAggregate(items)
+        for m, rows in zip(matrices, family_rows):
+            level.add(m.expert_id or "", rows, weights_by_id.get(m.expert_id, 0.0))
+
+        stats, aij = level.stats()
+        wG = self._math.compute_priority_vector(aij)
+        gcompi_min = self._gcompi.gcompi_from_stats(stats, wG)
+
+        provided = None
+        if self._with_runs:
+            provided = self._get_provided_collective_matrix(criterion_id=criterion_id, items=items)
+
+        # без единственного эксперта уровень пуст - таблица остаётся пустой
+        records: List[ExpertInfluenceRecord] = []
+        held_out = list(level.experts.items()) if len(level.experts) > 1 else []
+
+        for expert_id, (_, _, w) in held_out:
+            stats_k, aij_k = level.stats_without(expert_id)
+            wG_k = self._math.compute_priority_vector(aij_k)
+            gcompi_min_k = self._gcompi.gcompi_from_stats(stats_k, wG_k)
+
+            run = None
+            if self._with_runs:
+                rest = [i for i, m in enumerate(matrices) if (m.expert_id or "") != expert_id]
+                family = [family_rows[i] for i in rest]
+                alpha = [max(weights_by_id.get(matrices[i].expert_id, 0.0), 0.0) for i in rest]
+                if (self._initial_mode or "aij").lower() == "aij":
+                    initial_P = [row[:] for row in aij_k]
+                else:
+                    initial_P = self._build_initial_matrix(
+                        matrices=family,
+                        expert_weights=alpha,
+                        items=items,
+                        provided_matrix=provided,
+                    )
+                run = self._run_aem_com(
+                    family_matrices=family,
+                    expert_weights=alpha,
+                    items=items,
+                    initial_P=initial_P,
+                    family_stats=stats_k,
+                    aij_matrix=aij_k,
+                )
+
+            records.append(
+                ExpertInfluenceRecord(
+                    expert_id=expert_id,
+                    weight=w / level.weight_total if level.has_weight else 1.0 / level.count,
+                    group_priorities=list(wG_k),
+                    gcompi_min=gcompi_min_k,
+                    gcompi_min_delta=gcompi_min - gcompi_min_k,
+                    priority_shift=max(abs(a - b) for a, b in zip(wG, wG_k)),
+                    run=run,
+                )
+            )
+
+        return LevelInfluenceResult(
+            level="criteria" if criterion_id is None else "alternatives",
+            criterion_id=criterion_id,
+            items=list(items),
+            group_priorities=list(wG),
+            gcompi_min=gcompi_min,
+            experts=records,
+        )
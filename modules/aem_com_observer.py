@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import json
+from dataclasses import asdict
+from typing import Callable
+
+from entities import AemComIterationRecord, AemComProblem, AemComRunResult
+
+
+class AemComObserver:
+    """
+    Наблюдатель AEM-COM (AemCom.add_observer). Все методы по умолчанию ничего не делают.
+
+    Записи итераций - те же AemComIterationRecord, что попадают в history; для отклонённого
+    шага gcompi_value - GCOMPI, который получился бы после него. cancel() просит движок
+    остановиться после ближайшего события итерации (termination_reason="cancelled")
+    и не начинать следующие уровни run_full
+    """
+
+    def __init__(self) -> None:
+        self.cancel_requested = False
+
+    def cancel(self) -> None:
+        self.cancel_requested = True
+
+    def on_level_start(self, problem: AemComProblem) -> None:
+        pass
+
+    def on_iteration_accepted(self, record: AemComIterationRecord) -> None:
+        pass
+
+    def on_iteration_rejected(self, record: AemComIterationRecord) -> None:
+        pass
+
+    def on_level_finished(self, problem: AemComProblem, run: AemComRunResult) -> None:
+        pass
+
+
+class AemComStreamObserver(AemComObserver):
+    """
+    Поток событий в виде строк JSON (по одной на событие) через write:
+    print, file.write, обёртка над socket.sendall и т.п.
+    """
+
+    def __init__(self, write: Callable[[str], object]) -> None:
+        super().__init__()
+        self._write = write
+
+    def _emit(self, event: str, **fields) -> None:
+        self._write(json.dumps({"event": event, **fields}, ensure_ascii=False) + "\n")
+
+    def on_level_start(self, problem: AemComProblem) -> None:
+        self._emit("level_start", criterion_id=problem.criterion_id, items=problem.items)
+
+    def on_iteration_accepted(self, record: AemComIterationRecord) -> None:
+        self._emit("iteration_accepted", **asdict(record))
+
+    def on_iteration_rejected(self, record: AemComIterationRecord) -> None:
+        self._emit("iteration_rejected", **asdict(record))
+
+    def on_level_finished(self, problem: AemComProblem, run: AemComRunResult) -> None:
+        self._emit(
+            "level_finished",
+            criterion_id=problem.criterion_id,
+            iterations=run.iterations,
+            gcompi_initial=run.gcompi_initial,
+            gcompi_final=run.gcompi_final,
+            gcompi_min=run.gcompi_min,
+            termination_reason=run.termination_reason,
+        )
@@ -0,0 +1,213 @@
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Iterator, List, Optional, Sequence, Union
+
+from modules.aem_com import AemCom
+from modules.aem_com_observer import AemComObserver
+from modules.backends import BackendRegistry, ComputeBackend
+from modules.context import Context
+from modules.shared_family import SharedFamilyBlock, SharedFamilyHandle, SharedFamilyView
+
+from entities import (
+    AemComPerformance,
+    AemComProblem,
+    AemComRunResult,
+    AlternativeLevelAemComResult,
+    CriteriaLevelAemComResult,
+    GroupAhpModel,
+    Model,
+    PairwiseMatrices,
+    Problem,
+    Settings,
+)
+
+
+@dataclass
+class SharedLevelTask:
+    """
+    Задача уровня для процесса-исполнителя: семейство передаётся только именем блока
+    общей памяти, остальное - O(n^2) (items, P0) и настройки
+    """
+
+    family: SharedFamilyHandle
+    items: List[str]
+    initial_matrix: List[List[float]]
+    settings: Settings
+    backend: str
+    permissibility: float
+    max_iterations: int
+    criterion_id: Optional[str] = None
+    expert_ids: List[str] = field(default_factory=list)
+    performance: Optional[AemComPerformance] = None
+    previous: Optional[AemComRunResult] = None
+    family_hash: str = ""
+
+
+def _solve_level(task: SharedLevelTask) -> AemComRunResult:
+    """Точка входа исполнителя: подключиться к блоку, решить уровень, отпустить блок"""
+    view = SharedFamilyView(task.family)
+    try:
+        return _run_attached(view, task)
+    except Exception as e:
+        # кадры трассировки держат представления блока - без них блок закрывается сразу
+        raise e.with_traceback(None)
+    finally:
+        view.close()
+
+
+def _run_attached(view: SharedFamilyView, task: SharedLevelTask) -> AemComRunResult:
+    group_model = GroupAhpModel(
+        problem=Problem(id="", name="", description="", goal=""),
+        experts=[],
+        model=Model(criteria=[], alternatives=[]),
+        settings=task.settings,
+        pairwise_matrices=PairwiseMatrices(),
+    )
+    solver = AemCom(
+        Context(group_model=group_model),
+        permissibility=task.permissibility,
+        max_iterations=task.max_iterations,
+        backend=BackendRegistry.create(task.backend),
+    )
+    problem = AemComProblem(
+        items=task.items,
+        family_matrices=view.matrices,
+        expert_weights=view.weights,
+        initial_matrix=task.initial_matrix,
+        criterion_id=task.criterion_id,
+        expert_ids=task.expert_ids,
+        performance=task.performance,
+        family_hash=task.family_hash,
+    )
+    return solver.run_problem(problem, previous=task.previous)
+
+
+class AemComPool(AemCom):
+    """
+    AEM-COM с уровнями в пуле процессов (concurrent.futures.ProcessPoolExecutor).
+
+    Уровни готовятся в этом процессе (prepare_*), семейство и веса каждого уровня один раз
+    копируются в блок общей памяти (SharedFamilyBlock), исполнитель получает SharedLevelTask
+    и подключается к блоку по имени только для чтения - GroupAhpModel не сериализуется.
+    Блоки удаляются в finally: и при ошибке уровня, и при падении исполнителя (BrokenProcessPool),
+    и при досрочном закрытии iter_run_full.
+
+    Бэкенд передаётся исполнителю по имени из BackendRegistry (при --backend auto - выбранный
+    для n и K). Наблюдатели получают события уровня в этом процессе: on_level_start - при отправке
+    уровня исполнителю, on_level_finished - по мере готовности уровней (в порядке уровней).
+    События итераций из исполнителей не передаются, поэтому наблюдатель с
+    on_iteration_accepted / on_iteration_rejected не принимается (ValueError); cancel()
+    прекращает отправку и выдачу уровней, ещё не начатые уровни отменяются
+    """
+
+    def __init__(
+        self,
+        context: Context,
+        processes: Optional[int] = None,
+        permissibility: Optional[float] = None,
+        max_iterations: Optional[int] = None,
+        backend: Optional[ComputeBackend] = None,
+    ) -> None:
+        super().__init__(context, permissibility=permissibility, max_iterations=max_iterations, backend=backend)
+        if processes is not None and processes < 1:
+            raise ValueError("processes must be >= 1")
+        self._processes = processes
+
+    def add_observer(self, observer: AemComObserver) -> None:
+        if self._observes_iterations(observer):
+            raise ValueError(
+                "AemComPool не передаёт события итераций из процессов (on_iteration_accepted / "
+                "on_iteration_rejected): доступны только события уровня."
+            )
+        super().add_observer(observer)
+
+    def run_problems(
+        self,
+        problems: Sequence[AemComProblem],
+        previous: Optional[Sequence[Optional[AemComRunResult]]] = None,
+    ) -> List[AemComRunResult]:
+        return list(self._iter_pool(problems, previous))
+
+    def iter_run_full(self) -> Iterator[Union[CriteriaLevelAemComResult, AlternativeLevelAemComResult]]:
+        group_model = self._context.group_model
+        apply_to = group_model.settings.aem_com.apply_to
+
+        levels: List[Optional[str]] = []
+        if "criteria" in apply_to:
+            levels.append(None)
+        if "alternatives_by_criterion" in apply_to:
+            levels.extend(c.id for c in group_model.model.criteria)
+
+        problems = [
+            self.prepare_criteria_level() if c_id is None else self.prepare_alternative_level(c_id)
+            for c_id in levels
+        ]
+        previous = [self._previous_run_for(c_id) for c_id in levels]
+
+        runs = self._iter_pool(problems, previous)
+        try:
+            for c_id, run in zip(levels, runs):
+                if c_id is None:
+                    yield CriteriaLevelAemComResult(level="criteria", run=run)
+                    continue
+                yield AlternativeLevelAemComResult(level="alternatives", criterion_id=c_id, run=run)
+                if self._observers and self._cancel_requested():
+                    return
+        finally:
+            runs.close()
+
+    def _iter_pool(
+        self,
+        problems: Sequence[AemComProblem],
+        previous: Optional[Sequence[Optional[AemComRunResult]]] = None,
+    ) -> Iterator[AemComRunResult]:
+        if previous is None:
+            previous = [None] * len(problems)
+
+        blocks: List[SharedFamilyBlock] = []
+        try:
+            tasks = []
+            for problem, prev in zip(problems, previous):
+                block = SharedFamilyBlock(problem.family_matrices, problem.expert_weights)
+                blocks.append(block)
+                backend = self._select_backend(len(problem.items), len(problem.family_matrices))
+                # хэш - здесь, по исходным буферам: исполнителю он уже не нужен
+                family_hash = problem.family_hash
+                if not family_hash and self._wants_family_hash(prev):
+                    family_hash = self._family_hash(problem)
+                tasks.append(SharedLevelTask(
+                    family=block.handle,
+                    items=list(problem.items),
+                    initial_matrix=problem.initial_matrix,
+                    settings=self._context.group_model.settings,
+                    backend=backend.name,
+                    permissibility=self._rho,
+                    max_iterations=self._max_iterations,
+                    criterion_id=problem.criterion_id,
+                    expert_ids=list(problem.expert_ids),
+                    performance=problem.performance,
+                    previous=prev,
+                    family_hash=family_hash,
+                ))
+
+            pool = ProcessPoolExecutor(max_workers=self._processes)
+            try:
+                futures = []
+                for problem, task in zip(problems, tasks):
+                    for observer in self._observers:
+                        observer.on_level_start(problem)
+                    futures.append(pool.submit(_solve_level, task))
+                    if self._observers and self._cancel_requested():
+                        break
+                for problem, future in zip(problems, futures):
+                    run = future.result()
+                    for observer in self._observers:
+                        observer.on_level_finished(problem, run)
+                    yield run
+            finally:
+                pool.shutdown(wait=True, cancel_futures=True)
+        finally:
+            for block in blocks:
+                block.release()
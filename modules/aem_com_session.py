@@ -0,0 +1,369 @@
+from __future__ import annotations
+
+import math
+import time
+from typing import Dict, List, Optional, Tuple
+
+from modules.aem_com import AemCom
+from modules.backends import ComputeBackend
+from modules.context import Context
+from modules.gcompi import GcompiCalculator, GcompiFamilyStats
+from modules.math import Math
+
+from entities import (
+    Expert,
+    PairwiseMatrix,
+    AemComPerformance,
+    AemComProblem,
+    AemComRunResult,
+    CriteriaLevelAemComResult,
+    AlternativeLevelAemComResult,
+)
+
+
+class _LevelAggregate:
+    """
+    Взвешенные суммы логарифмов одного уровня МПС:
+        L_ij = sum_k w_k ln a_kij,  Q = sum_k w_k sum_ij (ln a_kij)^2,  W = sum_k w_k
+    (и те же суммы без весов - на случай нулевой суммы весов, как в GcompiCalculator).
+    По ним AIJ = exp(L / W), а статистика GCOMPI - L / W и Q / W.
+
+    W ведётся сложением и вычитанием и после удаления всех весов остаётся шумом округления,
+    поэтому нулевая сумма весов определяется по счётчику экспертов с w_k > 0 (weighted);
+    когда он обнуляется, взвешенные суммы сбрасываются в точный ноль
+    """
+
+    # W не больше этого - считается нулевой суммой весов
+    WEIGHT_TOL = 1e-12
+
+    def __init__(self, items: List[str]) -> None:
+        n = len(items)
+        self.items = list(items)
+        self.n = n
+
+        self.log_sum = [[0.0] * n for _ in range(n)]
+        self.sq_sum = 0.0
+        self.weight_total = 0.0
+        self.weighted = 0
+
+        self.log_sum_plain = [[0.0] * n for _ in range(n)]
+        self.sq_sum_plain = 0.0
+        self.count = 0
+
+        # expert_id -> (ln A_k, sum (ln a_kij)^2, w_k)
+        self.experts: Dict[str, Tuple[List[List[float]], float, float]] = {}
+
+    def add(self, expert_id: str, matrix: List[List[float]], weight: float) -> None:
+        if len(matrix) != self.n or any(len(row) != self.n for row in matrix):
+            raise ValueError("Размер матрицы эксперта не совпадает с размером уровня.")
+
+        if expert_id in self.experts:
+            self.remove(expert_id)
+
+        log_m = [[math.log(v) if v > 0.0 else 0.0 for v in row] for row in matrix]
+        sq = sum(x * x for row in log_m for x in row)
+        w = max(weight, 0.0)
+
+        self._accumulate(log_m, sq, w, 1)
+        self.experts[expert_id] = (log_m, sq, w)
+
+    def remove(self, expert_id: str) -> None:
+        log_m, sq, w = self.experts.pop(expert_id)
+        self._accumulate(log_m, sq, w, -1)
+
+    def set_weight(self, expert_id: str, weight: float) -> None:
+        log_m, sq, w_old = self.experts[expert_id]
+        w_new = max(weight, 0.0)
+        dw = w_new - w_old
+        if dw == 0.0:
+            return
+
+        for i in range(self.n):
+            row = self.log_sum[i]
+            src = log_m[i]
+            for j in range(self.n):
+                row[j] += dw * src[j]
+        self.sq_sum += dw * sq
+        self.weight_total += dw
+        self.weighted += (w_new > 0.0) - (w_old > 0.0)
+        self.experts[expert_id] = (log_m, sq, w_new)
+        self._reset_if_unweighted()
+
+    def _accumulate(self, log_m: List[List[float]], sq: float, w: float, sign: int) -> None:
+        for i in range(self.n):
+            row = self.log_sum[i]
+            row_plain = self.log_sum_plain[i]
+            src = log_m[i]
+            for j in range(self.n):
+                row[j] += sign * w * src[j]
+                row_plain[j] += sign * src[j]
+        self.sq_sum += sign * w * sq
+        self.sq_sum_plain += sign * sq
+        self.weight_total += sign * w
+        self.weighted += sign * (w > 0.0)
+        self.count += sign
+        self._reset_if_unweighted()
+
+    def _reset_if_unweighted(self) -> None:
+        if self.weighted == 0:
+            self.log_sum = [[0.0] * self.n for _ in range(self.n)]
+            self.sq_sum = 0.0
+            self.weight_total = 0.0
+
+    def _has_weight(self, weighted: int, weight_total: float) -> bool:
+        return weighted > 0 and weight_total > self.WEIGHT_TOL
+
+    @property
+    def has_weight(self) -> bool:
+        """Сумма весов уровня ненулевая (иначе AIJ - невзвешенное среднее)"""
+        return self._has_weight(self.weighted, self.weight_total)
+
+    def mean_log(self) -> Tuple[List[List[float]], float]:
+        """(ln AIJ, Q / W) с нормированными весами"""
+        if self.has_weight:
+            W = self.weight_total
+            return [[x / W for x in row] for row in self.log_sum], self.sq_sum / W
+        if self.count == 0:
+            raise ValueError("Пустое семейство матриц для AIJ.")
+        c = float(self.count)
+        return [[x / c for x in row] for row in self.log_sum_plain], self.sq_sum_plain / c
+
+    def mean_log_without(self, expert_id: str) -> Tuple[List[List[float]], float]:
+        """То же, что mean_log, но без эксперта expert_id: O(n^2), агрегаты не меняются"""
+        log_m, sq, w = self.experts[expert_id]
+        W = self.weight_total - w
+
+        if self._has_weight(self.weighted - (w > 0.0), W):
+            return (
+                [[(x - w * y) / W for x, y in zip(row, src)] for row, src in zip(self.log_sum, log_m)],
+                (self.sq_sum - w * sq) / W,
+            )
+        if self.count <= 1:
+            raise ValueError(f"Без эксперта '{expert_id}' семейство матриц уровня пусто.")
+        c = float(self.count - 1)
+        return (
+            [[(x - y) / c for x, y in zip(row, src)] for row, src in zip(self.log_sum_plain, log_m)],
+            (self.sq_sum_plain - sq) / c,
+        )
+
+    def stats(self) -> Tuple[GcompiFamilyStats, List[List[float]]]:
+        return self._stats_from(*self.mean_log())
+
+    def stats_without(self, expert_id: str) -> Tuple[GcompiFamilyStats, List[List[float]]]:
+        return self._stats_from(*self.mean_log_without(expert_id))
+
+    def expert_stats(self) -> Tuple[List[str], List[GcompiFamilyStats]]:
+        """Статистики GCOMPI отдельных экспертов по сохранённым ln A_k"""
+        n = self.n
+        ids: List[str] = []
+        stats: List[GcompiFamilyStats] = []
+        for expert_id, (log_m, sq, _) in self.experts.items():
+            ids.append(expert_id)
+            stats.append(
+                GcompiFamilyStats(
+                    n=n,
+                    sq_sum=sq,
+                    row_log_sums=[sum(row) for row in log_m],
+                    col_log_sums=[sum(log_m[i][j] for i in range(n)) for j in range(n)],
+                )
+            )
+        return ids, stats
+
+    def _stats_from(self, mean_log: List[List[float]], sq: float) -> Tuple[GcompiFamilyStats, List[List[float]]]:
+        n = self.n
+        stats = GcompiFamilyStats(
+            n=n,
+            sq_sum=sq,
+            row_log_sums=[sum(row) for row in mean_log],
+            col_log_sums=[sum(mean_log[i][j] for i in range(n)) for j in range(n)],
+        )
+        aij = [[math.exp(x) for x in row] for row in mean_log]
+        return stats, aij
+
+
+def _level_rows(matrix: PairwiseMatrix, items: List[str]) -> List[List[float]]:
+    """
+    Матрица эксперта в порядке элементов уровня items: при другом порядке строки и столбцы
+    переставляются (копия), при том же - возвращается как есть
+    """
+    rows = matrix.matrix
+    if list(matrix.items) == list(items):
+        return rows
+
+    pos = {item: idx for idx, item in enumerate(matrix.items)}
+    missing = [item for item in items if item not in pos]
+    if missing or len(matrix.items) != len(items):
+        raise ValueError(
+            f"Элементы матрицы эксперта {matrix.expert_id} не совпадают с элементами уровня."
+        )
+    index_map = [pos[item] for item in items]
+    return [[rows[mi][mj] for mj in index_map] for mi in index_map]
+
+
+class AemComSession(AemCom):
+    """
+    Инкрементальный AEM-COM для экспертных оценок, поступающих по одной.
+
+    Для каждого уровня хранятся взвешенные суммы логарифмов матриц экспертов (то, на чём
+    строятся AIJ и GCOMPI), поэтому add_expert_matrix / update_expert_weight стоят O(n^2)
+    на уровень, а не пересборку всей панели. Повторный расчёт уровня стартует с итоговой P'
+    предыдущего расчёта (warm start), а не с initial_mode
+    """
+
+    def __init__(
+        self,
+        context: Context,
+        ahp_math: Optional[Math] = None,
+        gcompi: Optional[GcompiCalculator] = None,
+        permissibility: Optional[float] = None,
+        max_iterations: Optional[int] = None,
+        backend: Optional[ComputeBackend] = None,
+    ) -> None:
+        super().__init__(
+            context,
+            ahp_math=ahp_math,
+            gcompi=gcompi,
+            permissibility=permissibility,
+            max_iterations=max_iterations,
+            backend=backend,
+        )
+
+        self._levels: Dict[Optional[str], _LevelAggregate] = {}
+        self._warm: Dict[Optional[str], List[List[float]]] = {}
+
+        # (criterion_id, expert_id) -> позиция матрицы в списке уровня модели
+        self._positions: Dict[Tuple[Optional[str], Optional[str]], int] = {}
+
+        # expert_id -> Expert модели: обновления не обходят список экспертов
+        self._experts: Dict[str, Expert] = {e.id: e for e in self._context.group_model.experts}
+
+        matrices = self._context.group_model.pairwise_matrices
+        for pos, m in enumerate(matrices.criteria_level):
+            self._positions[(None, m.expert_id)] = pos
+            self._ingest(m, self._expert_weight(m.expert_id), level_key=None)
+        for pos, m in enumerate(matrices.alternative_level):
+            self._positions[(m.criterion_id, m.expert_id)] = pos
+            self._ingest(m, self._expert_weight(m.expert_id), level_key=m.criterion_id)
+
+    def add_expert_matrix(self, matrix: PairwiseMatrix, weight: Optional[float] = None) -> None:
+        """
+        Добавляет (или заменяет) матрицу эксперта. Неизвестный эксперт добавляется в модель
+        с весом weight; для известного weight, если задан, обновляет его вес
+        """
+        group_model = self._context.group_model
+        expert = self._experts.get(matrix.expert_id)
+
+        if expert is None:
+            if weight is None:
+                raise ValueError(f"Для нового эксперта '{matrix.expert_id}' нужно указать вес.")
+            expert = Expert(id=matrix.expert_id or "", name=matrix.expert_id or "", role="", weight=float(weight))
+            group_model.experts.append(expert)
+            self._experts[expert.id] = expert
+        elif weight is not None and weight != expert.weight:
+            self.update_expert_weight(expert.id, weight)
+
+        level_key = matrix.criterion_id
+        target = (
+            group_model.pairwise_matrices.alternative_level
+            if level_key is not None
+            else group_model.pairwise_matrices.criteria_level
+        )
+        key = (level_key, matrix.expert_id)
+        pos = self._positions.get(key)
+        if pos is None:
+            self._positions[key] = len(target)
+            target.append(matrix)
+        else:
+            target[pos] = matrix
+
+        self._ingest(matrix, self._expert_weight(matrix.expert_id), level_key=level_key)
+
+    def update_expert_weight(self, expert_id: str, weight: float) -> None:
+        expert = self._experts.get(expert_id)
+        if expert is None:
+            raise ValueError(f"Неизвестный эксперт '{expert_id}'.")
+
+        expert.weight = float(weight)
+        for level in self._levels.values():
+            if expert_id in level.experts:
+                level.set_weight(expert_id, expert.weight)
+
+    def run_on_criteria_level(self) -> CriteriaLevelAemComResult:
+        return CriteriaLevelAemComResult(
+            level="criteria",
+            run=self._run_level(None),
+        )
+
+    def run_on_alternative_level_for_criterion(
+            self,
+            criterion_id: str,
+    ) -> AlternativeLevelAemComResult:
+        return AlternativeLevelAemComResult(
+            level="alternatives",
+            criterion_id=criterion_id,
+            run=self._run_level(criterion_id),
+        )
+
+    def reset_warm_start(self) -> None:
+        self._warm.clear()
+
+    def _run_level(self, level_key: Optional[str]) -> AemComRunResult:
+        level = self._levels.get(level_key)
+        if level is None:
+            if level_key is None:
+                raise ValueError("Нет матриц уровня критериев (criteria_level).")
+            raise ValueError(f"Нет матриц альтернатив для критерия '{level_key}'.")
+
+        perf = AemComPerformance() if self._performance else None
+        if perf is not None:
+            t_start = time.perf_counter()
+
+        stats, aij = level.stats()
+        if perf is not None:
+            perf.add_time(AemComPerformance.PHASE_AIJ_BUILD, time.perf_counter() - t_start)
+
+        # для наблюдателей: семейство уровня хранится только в агрегатах
+        problem = AemComProblem(items=list(level.items), criterion_id=level_key, expert_ids=list(level.experts))
+        for observer in self._observers:
+            observer.on_level_start(problem)
+
+        initial_P = self._warm.get(level_key)
+        if initial_P is None:
+            if (self._initial_mode or "aij").lower() == "aij":
+                initial_P = [row[:] for row in aij]
+            elif level_key is None:
+                initial_P = self.prepare_criteria_level().initial_matrix
+            else:
+                initial_P = self.prepare_alternative_level(level_key).initial_matrix
+
+        self._perf = perf
+        run = self._run_aem_com(
+            family_matrices=[],
+            expert_weights=[],
+            items=level.items,
+            initial_P=initial_P,
+            family_stats=stats,
+            aij_matrix=aij,
+        )
+        self._warm[level_key] = [row[:] for row in run.final_matrix]
+        if self._expert_compatibility:
+            run.compatibility = self._build_compatibility(*level.expert_stats(), run)
+        self._perf = None
+        if perf is not None:
+            perf.add_time(AemComPerformance.PHASE_TOTAL, time.perf_counter() - t_start)
+            run.performance = perf
+        for observer in self._observers:
+            observer.on_level_finished(problem, run)
+        return run
+
+    def _ingest(self, matrix: PairwiseMatrix, weight: float, level_key: Optional[str]) -> None:
+        level = self._levels.get(level_key)
+        if level is None:
+            level = _LevelAggregate(matrix.items)
+            self._levels[level_key] = level
+
+        level.add(matrix.expert_id or "", _level_rows(matrix, level.items), weight)
+
+    def _expert_weight(self, expert_id: Optional[str]) -> float:
+        expert = self._experts.get(expert_id)
+        return expert.weight if expert is not None else 0.0
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from modules.backends import ComputeBackend
+
+
+class AggregationCache:
+    """
+    Агрегаты уровней, общие для AHP и AEM-COM одного Context: AIJ - взвешенное геометрическое
+    среднее матриц экспертов, exp(sum_k alpha_k ln a_ij^(k)). Считается бэкендом уровня
+    (pure - по элементам с таблицами ReciprocalMatrix / SaatyMatrix, numpy - одной свёрткой
+    логарифмов) один раз на семейство: AHP.solve и AemCom (P0 при initial_mode="aij" и w_G)
+    получают одну и ту же матрицу.
+
+    На уровень (criterion_id, None - критерии) хранится одна запись: исходные матрицы экспертов
+    (сравниваются по is), их перестановки в порядок уровня, веса и имя бэкенда. Другое семейство
+    того же уровня запись заменяет, поэтому кэш не растёт с числом расчётов. Матрицы экспертов
+    после загрузки не меняются на месте (AemComSession заменяет их новыми объектами), поэтому
+    сравнения по объектам достаточно. Возвращаемая матрица общая - изменять её нельзя
+    """
+
+    def __init__(self) -> None:
+        self._entries: Dict[Optional[str], Tuple[Tuple, Tuple, Tuple[float, ...], str, List[List[float]]]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def aij(
+        self,
+        level: Optional[str],
+        matrices: Sequence[List[List[float]]],
+        expert_weights: Sequence[float],
+        backend: ComputeBackend,
+        index_maps: Optional[Sequence[Optional[List[int]]]] = None,
+    ) -> List[List[float]]:
+        """
+        matrices - матрицы экспертов как загружены, index_maps - перестановка каждой в порядок
+        уровня (None - порядок тот же). Переставленные копии строятся только при промахе
+        """
+        maps = tuple(tuple(m) if m is not None else None for m in index_maps) if index_maps else (None,) * len(matrices)
+        weights = tuple(expert_weights)
+
+        entry = self._entries.get(level)
+        if (
+            entry is not None
+            and entry[3] == backend.name
+            and entry[2] == weights
+            and entry[1] == maps
+            and len(entry[0]) == len(matrices)
+            and all(a is b for a, b in zip(entry[0], matrices))
+        ):
+            self.hits += 1
+            return entry[4]
+
+        self.misses += 1
+        family = [m if index_map is None else self._remapped(m, index_map) for m, index_map in zip(matrices, maps)]
+        aij = backend.aij(family, list(weights))
+        self._entries[level] = (tuple(matrices), maps, weights, backend.name, aij)
+        return aij
+
+    @staticmethod
+    def _remapped(matrix: List[List[float]], index_map: Sequence[int]) -> List[List[float]]:
+        return [[matrix[mi][mj] for mj in index_map] for mi in index_map]
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -1,7 +1,9 @@
 from __future__ import annotations
 
-from typing import Dict, List, Optional
+from operator import mul
+from typing import Dict, List, Optional, Tuple
 
+from modules.backends import ComputeBackend, PureBackend
 from modules.context import Context
 from modules.math import Math
 
@@ -18,17 +20,32 @@ class AHP:
 
     Логика:
       - агрегирует матрицы экспертов по критериям и альтернативам
-        через взвешенное геометрическое среднее (Aij с весами экспертов)
+        через взвешенное геометрическое среднее (Aij с весами экспертов, Context.aggregation)
       - считает веса критериев и OS
       - считает локальные веса альтернатив по каждому критерию и OS
-      - считает итоговые глобальные веса альтернатив
+      - считает итоговые глобальные веса альтернатив (вектор весов критериев на матрицу
+        локальных весов критерии x альтернативы)
 
     На этом классе потом будет строиться AEM-COM
     """
 
-    def __init__(self, context: Context, math: Optional[Math] = None) -> None:
+    def __init__(
+        self,
+        context: Context,
+        math: Optional[Math] = None,
+        backend: Optional[ComputeBackend] = None,
+    ) -> None:
         self._context = context
-        self._math = math if math is not None else Math()
+        self._backend = backend if backend is not None else PureBackend()
+        # math, если передан, важнее бэкенда; иначе Math бэкенда выбирается по размеру уровня
+        self._fixed_math = math
+        self._math = math if math is not None else self._backend.math
+
+    def _select_backend(self, n: int, experts: int) -> ComputeBackend:
+        backend = self._backend.for_shape(n, experts)
+        if self._fixed_math is None:
+            self._math = backend.math
+        return backend
 
     def solve(self) -> AhpResult:
         group_model: GroupAhpModel = self._context.group_model
@@ -37,9 +54,12 @@ class AHP:
             e.id: e.weight for e in group_model.experts
         }
 
-        agg_criteria_matrix, crit_items = self._aggregate_criteria_level(
-            group_model=group_model,
-            expert_weights=expert_weights,
+        criteria_matrices = group_model.pairwise_matrices.criteria_level
+        if not criteria_matrices:
+            raise ValueError("В контексте нет матриц уровня критериев")
+
+        agg_criteria_matrix, crit_items, criteria_backend = self._aggregate_level(
+            None, criteria_matrices, expert_weights
         )
 
         criteria_weights_vec = self._math.compute_priority_vector(agg_criteria_matrix)
@@ -54,19 +74,22 @@ class AHP:
         alt_weights_by_criterion: Dict[str, Dict[str, float]] = {}
         alt_os_by_criterion: Dict[str, float] = {}
         alt_os_percent_by_criterion: Dict[str, float] = {}
+        alt_backend_by_criterion: Dict[str, str] = {}
 
         for criterion in group_model.model.criteria:
             c_id = criterion.id
 
-            agg_alt_matrix, alt_items = self._aggregate_alternative_level_for_criterion(
-                group_model=group_model,
-                expert_weights=expert_weights,
-                criterion_id=c_id,
-            )
-
-            if agg_alt_matrix is None or not alt_items:
+            matrices = [
+                m for m in group_model.pairwise_matrices.alternative_level
+                if m.criterion_id == c_id
+            ]
+            if not matrices or not matrices[0].items:
                 continue
 
+            agg_alt_matrix, alt_items, alt_backend_by_criterion[c_id] = self._aggregate_level(
+                c_id, matrices, expert_weights
+            )
+
             local_weights_vec = self._math.compute_priority_vector(agg_alt_matrix)
             alt_weights: Dict[str, float] = {
                 alt_items[i]: local_weights_vec[i]
@@ -91,93 +114,40 @@ class AHP:
             alt_consistency_os_by_criterion=alt_os_by_criterion,
             alt_consistency_percent_by_criterion=alt_os_percent_by_criterion,
             global_alt_weights=global_alt_weights,
+            criteria_backend=criteria_backend,
+            alt_backend_by_criterion=alt_backend_by_criterion,
         )
 
         return result
 
-    def _aggregate_criteria_level(
-        self,
-        group_model: GroupAhpModel,
-        expert_weights: Dict[str, float],
-    ) -> tuple[List[List[float]], List[str]]:
-        matrices: List[PairwiseMatrix] = group_model.pairwise_matrices.criteria_level
-
-        if not matrices:
-            raise ValueError("В контексте нет матриц уровня критериев")
-
-        base_items = matrices[0].items
-        n = len(base_items)
-
-        aggregated: List[List[float]] = [
-            [1.0 for _ in range(n)] for _ in range(n)
-        ]
-
-        total_weight = sum(max(expert_weights.get(m.expert_id, 0.0), 0.0) for m in matrices)
-        if total_weight == 0.0:
-            total_weight = float(len(matrices))
-
-        for m in matrices:
-            w_k = expert_weights.get(m.expert_id, 0.0)
-            if w_k < 0.0:
-                w_k = 0.0
-
-            w_rel = w_k / total_weight if total_weight > 0 else 0.0
-
-            index_map = self._build_index_map(base_items, m.items)
-
-            for i in range(n):
-                for j in range(n):
-                    mi = index_map[i]
-                    mj = index_map[j]
-                    value = m.matrix[mi][mj]
-
-                    if value > 0.0 and w_rel > 0.0:
-                        aggregated[i][j] *= value ** w_rel
-
-        return aggregated, base_items
-
-    def _aggregate_alternative_level_for_criterion(
+    def _aggregate_level(
         self,
-        group_model: GroupAhpModel,
+        level: Optional[str],
+        matrices: List[PairwiseMatrix],
         expert_weights: Dict[str, float],
-        criterion_id: str,
-    ) -> tuple[Optional[List[List[float]]], List[str]]:
-        matrices = [
-            m for m in group_model.pairwise_matrices.alternative_level
-            if m.criterion_id == criterion_id
-        ]
-
-        if not matrices:
-            return None, []
-
+    ) -> Tuple[List[List[float]], List[str], str]:
+        """
+        Взвешенное геометрическое среднее матриц уровня в порядке элементов первой матрицы.
+        Считает бэкенд уровня через общий кэш контекста (Context.aggregation, запись на уровень
+        level), поэтому повторный solve и AemCom на том же контексте этот AIJ не пересчитывают
+        """
         base_items = matrices[0].items
         n = len(base_items)
+        identity = list(range(n))
 
-        aggregated: List[List[float]] = [
-            [1.0 for _ in range(n)] for _ in range(n)
-        ]
-
-        total_weight = sum(max(expert_weights.get(m.expert_id, 0.0), 0.0) for m in matrices)
-        if total_weight == 0.0:
-            total_weight = float(len(matrices))
-
+        index_maps: List[Optional[List[int]]] = []
         for m in matrices:
-            w_k = expert_weights.get(m.expert_id, 0.0)
-            if w_k < 0.0:
-                w_k = 0.0
-            w_rel = w_k / total_weight if total_weight > 0 else 0.0
-
             index_map = self._build_index_map(base_items, m.items)
+            # другой порядок элементов - кэш переставит матрицу в порядок base_items
+            index_maps.append(None if index_map == identity and len(m.matrix) == n else index_map)
 
-            for i in range(n):
-                for j in range(n):
-                    mi = index_map[i]
-                    mj = index_map[j]
-                    value = m.matrix[mi][mj]
-                    if value > 0.0 and w_rel > 0.0:
-                        aggregated[i][j] *= value ** w_rel
+        weights = [max(expert_weights.get(m.expert_id, 0.0), 0.0) for m in matrices]
 
-        return aggregated, base_items
+        backend = self._select_backend(n, len(matrices))
+        aggregated = self._context.aggregation.aij(
+            level, [m.matrix for m in matrices], weights, backend, index_maps=index_maps
+        )
+        return aggregated, base_items, backend.name
 
     @staticmethod
     def _build_index_map(base_items: List[str], other_items: List[str]) -> List[int]:
@@ -194,16 +164,26 @@ class AHP:
         criteria_weights: Dict[str, float],
         alt_weights_by_criterion: Dict[str, Dict[str, float]],
     ) -> Dict[str, float]:
-        global_weights: Dict[str, float] = {}
-
-        for c_id, w_c in criteria_weights.items():
-            alt_weights = alt_weights_by_criterion.get(c_id, {})
-            for alt_id, w_local in alt_weights.items():
-                global_weights[alt_id] = global_weights.get(alt_id, 0.0) + w_c * w_local
-
-        total = sum(global_weights.values())
+        """
+        g = w_C W: W - матрица критерии x альтернативы из локальных весов (0, если альтернатива
+        по критерию не сравнивалась), альтернативы - в порядке первого появления
+        """
+        criteria = list(criteria_weights)
+        columns: Dict[str, int] = {}
+        for c_id in criteria:
+            for alt_id in alt_weights_by_criterion.get(c_id, {}):
+                columns.setdefault(alt_id, len(columns))
+
+        local = [[0.0] * len(columns) for _ in criteria]
+        for row, c_id in zip(local, criteria):
+            for alt_id, w_local in alt_weights_by_criterion.get(c_id, {}).items():
+                row[columns[alt_id]] = w_local
+
+        w_c = [criteria_weights[c_id] for c_id in criteria]
+        products = [sum(map(mul, w_c, column)) for column in zip(*local)]
+
+        total = sum(products)
         if total > 0.0:
-            for alt_id in list(global_weights.keys()):
-                global_weights[alt_id] = global_weights[alt_id] / total
+            products = [g / total for g in products]
 
-        return global_weights
\ No newline at end of file
+        return dict(zip(columns, products))
@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+import json
+import math
+import os
+import platform
+import random
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+from modules.backends import BackendRegistry, ComputeBackend, PureBackend
+
+
+@dataclass
+class BackendTuningEntry:
+    """Замер одной точки сетки: секунды эталонной работы уровня для каждого бэкенда"""
+
+    n: int
+    experts: int
+    timings: Dict[str, float] = field(default_factory=dict)
+    best: str = ""
+
+
+@dataclass
+class BackendTuningTable:
+    """
+    Таблица переходов, построенная BackendTuner на этой машине.
+    choose(n, K) - бэкенд ближайшей точки сетки (в логарифмах n и K)
+    """
+
+    entries: List[BackendTuningEntry] = field(default_factory=list)
+    machine: Dict[str, str] = field(default_factory=dict)
+    generated_at: str = ""
+
+    def choose(self, n: int, experts: int) -> Optional[str]:
+        if not self.entries:
+            return None
+
+        ln_n = math.log(max(n, 1))
+        ln_k = math.log(max(experts, 1))
+        nearest = min(
+            self.entries,
+            key=lambda e: (math.log(e.n) - ln_n) ** 2 + (math.log(e.experts) - ln_k) ** 2,
+        )
+        return nearest.best
+
+    def crossovers(self) -> Dict[int, Optional[int]]:
+        """K -> наименьшее n, с которого эталон pure перестаёт быть самым быстрым (None - не перестаёт)"""
+        out: Dict[int, Optional[int]] = {}
+        for k in sorted({e.experts for e in self.entries}):
+            row = sorted((e for e in self.entries if e.experts == k), key=lambda e: e.n)
+            out[k] = next((e.n for e in row if e.best != PureBackend.name), None)
+        return out
+
+    @staticmethod
+    def default_path() -> Path:
+        cache = os.environ.get("XDG_CACHE_HOME") or str(Path.home() / ".cache")
+        return Path(cache) / "aemcom" / "backend_tuning.json"
+
+    def save(self, path: Union[str, Path]) -> str:
+        p = Path(path)
+        p.parent.mkdir(parents=True, exist_ok=True)
+        data = asdict(self)
+        data["crossovers"] = {str(k): v for k, v in self.crossovers().items()}
+        with p.open("w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+            f.write("\n")
+        return str(p)
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "BackendTuningTable":
+        with Path(path).open("r", encoding="utf-8") as f:
+            data: Dict[str, Any] = json.load(f)
+        return cls(
+            entries=[
+                BackendTuningEntry(
+                    n=int(e["n"]),
+                    experts=int(e["experts"]),
+                    timings={k: float(v) for k, v in e.get("timings", {}).items()},
+                    best=str(e.get("best", "")),
+                )
+                for e in data.get("entries", [])
+            ],
+            machine=dict(data.get("machine", {})),
+            generated_at=str(data.get("generated_at", "")),
+        )
+
+
+class BackendTuner:
+    """
+    Автонастройка бэкендов: по сетке (n, K) замеряется типичная работа уровня AEM-COM
+    (AIJ, w_G, статистика семейства, GCOMPI и несколько векторов приоритетов P) на каждом
+    бэкенде, побеждает минимальное время из repeat замеров.
+
+    Точки с n * n * K > max_cells не замеряются (чистый Python на них идёт секундами):
+    для таких уровней choose берёт ближайшую замеренную точку. Бэкенды должны быть
+    заранее сверены с эталоном (utils.BackendConformance) - тюнер их не проверяет
+    """
+
+    DEFAULT_SIZES = (3, 5, 10, 25, 50, 100)
+    DEFAULT_EXPERTS = (1, 3, 10, 100, 1000)
+
+    # итерации AEM-COM: по вектору приоритетов P на каждую
+    PRIORITY_STEPS = 5
+
+    def __init__(
+        self,
+        backends: Optional[Sequence[str]] = None,
+        sizes: Sequence[int] = DEFAULT_SIZES,
+        experts: Sequence[int] = DEFAULT_EXPERTS,
+        repeat: int = 3,
+        max_cells: int = 1_000_000,
+        seed: int = 42,
+    ) -> None:
+        if repeat < 1:
+            raise ValueError("repeat must be >= 1")
+        names = list(backends) if backends is not None else BackendRegistry.available()
+        self._backends = [BackendRegistry.create(name) for name in names]
+        self._sizes = list(sizes)
+        self._experts = list(experts)
+        self._repeat = repeat
+        self._max_cells = max_cells
+        self._seed = seed
+
+    def tune(self) -> BackendTuningTable:
+        entries: List[BackendTuningEntry] = []
+        for n in self._sizes:
+            for k in self._experts:
+                if n * n * k > self._max_cells:
+                    continue
+                matrices, weights = self._family(n, k)
+                timings = {backend.name: self._measure(backend, matrices, weights) for backend in self._backends}
+                entries.append(BackendTuningEntry(
+                    n=n,
+                    experts=k,
+                    timings=timings,
+                    best=min(timings, key=timings.get),
+                ))
+
+        return BackendTuningTable(
+            entries=entries,
+            machine={
+                "python": sys.version.split()[0],
+                "implementation": platform.python_implementation(),
+                "platform": platform.platform(),
+            },
+            generated_at=datetime.now().isoformat(timespec="seconds"),
+        )
+
+    def _family(self, n: int, k: int):
+        # время не зависит от значений: три разные обратносимметричные матрицы на всё семейство
+        rng = random.Random(self._seed + n)
+        distinct = []
+        for _ in range(min(k, 3)):
+            m = [[1.0] * n for _ in range(n)]
+            for i in range(n):
+                for j in range(i + 1, n):
+                    v = math.exp(rng.uniform(-2.0, 2.0))
+                    m[i][j] = v
+                    m[j][i] = 1.0 / v
+            distinct.append(m)
+        matrices = [distinct[e % len(distinct)] for e in range(k)]
+        weights = [rng.uniform(0.1, 1.0) for _ in range(k)]
+        return matrices, weights
+
+    def _measure(self, backend: ComputeBackend, matrices, weights) -> float:
+        best = math.inf
+        for _ in range(self._repeat):
+            t0 = time.perf_counter()
+            aij = backend.aij(matrices, weights)
+            w_group = backend.priority_vector(aij)
+            stats = backend.family_stats(matrices, weights)
+            backend.gcompi.gcompi_from_stats(stats, w_group)
+            for _ in range(self.PRIORITY_STEPS):
+                backend.priority_vector(aij)
+            best = min(best, time.perf_counter() - t0)
+        return best
+
+
+class AutoBackend(ComputeBackend):
+    """
+    Диспетчер --backend auto: for_shape(n, K) возвращает самый быстрый бэкенд
+    по таблице BackendTuner, вне уровней (и для неизвестных имён) - эталон pure
+    """
+
+    name = "auto"
+
+    def __init__(self, table: BackendTuningTable) -> None:
+        self._pure = PureBackend()
+        super().__init__(self._pure.math, self._pure.gcompi)
+        self._table = table
+        self._instances: Dict[str, ComputeBackend] = {self._pure.name: self._pure}
+
+    @property
+    def table(self) -> BackendTuningTable:
+        return self._table
+
+    def for_shape(self, n: int, experts: int) -> ComputeBackend:
+        name = self._table.choose(n, experts) or self._pure.name
+        backend = self._instances.get(name)
+        if backend is None:
+            try:
+                backend = BackendRegistry.create(name)
+            except ValueError:
+                backend = self._pure
+            self._instances[name] = backend
+        return backend
+
+    def aij(self, matrices: List[List[List[float]]], expert_weights: List[float]) -> List[List[float]]:
+        return self.for_shape(len(matrices[0]) if matrices else 0, len(matrices)).aij(matrices, expert_weights)
@@ -0,0 +1,273 @@
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, List
+
+from entities.reciprocal_matrix import ReciprocalMatrix
+from entities.saaty_matrix import SaatyMatrix
+from modules.math import Math
+from modules.gcompi import GcompiCalculator, GcompiFamilyStats
+
+try:
+    import numpy as np
+except ImportError:  # numpy не обязателен: без него доступен только бэкенд pure
+    np = None
+
+
+class ComputeBackend(ABC):
+    """
+    Вычислительный бэкенд: векторы приоритетов, lambda_max / CR, AIJ и GCOMPI.
+
+    math и gcompi - объекты с интерфейсом Math и GcompiCalculator, их и принимают AHP / AemCom;
+    методы ниже - единая точка входа для сравнения бэкендов (utils.BackendConformance).
+    Эталон - PureBackend, быстрые реализации принимаются только после сверки с ним
+    """
+
+    name = ""
+
+    def __init__(self, math: Math, gcompi: GcompiCalculator) -> None:
+        self.math = math
+        self.gcompi = gcompi
+
+    def for_shape(self, n: int, experts: int) -> "ComputeBackend":
+        """Бэкенд для уровня n x n с K = experts матрицами (AutoBackend выбирает по таблице)"""
+        return self
+
+    def priority_vector(self, matrix: List[List[float]]) -> List[float]:
+        return self.math.compute_priority_vector(matrix)
+
+    def lambda_max(self, matrix: List[List[float]], weights: List[float]) -> float:
+        return self.math.compute_lambda_max(matrix, weights)
+
+    def consistency_ratio(self, matrix: List[List[float]]) -> float:
+        return self.math.compute_relative_consistency(matrix)
+
+    @abstractmethod
+    def aij(self, matrices: List[List[List[float]]], expert_weights: List[float]) -> List[List[float]]:
+        """Взвешенное геометрическое среднее матриц семейства; своя реализация у каждого бэкенда"""
+
+    def family_stats(self, matrices: List[List[List[float]]], weights: List[float]) -> GcompiFamilyStats:
+        return self.gcompi.family_stats(matrices, weights)
+
+    def gcompi_family(self, matrices: List[List[List[float]]], weights: List[float], u: List[float]) -> float:
+        return self.gcompi.gcompi_family(matrices, weights, u)
+
+    @staticmethod
+    def _normalized_weights(weights: List[float]) -> List[float]:
+        total = sum(max(w, 0.0) for w in weights)
+        if total == 0.0:
+            return [1.0 / len(weights)] * len(weights)
+        return [max(w, 0.0) / total for w in weights]
+
+
+class PureBackend(ComputeBackend):
+    """Эталонный бэкенд на чистом Python (Math, GcompiCalculator)"""
+
+    name = "pure"
+
+    def __init__(self) -> None:
+        super().__init__(Math(), GcompiCalculator())
+
+    @staticmethod
+    def aij(matrices: List[List[List[float]]], expert_weights: List[float]) -> List[List[float]]:
+        if not matrices:
+            raise ValueError("Пустое семейство матриц для AIJ.")
+
+        n = len(matrices[0])
+        for mat in matrices:
+            if len(mat) != n:
+                raise ValueError("Все матрицы в семействе должны иметь одинаковый размер.")
+
+        w_norm = ComputeBackend._normalized_weights(expert_weights)
+
+        aij: List[List[float]] = [[1.0 for _ in range(n)] for _ in range(n)]
+
+        for k, mat in enumerate(matrices):
+            alpha_k = w_norm[k]
+            if alpha_k == 0.0:
+                continue
+            if isinstance(mat, SaatyMatrix):
+                PureBackend._aij_saaty(aij, mat, alpha_k)
+                continue
+            if isinstance(mat, ReciprocalMatrix):
+                PureBackend._aij_upper(aij, mat, alpha_k)
+                continue
+            for i in range(n):
+                for j in range(n):
+                    val = mat[i][j]
+                    if val <= 0.0:
+                        continue
+                    aij[i][j] *= val ** alpha_k
+
+        return aij
+
+    @staticmethod
+    def _aij_upper(aij: List[List[float]], mat: ReciprocalMatrix, alpha_k: float) -> None:
+        # диагональ 1 ** alpha_k = 1 не меняет произведение
+        n = mat.n
+        upper = mat.upper
+        k = 0
+        for i in range(n):
+            row = aij[i]
+            for j in range(i + 1, n):
+                val = upper[k]
+                k += 1
+                if val <= 0.0:
+                    continue
+                row[j] *= val ** alpha_k
+                aij[j][i] *= (1.0 / val) ** alpha_k
+
+    @staticmethod
+    def _aij_saaty(aij: List[List[float]], mat: SaatyMatrix, alpha_k: float) -> None:
+        # 17 возведений в степень на матрицу вместо n(n-1)
+        powers = [v ** alpha_k for v in SaatyMatrix.VALUES]
+        top = 2 * SaatyMatrix.ONE
+        n = mat.n
+        codes = mat.codes
+        k = 0
+        for i in range(n):
+            row = aij[i]
+            for j in range(i + 1, n):
+                code = codes[k]
+                k += 1
+                row[j] *= powers[code]
+                aij[j][i] *= powers[top - code]
+
+
+class NumpyMath(Math):
+    """Math на numpy: среднее геометрическое строк через логарифмы, A @ w для lambda_max"""
+
+    @staticmethod
+    def compute_priority_vector(matrix: List[List[float]]) -> List[float]:
+        a = np.asarray(matrix, dtype=float)
+        n = a.shape[0]
+        with np.errstate(divide="ignore"):
+            geom_means = np.exp(np.log(a).mean(axis=1))
+
+        total = geom_means.sum()
+        if total == 0:
+            return [1.0 / n] * n
+        return (geom_means / total).tolist()
+
+    @staticmethod
+    def compute_lambda_max(matrix: List[List[float]], weights: List[float]) -> float:
+        a = np.asarray(matrix, dtype=float)
+        w = np.asarray(weights, dtype=float)
+        mask = w != 0
+        if not mask.any():
+            return float(a.shape[0])
+        return float(((a @ w)[mask] / w[mask]).mean())
+
+
+class NumpyGcompiCalculator(GcompiCalculator):
+    """GcompiCalculator с семейством (K x n x n) в одном массиве numpy: family_stats и gcompi_family"""
+
+    @staticmethod
+    def _weighted_logs(matrices: List[List[List[float]]], weights: List[float]):
+        a = np.asarray(matrices, dtype=float)
+        alpha = np.asarray(ComputeBackend._normalized_weights(weights), dtype=float)
+        # элементы <= 0 пропускаются, как в эталоне: ln 1 = 0
+        logs = np.log(np.where(a > 0.0, a, 1.0))
+        return logs, alpha
+
+    @staticmethod
+    def family_stats(matrices: List[List[List[float]]], weights: List[float]) -> GcompiFamilyStats:
+        if not matrices:
+            return GcompiFamilyStats(n=0, sq_sum=0.0, row_log_sums=[], col_log_sums=[])
+
+        logs, alpha = NumpyGcompiCalculator._weighted_logs(matrices, weights)
+        return GcompiFamilyStats(
+            n=logs.shape[1],
+            sq_sum=float(np.einsum("k,kij,kij->", alpha, logs, logs)),
+            row_log_sums=np.einsum("k,kij->i", alpha, logs).tolist(),
+            col_log_sums=np.einsum("k,kij->j", alpha, logs).tolist(),
+        )
+
+    @staticmethod
+    def expert_stats(matrix: List[List[float]]) -> GcompiFamilyStats:
+        return NumpyGcompiCalculator.family_stats([matrix], [1.0])
+
+    @staticmethod
+    def gcompi_family(
+        matrices: List[List[List[float]]],
+        weights: List[float],
+        u: List[float],
+    ) -> float:
+        if not matrices:
+            return 0.0
+
+        n = len(matrices[0])
+        if n <= 2:
+            return 0.0
+
+        a = np.asarray(matrices, dtype=float)
+        alpha = np.asarray(ComputeBackend._normalized_weights(weights), dtype=float)
+        u_arr = np.asarray(u, dtype=float)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratio = u_arr[None, :] / u_arr[:, None]
+            values = a * ratio[None, :, :]
+        valid = (values > 0.0) & (u_arr[:, None] != 0.0)[None, :, :]
+        logs = np.log(np.where(valid, values, 1.0))
+
+        inner = np.einsum("kij,kij->k", logs, logs)
+        return float((alpha * inner).sum() / float((n - 1) * (n - 2)))
+
+
+class NumpyBackend(ComputeBackend):
+    name = "numpy"
+
+    def __init__(self) -> None:
+        if np is None:
+            raise ValueError("Бэкенд 'numpy' недоступен: модуль numpy не установлен.")
+        super().__init__(NumpyMath(), NumpyGcompiCalculator())
+
+    def aij(self, matrices: List[List[List[float]]], expert_weights: List[float]) -> List[List[float]]:
+        if not matrices:
+            raise ValueError("Пустое семейство матриц для AIJ.")
+
+        n = len(matrices[0])
+        for mat in matrices:
+            if len(mat) != n:
+                raise ValueError("Все матрицы в семействе должны иметь одинаковый размер.")
+
+        logs, alpha = NumpyGcompiCalculator._weighted_logs(matrices, expert_weights)
+        return np.exp(np.einsum("k,kij->ij", alpha, logs)).tolist()
+
+
+class BackendRegistry:
+    """Бэкенды по имени (--backend NAME). Новый бэкенд: BackendRegistry.register("name", Factory)"""
+
+    DEFAULT = PureBackend.name
+
+    _factories: Dict[str, Callable[[], ComputeBackend]] = {
+        PureBackend.name: PureBackend,
+        NumpyBackend.name: NumpyBackend,
+    }
+
+    @classmethod
+    def register(cls, name: str, factory: Callable[[], ComputeBackend]) -> None:
+        cls._factories[name] = factory
+
+    @classmethod
+    def names(cls) -> List[str]:
+        return list(cls._factories)
+
+    @classmethod
+    def create(cls, name: str) -> ComputeBackend:
+        factory = cls._factories.get(name)
+        if factory is None:
+            raise ValueError(f"Неизвестный бэкенд '{name}'. Доступны: {', '.join(cls._factories)}.")
+        return factory()
+
+    @classmethod
+    def available(cls) -> List[str]:
+        """Имена бэкендов, которые создаются в этом окружении"""
+        out = []
+        for name in cls._factories:
+            try:
+                cls.create(name)
+            except ValueError:
+                continue
+            out.append(name)
+        return out
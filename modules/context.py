@@ -1,13 +1,17 @@
 from __future__ import annotations
 
+import contextlib
 import json
 from dataclasses import asdict, is_dataclass
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, Optional, Union
+from typing import Any, Dict, Iterable, Optional, Union
 
+from modules.aggregation import AggregationCache
 from modules.group_builder import GroupBuilder
-from entities import GroupAhpModel
+from modules.memory_tracker import MemoryTracker
+from modules.result_writer import AemComResultWriter
+from entities import GroupAhpModel, ReciprocalMatrix
 
 
 class Context:
@@ -15,10 +19,13 @@ class Context:
         self,
         group_model: GroupAhpModel,
         result_save_path: Optional[str] = None,
+        memory_tracker: Optional[MemoryTracker] = None,
     ) -> None:
         self._group_model = group_model
         self._result_save_path = result_save_path
         self._aem_com_result: Optional[Any] = None
+        self._memory_tracker = memory_tracker
+        self._aggregation = AggregationCache()
 
     @classmethod
     def from_json_file(
@@ -26,20 +33,40 @@ class Context:
         path: Union[str, Path],
         *,
         result_save_path: Optional[str] = None,
+        memory_tracker: Optional[MemoryTracker] = None,
     ) -> "Context":
         path_obj = Path(path)
-        with path_obj.open("r", encoding="utf-8") as f:
-            data: Dict[str, Any] = json.load(f)
+        with cls._memory_phase(memory_tracker, "load"):
+            with path_obj.open("r", encoding="utf-8") as f:
+                data: Dict[str, Any] = json.load(f)
 
-        builder = GroupBuilder(data)
-        group_model = builder.build()
+        with cls._memory_phase(memory_tracker, "build"):
+            builder = GroupBuilder(data)
+            group_model = builder.build()
 
-        return cls(group_model=group_model, result_save_path=result_save_path)
+        return cls(group_model=group_model, result_save_path=result_save_path, memory_tracker=memory_tracker)
+
+    @staticmethod
+    def _memory_phase(tracker: Optional[MemoryTracker], name: str):
+        return tracker.phase(name) if tracker is not None else contextlib.nullcontext()
+
+    @property
+    def memory_tracker(self) -> Optional[MemoryTracker]:
+        return self._memory_tracker
+
+    def memory_phase(self, name: str):
+        """Фаза учёта памяти (--memory); без трекера - пустой контекст"""
+        return self._memory_phase(self._memory_tracker, name)
 
     @property
     def group_model(self) -> GroupAhpModel:
         return self._group_model
 
+    @property
+    def aggregation(self) -> AggregationCache:
+        """AIJ уровней, общие для AHP и AemCom на этом контексте"""
+        return self._aggregation
+
     @property
     def result_save_path(self) -> Optional[str]:
         return self._result_save_path
@@ -57,7 +84,12 @@ class Context:
         self._aem_com_result = value
 
     def to_dict(self) -> Dict[str, Any]:
-        return asdict(self._group_model)
+        return asdict(self._group_model, dict_factory=self._plain_dict)
+
+    @staticmethod
+    def _plain_dict(fields) -> Dict[str, Any]:
+        # ReciprocalMatrix (matrix_storage = upper_triangle) в JSON - обычный список строк
+        return {k: v.to_list() if isinstance(v, ReciprocalMatrix) else v for k, v in fields}
 
     def build_result_payload(self) -> Dict[str, Any]:
         if self._aem_com_result is None:
@@ -71,19 +103,24 @@ class Context:
         initial_sum = 0.0
         final_sum = 0.0
         min_sum = 0.0
+        performance_levels = []
 
         if getattr(self._aem_com_result, "criteria_result", None) is not None:
             run = self._aem_com_result.criteria_result.run
             initial_sum += float(run.gcompi_initial)
             final_sum += float(run.gcompi_final)
             min_sum += float(run.gcompi_min)
+            if getattr(run, "performance", None) is not None:
+                performance_levels.append(self._performance_row("criteria", None, run))
 
         alt_results = getattr(self._aem_com_result, "alternatives_results", {}) or {}
-        for _, alt_res in alt_results.items():
+        for c_id, alt_res in alt_results.items():
             run = alt_res.run
             initial_sum += float(run.gcompi_initial)
             final_sum += float(run.gcompi_final)
             min_sum += float(run.gcompi_min)
+            if getattr(run, "performance", None) is not None:
+                performance_levels.append(self._performance_row("alternatives", c_id, run))
 
         payload = self.to_dict()
         payload["result"] = {
@@ -100,27 +137,102 @@ class Context:
                 "details": details,
             }
         }
+        performance: Dict[str, Any] = {}
+        if performance_levels:
+            performance["levels"] = performance_levels
+            performance["totals"] = self._performance_totals(performance_levels)
+        if self._memory_tracker is not None:
+            performance["memory"] = self._memory_tracker.report()
+        if performance:
+            payload["result"]["aem_com"]["performance"] = performance
         return payload
 
+    @staticmethod
+    def _performance_row(level: str, criterion_id: Optional[str], run: Any) -> Dict[str, Any]:
+        return {
+            "level": level,
+            "criterion_id": criterion_id,
+            "n": len(run.items),
+            "iterations": run.iterations,
+            "timings": dict(run.performance.timings),
+            "counters": dict(run.performance.counters),
+        }
+
+    @staticmethod
+    def _performance_totals(rows: Any) -> Dict[str, Any]:
+        timings: Dict[str, float] = {}
+        counters: Dict[str, int] = {}
+        for row in rows:
+            for key, value in row["timings"].items():
+                timings[key] = timings.get(key, 0.0) + value
+            for key, value in row["counters"].items():
+                counters[key] = counters.get(key, 0) + value
+        return {"timings": timings, "counters": counters}
+
     def save_result_json(self) -> str:
         if not self._result_save_path:
             raise ValueError("result_save_path не задан в Context (некуда сохранять результат).")
 
-        payload = self.build_result_payload()
+        out_path = self._resolve_save_path(".json")
 
-        p = Path(self._result_save_path)
+        with out_path.open("w", encoding="utf-8") as f:
+            self.write_result_json(f)
 
-        if p.suffix.lower() != ".json":
-            p.mkdir(parents=True, exist_ok=True)
-            fname = datetime.now().strftime("%Y%m%d_%H%M%S") + ".json"
-            out_path = (p / fname).resolve()
-        else:
-            if p.parent:
-                p.parent.mkdir(parents=True, exist_ok=True)
-            out_path = p.resolve()
+        return str(out_path)
+
+    def write_result_json(self, stream) -> None:
+        """
+        build_result_payload и json.dump в stream - целиком в фазе памяти serialize.
+        Отчёт памяти в payload снимается внутри фазы, поэтому serialize в нём ещё нет
+        (он есть в итоговом отчёте трекера)
+        """
+        with self.memory_phase("serialize"):
+            payload = self.build_result_payload()
+            json.dump(payload, stream, ensure_ascii=False, indent=2)
+            stream.write("\n")
+
+    def save_result_stream(self, level_results: Iterable[Any]) -> str:
+        """
+        Пишет результаты уровней (например, AemCom.iter_run_full()) в JSON Lines по мере
+        их появления; в памяти одновременно находится только один уровень
+        """
+        if not self._result_save_path:
+            raise ValueError("result_save_path не задан в Context (некуда сохранять результат).")
+
+        out_path = self._resolve_save_path(".jsonl")
 
         with out_path.open("w", encoding="utf-8") as f:
-            json.dump(payload, f, ensure_ascii=False, indent=2)
-            f.write("\n")
+            self.write_result_stream(f, level_results)
 
         return str(out_path)
+
+    def write_result_stream(self, stream, level_results: Iterable[Any]) -> None:
+        gm = self._group_model
+        with AemComResultWriter(stream, gm.settings.aem_com.permissibility) as writer:
+            writer.write_header({
+                "problem": asdict(gm.problem),
+                "settings": asdict(gm.settings),
+            })
+            for level_result in level_results:
+                writer.write_level(level_result)
+
+    # суффиксы, по которым путь считается файлом результата, а не каталогом
+    RESULT_SUFFIXES = (".json", ".jsonl")
+
+    def _resolve_save_path(self, suffix: str) -> Path:
+        """
+        Путь с суффиксом .json / .jsonl - файл результата: суффикс заменяется на нужный формат
+        (-o out/res.json --stream пишет out/res.jsonl). Иначе путь - каталог, в нём создаётся
+        файл с меткой времени
+        """
+        p = Path(self._result_save_path)
+
+        if p.suffix.lower() not in self.RESULT_SUFFIXES:
+            p.mkdir(parents=True, exist_ok=True)
+            fname = datetime.now().strftime("%Y%m%d_%H%M%S") + suffix
+            return (p / fname).resolve()
+
+        p = p.with_suffix(suffix)
+        if p.parent:
+            p.parent.mkdir(parents=True, exist_ok=True)
+        return p.resolve()
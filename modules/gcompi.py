@@ -1,7 +1,16 @@
 from __future__ import annotations
 
 import math
-from typing import List
+from dataclasses import dataclass
+from typing import List, Sequence
+
+from entities.reciprocal_matrix import ReciprocalMatrix
+from entities.saaty_matrix import SaatyMatrix
+
+try:
+    import numpy as np
+except ImportError:  # numpy не обязателен: без него gcompi_family_batch считает по одному вектору
+    np = None
 
 
 class GcompiCalculator:
@@ -24,6 +33,17 @@ class GcompiCalculator:
         if denom == 0.0:
             return 0.0
 
+        return GcompiCalculator._inner_sum(matrix, u) / denom
+
+    @staticmethod
+    def _inner_sum(matrix: List[List[float]], u: List[float]) -> float:
+        """sum_ij (ln a_ij u_j / u_i)^2"""
+        if isinstance(matrix, ReciprocalMatrix) and all(ui > 0.0 for ui in u):
+            if isinstance(matrix, SaatyMatrix):
+                return GcompiCalculator._inner_sum_saaty(matrix, u)
+            return GcompiCalculator._inner_sum_upper(matrix, u)
+
+        n = len(matrix)
         total = 0.0
         for i in range(n):
             ui = u[i]
@@ -34,8 +54,42 @@ class GcompiCalculator:
                 if value <= 0.0:
                     continue
                 total += GcompiCalculator._log_sq(value)
+        return total
 
-        return total / denom
+    @staticmethod
+    def _inner_sum_upper(matrix: ReciprocalMatrix, u: List[float]) -> float:
+        # ln(a_ji u_i / u_j) = -ln(a_ij u_j / u_i): пара (i, j) и (j, i) дают одно слагаемое дважды
+        n = matrix.n
+        upper = matrix.upper
+        x = [math.log(ui) for ui in u]
+        total = 0.0
+        k = 0
+        for i in range(n):
+            x_i = x[i]
+            for j in range(i + 1, n):
+                value = upper[k]
+                k += 1
+                if value <= 0.0:
+                    continue
+                ln = math.log(value) + x[j] - x_i
+                total += ln * ln
+        return 2.0 * total
+
+    @staticmethod
+    def _inner_sum_saaty(matrix: SaatyMatrix, u: List[float]) -> float:
+        n = matrix.n
+        codes = matrix.codes
+        logs = SaatyMatrix.LOGS
+        x = [math.log(ui) for ui in u]
+        total = 0.0
+        k = 0
+        for i in range(n):
+            x_i = x[i]
+            for j in range(i + 1, n):
+                ln = logs[codes[k]] + x[j] - x_i
+                k += 1
+                total += ln * ln
+        return 2.0 * total
 
     @staticmethod
     def gcompi_family(
@@ -64,17 +118,276 @@ class GcompiCalculator:
             if alpha_k == 0.0:
                 continue
 
-            inner = 0.0
+            total += alpha_k * GcompiCalculator._inner_sum(matrix, u)
+
+        return total / denom
+
+    @staticmethod
+    def family_stats(
+        matrices: List[List[List[float]]],
+        weights: List[float],
+    ) -> GcompiFamilyStats:
+        """
+        Один проход по семейству: всё, что нужно для GCOMPI(A, u) при любом u.
+        GCOMPI = (S - 2 * sum_i x_i * D_i + 2n * sum_i x_i^2 - 2 * (sum_i x_i)^2) / ((n-1)(n-2)),
+        где x = ln u, S = sum_k alpha_k sum_ij (ln a_kij)^2, D_i = R_i - C_i (суммы строк/столбцов
+        взвешенных логарифмов)
+        """
+        if not matrices:
+            return GcompiFamilyStats(n=0, sq_sum=0.0, row_log_sums=[], col_log_sums=[])
+
+        n = len(matrices[0])
+
+        w_sum = sum(max(w, 0.0) for w in weights)
+        if w_sum == 0.0:
+            w_norm = [1.0 / len(matrices)] * len(matrices)
+        else:
+            w_norm = [max(w, 0.0) / w_sum for w in weights]
+
+        sq_sum = 0.0
+        row_log_sums = [0.0] * n
+        col_log_sums = [0.0] * n
+
+        for k, matrix in enumerate(matrices):
+            alpha_k = w_norm[k]
+            if alpha_k == 0.0:
+                continue
+            if isinstance(matrix, SaatyMatrix):
+                sq_sum += GcompiCalculator._accumulate_saaty(matrix, alpha_k, row_log_sums, col_log_sums)
+                continue
+            if isinstance(matrix, ReciprocalMatrix):
+                sq_sum += GcompiCalculator._accumulate_upper(matrix, alpha_k, row_log_sums, col_log_sums)
+                continue
             for i in range(n):
-                ui = u[i]
-                if ui == 0.0:
-                    continue
+                row = matrix[i]
                 for j in range(n):
-                    value = matrix[i][j] * (u[j] / ui)
+                    value = row[j]
                     if value <= 0.0:
                         continue
-                    inner += GcompiCalculator._log_sq(value)
+                    ln = math.log(value)
+                    sq_sum += alpha_k * ln * ln
+                    row_log_sums[i] += alpha_k * ln
+                    col_log_sums[j] += alpha_k * ln
 
-            total += alpha_k * inner
+        return GcompiFamilyStats(
+            n=n,
+            sq_sum=sq_sum,
+            row_log_sums=row_log_sums,
+            col_log_sums=col_log_sums,
+        )
 
-        return total / denom
+    @staticmethod
+    def _accumulate_upper(
+        matrix: ReciprocalMatrix,
+        alpha: float,
+        row_log_sums: List[float],
+        col_log_sums: List[float],
+    ) -> float:
+        """
+        Вклад матрицы в family_stats по верхнему треугольнику: ln a_ji = -ln a_ij, поэтому
+        пара даёт 2 (ln a_ij)^2 в S, +ln a_ij в R_i и C_j, -ln a_ij в R_j и C_i. Возвращает вклад в S
+        """
+        n = matrix.n
+        upper = matrix.upper
+        sq = 0.0
+        k = 0
+        for i in range(n):
+            for j in range(i + 1, n):
+                value = upper[k]
+                k += 1
+                if value <= 0.0:
+                    continue
+                ln = math.log(value)
+                weighted = alpha * ln
+                sq += weighted * ln
+                row_log_sums[i] += weighted
+                col_log_sums[j] += weighted
+                row_log_sums[j] -= weighted
+                col_log_sums[i] -= weighted
+        return 2.0 * sq
+
+    @staticmethod
+    def _accumulate_saaty(
+        matrix: SaatyMatrix,
+        alpha: float,
+        row_log_sums: List[float],
+        col_log_sums: List[float],
+    ) -> float:
+        """_accumulate_upper по кодам: ln и ln^2 из таблиц шкалы, сумма квадратов - через счётчики кодов"""
+        n = matrix.n
+        codes = matrix.codes
+        weighted_logs = [alpha * ln for ln in SaatyMatrix.LOGS]
+        k = 0
+        for i in range(n):
+            for j in range(i + 1, n):
+                weighted = weighted_logs[codes[k]]
+                k += 1
+                row_log_sums[i] += weighted
+                col_log_sums[j] += weighted
+                row_log_sums[j] -= weighted
+                col_log_sums[i] -= weighted
+
+        counts = [0] * len(SaatyMatrix.VALUES)
+        for code in codes:
+            counts[code] += 1
+        sq = sum(count * ln_sq for count, ln_sq in zip(counts, SaatyMatrix.LOG_SQ) if count)
+        return 2.0 * alpha * sq
+
+    @staticmethod
+    def gcompi_from_stats(stats: GcompiFamilyStats, u: List[float]) -> float:
+        """GCOMPI(A, u) за O(n) по предвычисленной статистике семейства (u > 0)"""
+        n = stats.n
+        if n <= 2:
+            return 0.0
+
+        x = [math.log(ui) for ui in u]
+        return stats.numerator(x) / stats.denom
+
+    @staticmethod
+    def gcompi_family_batch(
+        matrices: List[List[List[float]]],
+        weights: List[float],
+        U: Sequence[Sequence[float]],
+    ) -> List[float]:
+        """
+        GCOMPI(A, u) для каждой строки u матрицы кандидатов U (m x n, u > 0).
+        Семейство логарифмируется один раз (family_stats), дальше O(n) на кандидата;
+        с numpy все кандидаты считаются одним матричным выражением
+        """
+        stats = GcompiCalculator.family_stats(matrices, weights)
+        return GcompiCalculator.gcompi_from_stats_batch(stats, U)
+
+    @staticmethod
+    def gcompi_from_stats_batch(stats: GcompiFamilyStats, U: Sequence[Sequence[float]]) -> List[float]:
+        m = len(U)
+        n = stats.n
+        if n <= 2:
+            return [0.0] * m
+
+        if np is None:
+            return [GcompiCalculator.gcompi_from_stats(stats, u) for u in U]
+
+        X = np.log(np.asarray(U, dtype=float).reshape(m, n))
+        D = np.asarray(stats.row_col_diff)
+        s1 = X.sum(axis=1)
+        num = stats.sq_sum - 2.0 * (X @ D) + 2.0 * n * np.einsum("ij,ij->i", X, X) - 2.0 * s1 * s1
+        return (num / stats.denom).tolist()
+
+    @staticmethod
+    def expert_stats(matrix: List[List[float]]) -> GcompiFamilyStats:
+        """Статистика одной матрицы эксперта (семейство из одной матрицы)"""
+        return GcompiCalculator.family_stats([matrix], [1.0])
+
+    @staticmethod
+    def gcompi_per_expert(expert_stats: List[GcompiFamilyStats], u: List[float]) -> List[float]:
+        """GCOMPI(A_k, u) для каждого эксперта: O(K n)"""
+        return [GcompiCalculator.gcompi_from_stats(stats, u) for stats in expert_stats]
+
+    @staticmethod
+    def compatibility_matrix(expert_stats: List[GcompiFamilyStats]) -> List[List[float]]:
+        """
+        C[k][l] = GCOMPI(A_k, w_l), w_l - вектор приоритетов A_l (среднее геометрическое строк).
+        ln w_l = R_l / n с точностью до константы, а GCOMPI от сдвига ln u не зависит,
+        поэтому вся матрица стоит O(K^2 n) поверх статистик экспертов
+        """
+        if not expert_stats:
+            return []
+
+        n = expert_stats[0].n
+        if n <= 2:
+            return [[0.0] * len(expert_stats) for _ in expert_stats]
+
+        log_vectors = [[r / n for r in stats.row_log_sums] for stats in expert_stats]
+        return [
+            [stats_k.numerator(x_l) / stats_k.denom for x_l in log_vectors]
+            for stats_k in expert_stats
+        ]
+
+
+@dataclass
+class GcompiFamilyStats:
+    n: int
+    sq_sum: float
+    row_log_sums: List[float]
+    col_log_sums: List[float]
+
+    @property
+    def denom(self) -> float:
+        return float((self.n - 1) * (self.n - 2))
+
+    @property
+    def row_col_diff(self) -> List[float]:
+        return [r - c for r, c in zip(self.row_log_sums, self.col_log_sums)]
+
+    def numerator(self, x: List[float]) -> float:
+        s1 = 0.0
+        s2 = 0.0
+        sd = 0.0
+        for xi, ri, ci in zip(x, self.row_log_sums, self.col_log_sums):
+            s1 += xi
+            s2 += xi * xi
+            sd += xi * (ri - ci)
+        return self.sq_sum - 2.0 * sd + 2.0 * self.n * s2 - 2.0 * s1 * s1
+
+
+class GcompiTrial:
+    """
+    Пробные шаги AEM-COM без изменения P.
+
+    Хранит суммы логарифмов строк P (ln v_i = L_i / n с точностью до константы)
+    и статистику семейства, поэтому изменение GCOMPI после
+    P[r][s] *= t, P[s][r] = 1 / P[r][s] считается за O(1), а commit — за O(n)
+    """
+
+    def __init__(self, stats: GcompiFamilyStats, P: List[List[float]]) -> None:
+        self._stats = stats
+        self._P = P
+        self._n = len(P)
+        self._diff = stats.row_col_diff
+
+        self._row_log_sums = [sum(math.log(x) for x in row) for row in P]
+        self._recompute_sums()
+
+    def _recompute_sums(self) -> None:
+        n = self._n
+        x = [L / n for L in self._row_log_sums]
+        self._x = x
+        self._s1 = sum(x)
+        self._s2 = sum(xi * xi for xi in x)
+        self._sd = sum(xi * di for xi, di in zip(x, self._diff))
+
+    def _numerator_delta(self, r: int, s: int, new_value: float) -> float:
+        n = self._n
+        P = self._P
+        d_r = (math.log(new_value) - math.log(P[r][s])) / n
+        d_s = (-math.log(new_value) - math.log(P[s][r])) / n
+        if d_r == 0.0 and d_s == 0.0:
+            return 0.0
+
+        x_r = self._x[r]
+        x_s = self._x[s]
+
+        d_s1 = d_r + d_s
+        d_s2 = 2.0 * x_r * d_r + d_r * d_r + 2.0 * x_s * d_s + d_s * d_s
+        d_sd = d_r * self._diff[r] + d_s * self._diff[s]
+
+        s1_new = self._s1 + d_s1
+        return -2.0 * d_sd + 2.0 * n * d_s2 - 2.0 * (s1_new * s1_new - self._s1 * self._s1)
+
+    def delta(self, r: int, s: int, t: float) -> float:
+        """Изменение GCOMPI после P[r][s] *= t (P не меняется)"""
+        if self._n <= 2:
+            return 0.0
+        return self._numerator_delta(r, s, self._P[r][s] * t) / self._stats.denom
+
+    def predict(self, r: int, s: int, t: float, gcompi_current: float) -> float:
+        return gcompi_current + self.delta(r, s, t)
+
+    def commit(self, r: int, s: int, new_value: float) -> None:
+        """Записывает P[r][s] = new_value (и обратный элемент) и обновляет кэш"""
+        P = self._P
+        self._row_log_sums[r] += math.log(new_value) - math.log(P[r][s])
+        self._row_log_sums[s] += -math.log(new_value) - math.log(P[s][r])
+        P[r][s] = new_value
+        P[s][r] = 1.0 / new_value
+        self._recompute_sums()
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List
+import sys
+from typing import Any, Dict, List, Optional, Tuple
 
 from entities import (
     PairwiseMatrix,
@@ -12,13 +13,22 @@ from entities import (
     Alternative,
     Expert,
     Problem,
-    GroupAhpModel
+    GroupAhpModel,
+    ReciprocalMatrix,
+    SaatyMatrix,
 )
 
 
 class GroupBuilder:
+    MATRIX_STORAGE_LISTS = "lists"
+    MATRIX_STORAGE_UPPER_TRIANGLE = "upper_triangle"
+    MATRIX_STORAGE_SAATY_CODES = "saaty_codes"
+    MATRIX_STORAGES = (MATRIX_STORAGE_LISTS, MATRIX_STORAGE_UPPER_TRIANGLE, MATRIX_STORAGE_SAATY_CODES)
+
     def __init__(self, data: Dict[str, Any]) -> None:
         self._data = data
+        # (уровень, criterion_id) -> общий список items матриц уровня
+        self._item_tables: Dict[Tuple[str, Optional[str]], List[str]] = {}
 
     def build(self) -> GroupAhpModel:
         problem = self._build_problem(self._data.get("problem", {}))
@@ -26,7 +36,8 @@ class GroupBuilder:
         ahp_model = self._build_ahp_model(self._data.get("model", {}))
         settings = self._build_settings(self._data.get("settings", {}))
         pairwise_matrices = self._build_pairwise_matrices(
-            self._data.get("pairwise_matrices", {})
+            self._data.get("pairwise_matrices", {}),
+            storage=settings.matrix_storage,
         )
 
         return GroupAhpModel(
@@ -51,7 +62,7 @@ class GroupBuilder:
         experts: List[Expert] = []
         for e in experts_data:
             expert = Expert(
-                id=e.get("id", ""),
+                id=GroupBuilder._intern(e.get("id", "")),
                 name=e.get("name", ""),
                 role=e.get("role", ""),
                 weight=float(e.get("weight", 0.0)),
@@ -67,7 +78,7 @@ class GroupBuilder:
         criteria: List[Criterion] = []
         for c in criteria_data:
             crit = Criterion(
-                id=c.get("id", ""),
+                id=GroupBuilder._intern(c.get("id", "")),
                 name=c.get("name", ""),
                 description=c.get("description", ""),
             )
@@ -76,7 +87,7 @@ class GroupBuilder:
         alternatives: List[Alternative] = []
         for a in alternatives_data:
             alt = Alternative(
-                id=a.get("id", ""),
+                id=GroupBuilder._intern(a.get("id", "")),
                 name=a.get("name", ""),
                 description=a.get("description", ""),
             )
@@ -94,16 +105,37 @@ class GroupBuilder:
             apply_to=list(aem_com_data.get("apply_to", [])),
             max_iterations=int(aem_com_data.get("max_iterations", 0)),
             initial_mode=str(aem_com_data.get("initial_mode", "aij")),
+            initial_result_path=str(aem_com_data.get("initial_result_path", "")),
             strict_decrease=bool(aem_com_data.get("strict_decrease", False)),
+            gcompi_abs_tol=float(aem_com_data.get("gcompi_abs_tol", 1e-12)),
+            gcompi_rel_tol=float(aem_com_data.get("gcompi_rel_tol", 1e-9)),
+            stall_patience=int(aem_com_data.get("stall_patience", 0)),
+            stall_tol=float(aem_com_data.get("stall_tol", 0.0)),
+            selection=str(aem_com_data.get("selection", "max_log_q")),
+            engine=str(aem_com_data.get("engine", "greedy")),
+            solver_max_passes=int(aem_com_data.get("solver_max_passes", 100)),
+            solver_tol=float(aem_com_data.get("solver_tol", 1e-9)),
+            solver_history=bool(aem_com_data.get("solver_history", False)),
+            checkpoint_every=int(aem_com_data.get("checkpoint_every", 0)),
+            expert_compatibility=bool(aem_com_data.get("expert_compatibility", False)),
+            performance=bool(aem_com_data.get("performance", False)),
         )
 
+        matrix_storage = str(settings_data.get("matrix_storage", GroupBuilder.MATRIX_STORAGE_LISTS))
+        if matrix_storage not in GroupBuilder.MATRIX_STORAGES:
+            raise ValueError(
+                f"Неизвестный matrix_storage '{matrix_storage}'. "
+                f"Доступны: {', '.join(GroupBuilder.MATRIX_STORAGES)}."
+            )
+
         return Settings(
             ahp_scale=ahp_scale,
             aem_com=aem_com,
+            matrix_storage=matrix_storage,
         )
 
     def _build_pairwise_matrices(
-            self, matrices_data: Dict[str, Any]
+            self, matrices_data: Dict[str, Any], storage: str = MATRIX_STORAGE_LISTS
     ) -> PairwiseMatrices:
         criteria_level_data = matrices_data.get("criteria_level", [])
         alternative_level_data = matrices_data.get("alternative_level", [])
@@ -114,20 +146,22 @@ class GroupBuilder:
         criteria_level: List[PairwiseMatrix] = []
         for m in criteria_level_data:
             matrix = self._build_pairwise_matrix(
-                items=m.get("items", []),
+                items=self._level_items("criteria", None, m.get("items", [])),
                 matrix=m.get("matrix", []),
                 expert_id=m.get("expert_id"),
                 criterion_id=m.get("criterion_id"),
+                storage=storage,
             )
             criteria_level.append(matrix)
 
         alternative_level: List[PairwiseMatrix] = []
         for m in alternative_level_data:
             matrix = self._build_pairwise_matrix(
-                items=m.get("items", []),
+                items=self._level_items("alternatives", m.get("criterion_id"), m.get("items", [])),
                 matrix=m.get("matrix", []),
                 expert_id=m.get("expert_id"),
                 criterion_id=m.get("criterion_id"),
+                storage=storage,
             )
             alternative_level.append(matrix)
 
@@ -141,8 +175,9 @@ class GroupBuilder:
             coll_list = []
 
         for m in coll_list:
+            criterion_id = m.get("criterion_id")
             matrix = self._build_pairwise_matrix(
-                items=m.get("items", []),
+                items=self._level_items("criteria" if criterion_id is None else "alternatives", criterion_id, m.get("items", [])),
                 matrix=m.get("matrix", []),
                 expert_id=m.get("expert_id"),
                 criterion_id=m.get("criterion_id"),
@@ -155,13 +190,42 @@ class GroupBuilder:
             collective_level=collective_level,
         )
 
+    @staticmethod
+    def _intern(value: Any) -> Any:
+        return sys.intern(value) if isinstance(value, str) else value
+
+    def _level_items(self, level: str, criterion_id: Optional[str], items: List[Any]) -> List[str]:
+        """
+        items матрицы через таблицу уровня: id интернируются, а матрицы уровня с тем же порядком
+        items получают один общий список (после загрузки items не изменяются)
+        """
+        ids = [self._intern(item) for item in items]
+        table = self._item_tables.setdefault((level, criterion_id), ids)
+        return table if table == ids else ids
+
     @staticmethod
     def _build_pairwise_matrix(
             items: List[str],
             matrix: List[List[float]],
             expert_id: str | None,
             criterion_id: str | None,
+            storage: str = MATRIX_STORAGE_LISTS,
     ) -> PairwiseMatrix:
+        if storage != GroupBuilder.MATRIX_STORAGE_LISTS:
+            # нижний треугольник синтезируется как 1 / a_ij, значения из файла под диагональю не хранятся.
+            # saaty_codes: матрица со значением вне шкалы Саати остаётся в ReciprocalMatrix
+            triangle = None
+            if storage == GroupBuilder.MATRIX_STORAGE_SAATY_CODES:
+                triangle = SaatyMatrix.try_from_rows(matrix)
+            if triangle is None:
+                triangle = ReciprocalMatrix.from_rows(matrix)
+            return PairwiseMatrix(
+                items=items,
+                matrix=triangle,
+                expert_id=GroupBuilder._intern(expert_id),
+                criterion_id=GroupBuilder._intern(criterion_id),
+            )
+
         numeric_matrix: List[List[float]] = []
         for row in matrix:
             numeric_row: List[float] = []
@@ -170,8 +234,8 @@ class GroupBuilder:
             numeric_matrix.append(numeric_row)
 
         return PairwiseMatrix(
-            items=list(items),
+            items=items,
             matrix=numeric_matrix,
-            expert_id=expert_id,
-            criterion_id=criterion_id,
+            expert_id=GroupBuilder._intern(expert_id),
+            criterion_id=GroupBuilder._intern(criterion_id),
         )
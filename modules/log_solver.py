@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import math
+from typing import List, Optional, Tuple
+
+from modules.gcompi import GcompiFamilyStats
+
+
+class LogSpaceSolver:
+    """
+    Прямая минимизация GCOMPI(A, v(P)) по y_rs = ln P[r][s] (r < s) покоординатным спуском.
+
+    При P[s][r] = 1 / P[r][s] ln v_i = L_i / n (с точностью до константы), где L_i — сумма
+    логарифмов строки i, поэтому GCOMPI — выпуклая квадратичная функция от y.
+    Шаг по одной координате (x_r += d / n, x_s -= d / n) минимизируется точно:
+        d* = (D_r - D_s) / 4 - n * (x_r - x_s) / 2
+    и обрезается по коробке [ln P0_rs - ln(1 + rho), ln P0_rs + ln(1 + rho)] ∩ [ln 1/9, ln 9].
+    Один проход — O(n^2), для полной матрицы сравнений обычно хватает нескольких проходов
+    """
+
+    def __init__(
+        self,
+        stats: GcompiFamilyStats,
+        permissibility: float,
+        max_passes: int = 100,
+        tol: float = 1e-9,
+        lower: float = 1.0 / 9.0,
+        upper: float = 9.0,
+    ) -> None:
+        self._stats = stats
+        self._rho = permissibility
+        self._max_passes = max_passes
+        self._tol = tol
+        self._lower = lower
+        self._upper = upper
+
+    def solve(
+        self,
+        initial_P: List[List[float]],
+        start_P: Optional[List[List[float]]] = None,
+    ) -> Tuple[List[List[float]], int, bool]:
+        """
+        Возвращает (P', число проходов, сошёлся ли спуск). Коробка строится по initial_P,
+        спуск начинается с start_P (P' прерванного расчёта), по умолчанию - с initial_P
+        """
+        if start_P is None:
+            start_P = initial_P
+        n = len(initial_P)
+        diff = self._stats.row_col_diff
+
+        ln_lower = math.log(self._lower)
+        ln_upper = math.log(self._upper)
+        ln_box = math.log(1.0 + self._rho) if self._rho > -1.0 else 0.0
+
+        pairs: List[Tuple[int, int]] = [(r, s) for r in range(n) for s in range(r + 1, n)]
+        y_start: List[float] = []
+        y: List[float] = []
+        lo: List[float] = []
+        hi: List[float] = []
+
+        for (r, s) in pairs:
+            y0 = math.log(initial_P[r][s])
+            a = max(y0 - ln_box, ln_lower)
+            b = min(y0 + ln_box, ln_upper)
+            if a > b:
+                a = b = min(max(y0, ln_lower), ln_upper)
+            ys = math.log(start_P[r][s])
+            lo.append(a)
+            hi.append(b)
+            y.append(min(max(ys, a), b))
+            y_start.append(ys)
+
+        x = [0.0] * n
+        for idx, (r, s) in enumerate(pairs):
+            x[r] += y[idx] / n
+            x[s] -= y[idx] / n
+
+        passes = 0
+        converged = False
+
+        while passes < self._max_passes:
+            passes += 1
+            max_step = 0.0
+
+            for idx, (r, s) in enumerate(pairs):
+                d = (diff[r] - diff[s]) / 4.0 - n * (x[r] - x[s]) / 2.0
+                y_new = y[idx] + d
+                if y_new < lo[idx]:
+                    y_new = lo[idx]
+                elif y_new > hi[idx]:
+                    y_new = hi[idx]
+
+                d = y_new - y[idx]
+                if d == 0.0:
+                    continue
+
+                y[idx] = y_new
+                x[r] += d / n
+                x[s] -= d / n
+                if abs(d) > max_step:
+                    max_step = abs(d)
+
+            if max_step <= self._tol:
+                converged = True
+                break
+
+        P = [[1.0 for _ in range(n)] for _ in range(n)]
+        for idx, (r, s) in enumerate(pairs):
+            # нетронутые элементы сохраняются без потерь на exp(ln x)
+            value = start_P[r][s] if y[idx] == y_start[idx] else math.exp(y[idx])
+            P[r][s] = value
+            P[s][r] = 1.0 / value
+
+        return P, passes, converged
@@ -1,5 +1,7 @@
 from typing import Dict, List
 
+from entities.reciprocal_matrix import ReciprocalMatrix
+
 class Math:
     def __init__(self) -> None:
         self._random_index: Dict[int, float] = {
@@ -22,6 +24,9 @@ class Math:
         :param matrix:
         :return:
         """
+        if isinstance(matrix, ReciprocalMatrix):
+            return Math._priority_vector_upper(matrix)
+
         n = len(matrix)
 
         geom_means: List[float] = []
@@ -45,12 +50,15 @@ class Math:
         :return:
         """
         n = len(matrix)
-        aw: List[float] = [0.0] * n
-        for i in range(n):
-            s = 0.0
-            for j in range(n):
-                s += matrix[i][j] * weights[j]
-            aw[i] = s
+        if isinstance(matrix, ReciprocalMatrix):
+            aw = Math._weighted_row_sums_upper(matrix, weights)
+        else:
+            aw: List[float] = [0.0] * n
+            for i in range(n):
+                s = 0.0
+                for j in range(n):
+                    s += matrix[i][j] * weights[j]
+                aw[i] = s
 
         ratios: List[float] = []
         for i in range(n):
@@ -63,6 +71,47 @@ class Math:
 
         return sum(ratios) / len(ratios)
 
+    @staticmethod
+    def _priority_vector_upper(matrix: ReciprocalMatrix) -> List[float]:
+        """Произведения строк за один проход по верхнему треугольнику: a_ij входит в строку i, 1 / a_ij - в строку j"""
+        n = matrix.n
+        upper = matrix.upper
+        products = [1.0] * n
+        k = 0
+        for i in range(n):
+            product = products[i]
+            for j in range(i + 1, n):
+                value = upper[k]
+                k += 1
+                product *= value
+                products[j] /= value
+            products[i] = product
+
+        geom_means = [p ** (1.0 / n) for p in products]
+        total = sum(geom_means)
+        if total == 0:
+            return [1.0 / n] * n
+
+        return [g / total for g in geom_means]
+
+    @staticmethod
+    def _weighted_row_sums_upper(matrix: ReciprocalMatrix, weights: List[float]) -> List[float]:
+        """A w по верхнему треугольнику (диагональ даёт w_i)"""
+        n = matrix.n
+        upper = matrix.upper
+        aw = list(weights)
+        k = 0
+        for i in range(n):
+            w_i = weights[i]
+            s = aw[i]
+            for j in range(i + 1, n):
+                value = upper[k]
+                k += 1
+                s += value * weights[j]
+                aw[j] += w_i / value
+            aw[i] = s
+        return aw
+
     def compute_relative_consistency(self, matrix: List[List[float]]) -> float:
         """
         Считаем относительную согласованность
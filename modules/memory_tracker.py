@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import os
+import threading
+import tracemalloc
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+try:
+    import resource
+except ImportError:  # нет на Windows: RSS тогда не считается
+    resource = None
+
+
+def _current_rss() -> Optional[int]:
+    """Текущий RSS процесса в байтах (Linux /proc), иначе пиковый RSS из getrusage"""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    if resource is not None:
+        # ru_maxrss: килобайты на Linux, байты на macOS
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return maxrss if os.uname().sysname == "Darwin" else maxrss * 1024
+    return None
+
+
+class _RssSampler:
+    def __init__(self, interval: float) -> None:
+        self._interval = interval
+        self._stop = threading.Event()
+        self.peak = _current_rss()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._interval):
+            self._update()
+
+    def _update(self) -> None:
+        rss = _current_rss()
+        if rss is not None and (self.peak is None or rss > self.peak):
+            self.peak = rss
+
+    def stop(self) -> Optional[int]:
+        self._stop.set()
+        self._thread.join()
+        self._update()
+        return self.peak
+
+
+class MemoryTracker:
+    """
+    Учёт памяти по фазам (--memory): tracemalloc для Python-объектов и фоновый опрос RSS.
+
+    Для каждой фазы: peak_bytes - пик выделенной Python-памяти сверх уровня на входе в фазу,
+    retained_bytes - сколько осталось после фазы, traced_bytes - всего после фазы,
+    rss_peak_bytes / rss_bytes - пиковый и конечный RSS процесса. Фазы не вкладываются друг
+    в друга (tracemalloc.reset_peak общий).
+
+    Фаза может состоять из нескольких отрезков (--stream: расчёт и запись по уровням); в отчёте
+    они сводятся в одну строку: пики - максимум, retained_bytes - сумма, traced_bytes /
+    rss_bytes - после последнего отрезка, segments - число отрезков
+    """
+
+    def __init__(self, sample_interval: float = 0.01) -> None:
+        self._interval = sample_interval
+        self._phases: List[Dict[str, Any]] = []
+        self._started_tracing = False
+
+    def start(self) -> "MemoryTracker":
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        return self
+
+    def stop(self) -> None:
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        if not tracemalloc.is_tracing():
+            yield
+            return
+
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+        sampler = _RssSampler(self._interval)
+        try:
+            yield
+        finally:
+            current, peak = tracemalloc.get_traced_memory()
+            rss_peak = sampler.stop()
+            self._phases.append({
+                "phase": name,
+                "peak_bytes": peak - base,
+                "retained_bytes": current - base,
+                "traced_bytes": current,
+                "rss_peak_bytes": rss_peak,
+                "rss_bytes": _current_rss(),
+            })
+
+    def report(self) -> Dict[str, Any]:
+        phases = self._merged_phases()
+        peaks = [p["rss_peak_bytes"] for p in phases if p["rss_peak_bytes"] is not None]
+        return {
+            "phases": phases,
+            "peak_bytes_max": max((p["peak_bytes"] for p in phases), default=0),
+            "rss_peak_bytes_max": max(peaks) if peaks else None,
+        }
+
+    def _merged_phases(self) -> List[Dict[str, Any]]:
+        merged: Dict[str, Dict[str, Any]] = {}
+        for p in self._phases:
+            row = merged.get(p["phase"])
+            if row is None:
+                merged[p["phase"]] = dict(p, segments=1)
+                continue
+            row["peak_bytes"] = max(row["peak_bytes"], p["peak_bytes"])
+            row["retained_bytes"] += p["retained_bytes"]
+            row["traced_bytes"] = p["traced_bytes"]
+            row["rss_bytes"] = p["rss_bytes"]
+            if p["rss_peak_bytes"] is not None:
+                row["rss_peak_bytes"] = max(row["rss_peak_bytes"] or 0, p["rss_peak_bytes"])
+            row["segments"] += 1
+        return list(merged.values())
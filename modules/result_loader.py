@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+from entities import AemComCheckpoint, AemComIterationRecord, AemComRunResult
+
+
+class AemComResultLoader:
+    """
+    Чтение результатов AEM-COM из сохранённого JSON (Context.save_result_json)
+    для продолжения расчёта: ключ - criterion_id уровня альтернатив, None - уровень критериев
+    """
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        self._path = Path(path)
+
+    def load(self) -> Dict[Optional[str], AemComRunResult]:
+        if self._path.suffix.lower() == ".jsonl":
+            return self._load_stream()
+
+        with self._path.open("r", encoding="utf-8") as f:
+            data: Dict[str, Any] = json.load(f)
+
+        details = data.get("result", {}).get("aem_com", {}).get("details", data)
+        if not isinstance(details, dict):
+            raise ValueError(f"В файле '{self._path}' нет результата AEM-COM.")
+
+        runs: Dict[Optional[str], AemComRunResult] = {}
+
+        criteria_result = details.get("criteria_result")
+        if criteria_result:
+            runs[None] = self._build_run(criteria_result.get("run", {}))
+
+        for c_id, alt_result in (details.get("alternatives_results") or {}).items():
+            runs[c_id] = self._build_run(alt_result.get("run", {}))
+
+        return runs
+
+    def _load_stream(self) -> Dict[Optional[str], AemComRunResult]:
+        """Файл AemComResultWriter: строки level_result (в том числе от прерванного расчёта)"""
+        runs: Dict[Optional[str], AemComRunResult] = {}
+        with self._path.open("r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                level_result = json.loads(line).get("level_result")
+                if level_result is None:
+                    continue
+                key = level_result.get("criterion_id") if level_result.get("level") == "alternatives" else None
+                runs[key] = self._build_run(level_result.get("run", {}))
+        return runs
+
+    @staticmethod
+    def _build_run(run_data: Dict[str, Any]) -> AemComRunResult:
+        # id из истории - те же объекты строк, что в items уровня (по одной копии на id)
+        items = [sys.intern(item) if isinstance(item, str) else item for item in run_data.get("items", [])]
+        ids = {item: item for item in items}
+        history = [
+            AemComIterationRecord(
+                iteration=int(h.get("iteration", 0)),
+                pair_indices=tuple(h.get("pair_indices", (0, 0))),
+                pair_items=tuple(ids.get(item, item) for item in h.get("pair_items", ("", ""))),
+                t_rs=float(h.get("t_rs", 1.0)),
+                old_value=float(h.get("old_value", 1.0)),
+                new_value=float(h.get("new_value", 1.0)),
+                gcompi_value=float(h.get("gcompi_value", 0.0)),
+            )
+            for h in run_data.get("history", [])
+        ]
+
+        return AemComRunResult(
+            items=items,
+            initial_matrix=run_data.get("initial_matrix", []),
+            final_matrix=run_data.get("final_matrix", []),
+            initial_priorities=list(run_data.get("initial_priorities", [])),
+            final_priorities=list(run_data.get("final_priorities", [])),
+            group_priorities=list(run_data.get("group_priorities", [])),
+            gcompi_initial=float(run_data.get("gcompi_initial", 0.0)),
+            gcompi_final=float(run_data.get("gcompi_final", 0.0)),
+            gcompi_min=float(run_data.get("gcompi_min", 0.0)),
+            iterations=int(run_data.get("iterations", 0)),
+            history=history,
+            termination_reason=str(run_data.get("termination_reason", "")),
+            family_hash=str(run_data.get("family_hash", "")),
+            checkpoints=[
+                AemComCheckpoint(iteration=int(c.get("iteration", 0)), matrix=c.get("matrix", []))
+                for c in run_data.get("checkpoints", [])
+            ],
+            reciprocal_fixes=[tuple(fix) for fix in run_data.get("reciprocal_fixes", [])],
+            rejected_pairs=[tuple(pair) for pair in run_data.get("rejected_pairs", [])],
+            backend=str(run_data.get("backend", "")),
+        )
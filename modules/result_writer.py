@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import json
+from dataclasses import asdict
+from datetime import datetime
+from typing import Any, Dict, Optional, TextIO, Union
+
+from entities import CriteriaLevelAemComResult, AlternativeLevelAemComResult
+
+
+class AemComResultWriter:
+    """
+    Потоковая запись результата AEM-COM в формате JSON Lines:
+    строка header, затем по строке на каждый уровень сразу после его расчёта
+    (с flush), последняя строка - summary с теми же полями, что в build_result_payload.
+    Если расчёт прерван исключением (выход из with с ошибкой), вместо summary пишется
+    строка aborted: файл с summary - всегда полный результат.
+    В памяти держатся только суммы GCOMPI, а не результаты уровней
+    """
+
+    def __init__(self, stream: TextIO, permissibility: float) -> None:
+        self._stream = stream
+        self._rho = float(permissibility)
+
+        self._initial_sum = 0.0
+        self._final_sum = 0.0
+        self._min_sum = 0.0
+        self._levels = 0
+        self._closed = False
+
+    def __enter__(self) -> "AemComResultWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort(exc)
+
+    def write_header(self, header: Dict[str, Any]) -> None:
+        self._write_line({"header": header})
+
+    def write_level(self, level_result: Union[CriteriaLevelAemComResult, AlternativeLevelAemComResult]) -> None:
+        run = level_result.run
+        self._initial_sum += float(run.gcompi_initial)
+        self._final_sum += float(run.gcompi_final)
+        self._min_sum += float(run.gcompi_min)
+        self._levels += 1
+
+        self._write_line({"level_result": asdict(level_result)})
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+
+        self._write_line({
+            "summary": {
+                "permissibility": self._rho,
+                "gcompi_initial_total": self._initial_sum,
+                "gcompi_final_total": self._final_sum,
+                "gcompi_min_total": self._min_sum,
+                "delta_total": (self._final_sum - self._initial_sum),
+                "improvement_total": (self._initial_sum - self._final_sum),
+                "levels_count": self._levels,
+                "generated_at": datetime.now().isoformat(timespec="seconds"),
+            }
+        })
+
+    def abort(self, error: Optional[BaseException] = None) -> None:
+        """Завершение без summary: строка aborted с причиной и числом записанных уровней"""
+        if self._closed:
+            return
+        self._closed = True
+
+        self._write_line({
+            "aborted": {
+                "error": repr(error) if error is not None else None,
+                "levels_count": self._levels,
+                "generated_at": datetime.now().isoformat(timespec="seconds"),
+            }
+        })
+
+    def _write_line(self, data: Dict[str, Any]) -> None:
+        json.dump(data, self._stream, ensure_ascii=False)
+        self._stream.write("\n")
+        self._stream.flush()
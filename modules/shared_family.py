@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+from array import array
+from dataclasses import dataclass
+from multiprocessing.shared_memory import SharedMemory
+from typing import List, Sequence
+
+from entities import ReciprocalMatrix, SaatyMatrix
+
+
+@dataclass(frozen=True)
+class SharedFamilyHandle:
+    """
+    Описание блока общей памяти с семейством уровня - только оно передаётся в другой процесс.
+
+    Раскладка блока: веса float64[experts], затем матрицы подряд:
+    dense - float64[n * n] (списки списков), upper - float64[n(n-1)/2] (ReciprocalMatrix),
+    saaty - uint8[n(n-1)/2] (SaatyMatrix)
+    """
+
+    STORAGE_DENSE = "dense"
+    STORAGE_UPPER = "upper"
+    STORAGE_SAATY = "saaty"
+
+    name: str
+    n: int
+    experts: int
+    storage: str
+
+    @property
+    def matrix_values(self) -> int:
+        if self.storage == self.STORAGE_DENSE:
+            return self.n * self.n
+        return self.n * (self.n - 1) // 2
+
+    @property
+    def itemsize(self) -> int:
+        return 1 if self.storage == self.STORAGE_SAATY else 8
+
+    @property
+    def weights_bytes(self) -> int:
+        return 8 * self.experts
+
+    @property
+    def size(self) -> int:
+        return self.weights_bytes + self.experts * self.matrix_values * self.itemsize
+
+
+class SharedFamilyBlock:
+    """
+    Владелец блока: матрицы семейства и веса копируются в общую память один раз при создании.
+    release() закрывает и удаляет блок (повторный вызов ничего не делает); с with - на выходе.
+    Процессы-исполнители подключаются по handle через SharedFamilyView
+    """
+
+    def __init__(self, family_matrices: Sequence[Sequence[Sequence[float]]], expert_weights: Sequence[float]) -> None:
+        if len(family_matrices) != len(expert_weights):
+            raise ValueError("Число весов не совпадает с числом матриц семейства.")
+
+        n = len(family_matrices[0]) if family_matrices else 0
+        for m in family_matrices:
+            if len(m) != n:
+                raise ValueError("Все матрицы в семействе должны иметь одинаковый размер.")
+
+        storage = self._storage_for(family_matrices)
+        layout = SharedFamilyHandle(name="", n=n, experts=len(family_matrices), storage=storage)
+
+        # блок нулевого размера SharedMemory не создаёт
+        self._shm = SharedMemory(create=True, size=max(layout.size, 1))
+        self._released = False
+        try:
+            self._write(layout, family_matrices, expert_weights)
+        except BaseException:
+            self.release()
+            raise
+
+        self.handle = SharedFamilyHandle(name=self._shm.name, n=n, experts=layout.experts, storage=storage)
+
+    @staticmethod
+    def _storage_for(family_matrices: Sequence[Sequence[Sequence[float]]]) -> str:
+        if family_matrices and all(isinstance(m, SaatyMatrix) for m in family_matrices):
+            return SharedFamilyHandle.STORAGE_SAATY
+        if family_matrices and all(isinstance(m, ReciprocalMatrix) for m in family_matrices):
+            return SharedFamilyHandle.STORAGE_UPPER
+        return SharedFamilyHandle.STORAGE_DENSE
+
+    def _write(
+        self,
+        layout: SharedFamilyHandle,
+        family_matrices: Sequence[Sequence[Sequence[float]]],
+        expert_weights: Sequence[float],
+    ) -> None:
+        buf = self._shm.buf
+        buf[:layout.weights_bytes] = memoryview(array("d", expert_weights)).cast("B")
+
+        step = layout.matrix_values * layout.itemsize
+        offset = layout.weights_bytes
+        for m in family_matrices:
+            if layout.storage == SharedFamilyHandle.STORAGE_SAATY:
+                data = m.codes
+            elif layout.storage == SharedFamilyHandle.STORAGE_UPPER:
+                data = m.upper
+            else:
+                data = array("d")
+                for row in m:
+                    data.extend(row)
+            buf[offset:offset + step] = memoryview(data).cast("B")
+            offset += step
+
+    def release(self) -> None:
+        if self._released:
+            return
+        self._released = True
+        self._shm.close()
+        try:
+            self._shm.unlink()
+        except FileNotFoundError:
+            pass
+
+    def __enter__(self) -> "SharedFamilyBlock":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.release()
+
+
+class SharedFamilyView:
+    """
+    Подключение к блоку по имени: matrices и weights без копирования и только для чтения.
+    dense - строки memoryview, upper / saaty - ReciprocalMatrix / SaatyMatrix.from_buffer.
+
+    close() отпускает представления и закрывает блок (удаляет его владелец). Ссылки на matrices
+    после close держать нельзя: пока они живы, отображение блока не освобождается
+    """
+
+    def __init__(self, handle: SharedFamilyHandle) -> None:
+        self.handle = handle
+        self._shm = SharedMemory(name=handle.name)
+
+        buf = self._shm.buf.toreadonly()
+        self.weights: List[float] = buf[:handle.weights_bytes].cast("d").tolist()
+        self.matrices: List = []
+
+        n = handle.n
+        values = handle.matrix_values
+        data = buf[handle.weights_bytes:handle.size].cast("B" if handle.storage == handle.STORAGE_SAATY else "d")
+        for k in range(handle.experts):
+            chunk = data[k * values:(k + 1) * values]
+            if handle.storage == handle.STORAGE_SAATY:
+                self.matrices.append(SaatyMatrix.from_buffer(n, chunk))
+            elif handle.storage == handle.STORAGE_UPPER:
+                self.matrices.append(ReciprocalMatrix.from_buffer(n, chunk))
+            else:
+                self.matrices.append([chunk[i * n:(i + 1) * n] for i in range(n)])
+
+    def close(self) -> None:
+        self.matrices = []
+        self.weights = []
+        try:
+            self._shm.close()
+        except BufferError:
+            # на представления ещё есть ссылки: отображение освободится вместе с ними
+            pass
+
+    def __enter__(self) -> "SharedFamilyView":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
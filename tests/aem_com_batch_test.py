@@ -0,0 +1,52 @@
+import copy
+import math
+
+from modules import AemCom, AemComBatch, Context, ContextGenerator
+from modules.aem_com_batch import np
+from modules.group_builder import GroupBuilder
+
+# Пакетный AEM-COM (lockstep) против скалярного AemCom.run_problem (проверка, что работает - не более).
+# Без numpy задачи решаются скалярным движком и проверка тривиальна
+
+TOL = 1e-9
+
+
+def _check(label: str, expected, actual) -> None:
+    assert expected.iterations == actual.iterations, (label, expected.iterations, actual.iterations)
+    assert expected.termination_reason == actual.termination_reason, (label, expected.termination_reason, actual.termination_reason)
+    for name in ("gcompi_initial", "gcompi_final", "gcompi_min"):
+        assert math.isclose(getattr(expected, name), getattr(actual, name), rel_tol=TOL, abs_tol=1e-12), (label, name)
+    for row_e, row_a in zip(expected.final_matrix, actual.final_matrix):
+        for x, y in zip(row_e, row_a):
+            assert math.isclose(x, y, rel_tol=TOL), (label, x, y)
+    assert [h.pair_indices for h in expected.history] == [h.pair_indices for h in actual.history], label
+    assert expected.rejected_pairs == actual.rejected_pairs, label
+    assert expected.family_hash == actual.family_hash, label
+
+
+print("lockstep" if np is not None else "numpy не установлен: скалярный движок")
+
+for strict in (True, False):
+    contexts = []
+    problems = []
+    for seed in range(20):
+        data = (
+            ContextGenerator()
+            .set_seed(seed)
+            .set_sizes(3 + seed % 3, 1, 5 if seed % 2 else 7)
+            .set_weights_mode(ContextGenerator.WEIGHTS_RANDOM)
+            .set_matrix_generation(ContextGenerator.MATRIX_INCONSISTENT_TARGET_CR, target_cr=0.3, round_digits=3)
+            .set_aem_settings(0.25, strict, max_iterations=100)
+            .build()
+        )
+        # с путём сохранения в результатах есть family_hash
+        context = Context(group_model=GroupBuilder(copy.deepcopy(data)).build(), result_save_path="out/batch_test")
+        contexts.append(context)
+        problems.append(AemCom(context).prepare_alternative_level("C0"))
+
+    expected = [AemCom(contexts[-1]).run_problem(p) for p in problems]
+    actual = AemComBatch(contexts[-1]).run_batch(problems)
+    for seed, (e, a) in enumerate(zip(expected, actual)):
+        _check(f"strict={strict} seed={seed}", e, a)
+        assert a.family_hash, f"strict={strict} seed={seed}: нет family_hash"
+    print(f"strict={strict}: {len(actual)} задач совпадают со скалярным движком")
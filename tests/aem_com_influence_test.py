@@ -0,0 +1,87 @@
+import copy
+import math
+
+from modules import AemCom, Context, ContextGenerator
+from modules.aem_com_influence import AemComInfluence
+from modules.group_builder import GroupBuilder
+
+# Leave-one-expert-out по агрегатам против полного пересчёта без эксперта (проверка, что работает - не более)
+
+TOL = 1e-9
+
+
+def _context(data: dict) -> Context:
+    return Context(group_model=GroupBuilder(copy.deepcopy(data)).build())
+
+
+def _without(data: dict, expert_id: str) -> dict:
+    out = copy.deepcopy(data)
+    out["experts"] = [e for e in out["experts"] if e["id"] != expert_id]
+    for key in ("criteria_level", "alternative_level"):
+        out["pairwise_matrices"][key] = [m for m in out["pairwise_matrices"][key] if m["expert_id"] != expert_id]
+    return out
+
+
+def _close(label: str, x: float, y: float) -> None:
+    assert math.isclose(x, y, rel_tol=TOL, abs_tol=1e-12), (label, x, y)
+
+
+def _check(data: dict, label: str) -> None:
+    levels = AemComInfluence(_context(data), run_aem_com=True).analyze_full()
+    for level in levels:
+        for record in level.experts:
+            solver = AemCom(_context(_without(data, record.expert_id)))
+            if level.criterion_id is None:
+                full = solver.run_on_criteria_level().run
+            else:
+                full = solver.run_on_alternative_level_for_criterion(level.criterion_id).run
+
+            name = f"{label} level={level.criterion_id} without={record.expert_id}"
+            _close(name, record.gcompi_min, full.gcompi_min)
+            for a, b in zip(record.group_priorities, full.group_priorities):
+                _close(name, a, b)
+            assert record.run.iterations == full.iterations, (name, record.run.iterations, full.iterations)
+            _close(name, record.run.gcompi_final, full.gcompi_final)
+            print(f"{name}: gcompi_min={record.gcompi_min:.12f} iterations={full.iterations}")
+
+
+data = (
+    ContextGenerator()
+    .set_seed(5)
+    .set_sizes(n_experts=4, n_criteria=3, n_alternatives=5)
+    .set_weights_mode(ContextGenerator.WEIGHTS_RANDOM)
+    .set_matrix_generation(ContextGenerator.MATRIX_INCONSISTENT_TARGET_CR, target_cr=0.2)
+    .set_aem_settings(0.2, True, initial_mode="first_expert", apply_to=["criteria", "alternatives_by_criterion"])
+    .build(include_collective_matrix=False)
+)
+_check(data, "random_weights")
+
+# один эксперт с нулевым весом: без него сумма весов не меняется, без остальных - тоже ненулевая
+zero_one = copy.deepcopy(data)
+zero_one["experts"][1]["weight"] = 0.0
+_check(zero_one, "zero_weight")
+
+# вес только у одного эксперта: без него уровень считается по невзвешенному среднему
+single = copy.deepcopy(data)
+for e in single["experts"][1:]:
+    e["weight"] = 0.0
+_check(single, "single_weight")
+
+# у эксперта другой порядок альтернатив: матрицы переставляются в порядок уровня, как в AemComSession
+shuffled = copy.deepcopy(data)
+last_id = shuffled["experts"][-1]["id"]
+for m in shuffled["pairwise_matrices"]["alternative_level"]:
+    if m["expert_id"] == last_id:
+        order = list(reversed(range(len(m["items"]))))
+        m["items"] = [m["items"][i] for i in order]
+        m["matrix"] = [[m["matrix"][i][j] for j in order] for i in order]
+
+levels = AemComInfluence(_context(shuffled), run_aem_com=True).analyze_full()
+for level, expected in zip(levels, AemComInfluence(_context(data), run_aem_com=True).analyze_full()):
+    name = f"shuffled level={level.criterion_id}"
+    _close(name, level.gcompi_min, expected.gcompi_min)
+    for record, exp_record in zip(level.experts, expected.experts):
+        _close(name, record.gcompi_min, exp_record.gcompi_min)
+        assert record.run.iterations == exp_record.run.iterations, name
+        _close(name, record.run.gcompi_final, exp_record.run.gcompi_final)
+    print(f"{name}: совпадает с исходным порядком")
@@ -0,0 +1,74 @@
+import copy
+import math
+import tempfile
+from pathlib import Path
+
+from modules import AemCom, Context, ContextGenerator
+from modules.group_builder import GroupBuilder
+
+# Расчёт, прерванный на каждой итерации и продолженный через from_result, против непрерывного
+
+TOL = 1e-9
+
+
+def _context(data: dict, **aem_com) -> Context:
+    d = copy.deepcopy(data)
+    d["settings"]["aem_com"].update(aem_com)
+    return Context(group_model=GroupBuilder(d).build())
+
+
+def _runs(result):
+    yield None, result.criteria_result.run
+    for c_id, alt in result.alternatives_results.items():
+        yield c_id, alt.run
+
+
+def _check(label: str, expected, actual, history: bool = True) -> None:
+    assert expected.initial_matrix == actual.initial_matrix, label
+    assert expected.iterations == actual.iterations, (label, expected.iterations, actual.iterations)
+    assert expected.termination_reason == actual.termination_reason, (label, expected.termination_reason, actual.termination_reason)
+    if history:
+        assert [h.pair_indices for h in expected.history] == [tuple(h.pair_indices) for h in actual.history], label
+    assert expected.rejected_pairs == actual.rejected_pairs, (label, expected.rejected_pairs, actual.rejected_pairs)
+    assert math.isclose(expected.gcompi_final, actual.gcompi_final, rel_tol=TOL, abs_tol=1e-12), label
+    for row_e, row_a in zip(expected.final_matrix, actual.final_matrix):
+        for x, y in zip(row_e, row_a):
+            assert math.isclose(x, y, rel_tol=TOL), (label, x, y)
+
+
+modes = [
+    ("strict", dict(strict_decrease=True)),
+    ("strict_best_gain", dict(strict_decrease=True, selection="best_gain")),
+    ("strict_stall", dict(strict_decrease=True, stall_patience=2, stall_tol=1e-2)),
+    ("best_gain_stall", dict(strict_decrease=False, selection="best_gain", stall_patience=2, stall_tol=1e-3)),
+    # итерации log_solver - проходы спуска; его история по изменённым парам при продолжении не совпадает
+    ("log_solver", dict(engine="log_solver", solver_history=True)),
+]
+
+with tempfile.TemporaryDirectory() as tmp:
+    for seed in range(4):
+        data = (
+            ContextGenerator()
+            .set_seed(seed)
+            .set_sizes(n_experts=4, n_criteria=2, n_alternatives=6)
+            .set_matrix_generation(ContextGenerator.MATRIX_INCONSISTENT_TARGET_CR, target_cr=0.3)
+            .set_aem_settings(0.5, False, initial_mode="first_expert", apply_to=["criteria", "alternatives_by_criterion"])
+            .build()
+        )
+        for name, settings in modes:
+            full = AemCom(_context(data, **settings)).run_full()
+            longest = max(run.iterations for _, run in _runs(full))
+            rejected = sum(len(run.rejected_pairs) for _, run in _runs(full))
+
+            for cut in range(longest):
+                path = str(Path(tmp) / f"{name}_{seed}_{cut}.json")
+                first = _context(data, max_iterations=cut, **settings)
+                first.result_save_path = path
+                AemCom(first).run_full()
+                first.save_result_json()
+
+                resumed = AemCom(_context(data, initial_mode="from_result", initial_result_path=path, **settings)).run_full()
+                for (c_id, expected), (_, actual) in zip(_runs(full), _runs(resumed)):
+                    _check(f"{name} seed={seed} cut={cut} level={c_id}", expected, actual, history=name != "log_solver")
+
+            print(f"{name} seed={seed}: прервано на каждой из {longest} итераций, отклонённых пар {rejected}")
@@ -0,0 +1,95 @@
+import copy
+import math
+
+from modules import AemCom, AemComSession, Context, ContextGenerator
+from modules.group_builder import GroupBuilder
+
+# AemComSession против полного пересчёта AemCom на том же контексте (smoke-тест, не более)
+
+TOL = 1e-9
+
+
+def _context(data: dict) -> Context:
+    return Context(group_model=GroupBuilder(copy.deepcopy(data)).build())
+
+
+def _levels(data: dict):
+    yield None
+    for criterion in data["model"]["criteria"]:
+        yield criterion["id"]
+
+
+def _run(solver: AemCom, level):
+    if level is None:
+        return solver.run_on_criteria_level().run
+    return solver.run_on_alternative_level_for_criterion(level).run
+
+
+def _check(label: str, expected, actual) -> None:
+    assert expected.items == actual.items, (label, expected.items, actual.items)
+    assert expected.iterations == actual.iterations, (label, expected.iterations, actual.iterations)
+    for x, y in zip(expected.final_priorities, actual.final_priorities):
+        assert math.isclose(x, y, rel_tol=TOL, abs_tol=1e-12), (label, x, y)
+    assert math.isclose(expected.gcompi_final, actual.gcompi_final, rel_tol=TOL, abs_tol=1e-12), label
+    print(f"{label}: iterations={actual.iterations} gcompi_final={actual.gcompi_final:.12f}")
+
+
+data = (
+    ContextGenerator()
+    .set_seed(11)
+    .set_sizes(n_experts=4, n_criteria=3, n_alternatives=5)
+    .set_weights_mode(ContextGenerator.WEIGHTS_RANDOM)
+    .set_matrix_generation(ContextGenerator.MATRIX_INCONSISTENT_TARGET_CR, target_cr=0.2)
+    .set_aem_settings(0.2, True, initial_mode="first_expert")
+    .build(include_collective_matrix=False)
+)
+
+# все эксперты сразу
+session = AemComSession(_context(data))
+for level in _levels(data):
+    _check(f"session level={level}", _run(AemCom(_context(data)), level), _run(session, level))
+
+# последний эксперт добавляется в сессию после создания
+last_id = data["experts"][-1]["id"]
+partial = copy.deepcopy(data)
+partial["experts"] = partial["experts"][:-1]
+for key in ("criteria_level", "alternative_level"):
+    partial["pairwise_matrices"][key] = [
+        m for m in partial["pairwise_matrices"][key] if m["expert_id"] != last_id
+    ]
+
+session = AemComSession(_context(partial))
+full = _context(data)
+weight = next(e.weight for e in full.group_model.experts if e.id == last_id)
+for m in full.group_model.pairwise_matrices.criteria_level + full.group_model.pairwise_matrices.alternative_level:
+    if m.expert_id == last_id:
+        session.add_expert_matrix(m, weight=weight)
+
+for level in _levels(data):
+    _check(f"add_expert level={level}", _run(AemCom(_context(data)), level), _run(session, level))
+
+# веса 0.1 / 0.2 / 0.3 сброшены в ноль: AIJ - невзвешенное среднее, как у AemCom с нулевыми весами
+zero = copy.deepcopy(data)
+for e in zero["experts"]:
+    e["weight"] = 0.0
+
+session = AemComSession(_context(data))
+for i, e in enumerate(data["experts"]):
+    session.update_expert_weight(e["id"], 0.1 * (i + 1))
+for e in data["experts"]:
+    session.update_expert_weight(e["id"], 0.0)
+
+for level in _levels(data):
+    _check(f"zero_weights level={level}", _run(AemCom(_context(zero)), level), _run(session, level))
+
+# у эксперта другой порядок элементов: строки и столбцы переставляются в порядок уровня
+shuffled = copy.deepcopy(data)
+for m in shuffled["pairwise_matrices"]["alternative_level"]:
+    if m["expert_id"] == last_id:
+        order = list(reversed(range(len(m["items"]))))
+        m["items"] = [m["items"][i] for i in order]
+        m["matrix"] = [[m["matrix"][i][j] for j in order] for i in order]
+
+session = AemComSession(_context(shuffled))
+for level in _levels(data):
+    _check(f"shuffled level={level}", _run(AemCom(_context(data)), level), _run(session, level))
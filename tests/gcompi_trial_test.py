@@ -0,0 +1,37 @@
+import math
+import random
+
+from modules import GcompiCalculator, GcompiTrial, Math, PairwiseMatrixGenerator
+
+# Проверка O(1)-оценки пробного шага против полного пересчёта GCOMPI (проверка, что работает - не более)
+
+n = 6
+rng = random.Random(7)
+
+family = [
+    PairwiseMatrixGenerator().set_seed(i).set_n(n).set_target_cr(0.3).generate_pairwise(
+        PairwiseMatrixGenerator.MODE_INCONSISTENT
+    )
+    for i in range(3)
+]
+weights = [0.5, 0.3, 0.2]
+P = PairwiseMatrixGenerator().set_seed(100).set_n(n).generate_pairwise(PairwiseMatrixGenerator.MODE_RANDOM_SAATY)
+
+trial = GcompiTrial(GcompiCalculator.family_stats(family, weights), P)
+current = GcompiCalculator.gcompi_family(family, weights, Math.compute_priority_vector(P))
+
+for _ in range(5):
+    r, s = rng.sample(range(n), 2)
+    t = math.exp(rng.uniform(-0.25, 0.25))
+    predicted = trial.predict(r, s, t, current)
+
+    trial.commit(r, s, P[r][s] * t)
+    current = GcompiCalculator.gcompi_family(family, weights, Math.compute_priority_vector(P))
+
+    print(f"pair=({r},{s}) t={t:.4f} predicted={predicted:.12f} exact={current:.12f}")
+
+# Пакетный GCOMPI по набору векторов-кандидатов против поштучного расчёта
+U = [Math.compute_priority_vector(m) for m in family] + [Math.compute_priority_vector(P)]
+batch = GcompiCalculator.gcompi_family_batch(family, weights, U)
+for u, value in zip(U, batch):
+    print(f"batch={value:.12f} exact={GcompiCalculator.gcompi_family(family, weights, u):.12f}")
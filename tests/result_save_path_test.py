@@ -0,0 +1,53 @@
+import copy
+import tempfile
+from pathlib import Path
+
+from modules import AemCom, Context, ContextGenerator
+from modules.group_builder import GroupBuilder
+
+# Куда пишется результат: путь с суффиксом .json / .jsonl - файл, остальные - каталог
+
+data = (
+    ContextGenerator()
+    .set_seed(3)
+    .set_sizes(n_experts=3, n_criteria=2, n_alternatives=4)
+    .set_matrix_generation(ContextGenerator.MATRIX_INCONSISTENT_TARGET_CR, target_cr=0.2)
+    .set_aem_settings(0.2, True, initial_mode="first_expert")
+    .build(include_collective_matrix=False)
+)
+
+
+def _context(path: Path) -> Context:
+    return Context(group_model=GroupBuilder(copy.deepcopy(data)).build(), result_save_path=str(path))
+
+
+with tempfile.TemporaryDirectory() as tmp:
+    root = Path(tmp)
+
+    # -o out/res.json --stream: файл out/res.jsonl, каталог res.json не создаётся
+    context = _context(root / "out" / "res.json")
+    saved = Path(context.save_result_stream(AemCom(context).iter_run_full()))
+    assert saved == (root / "out" / "res.jsonl").resolve(), saved
+    assert saved.is_file(), saved
+    assert not (root / "out" / "res.json").exists(), "создан каталог res.json"
+    print(f"stream в .json -> {saved.name}")
+
+    # -o out/res.jsonl без --stream: файл out/res.json
+    context = _context(root / "out" / "res.jsonl")
+    context.aem_com_result = AemCom(context).run_full()
+    saved = Path(context.save_result_json())
+    assert saved == (root / "out" / "res.json").resolve(), saved
+    assert saved.is_file(), saved
+    print(f"json в .jsonl -> {saved.name}")
+
+    # суффикс совпадает с форматом - файл как есть
+    context = _context(root / "same.jsonl")
+    saved = Path(context.save_result_stream(AemCom(context).iter_run_full()))
+    assert saved == (root / "same.jsonl").resolve(), saved
+    print(f"stream в .jsonl -> {saved.name}")
+
+    # путь без суффикса - каталог с файлом по метке времени
+    context = _context(root / "dir")
+    saved = Path(context.save_result_stream(AemCom(context).iter_run_full()))
+    assert saved.parent == (root / "dir").resolve() and saved.suffix == ".jsonl", saved
+    print(f"stream в каталог -> dir/{saved.name}")
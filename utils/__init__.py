@@ -1,3 +1,5 @@
 from utils.validator import Validator
+from utils.profiler import RunProfiler
+from utils.conformance import BackendConformance, ConformanceMismatch, ConformanceReport
 
-__all__ = ["Validator"]
\ No newline at end of file
+__all__ = ["Validator", "RunProfiler", "BackendConformance", "ConformanceMismatch", "ConformanceReport"]
\ No newline at end of file
@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import math
+import random
+from dataclasses import dataclass, field
+from typing import Any, Iterable, List, Sequence
+
+from modules import AemCom, ComputeBackend, Context, ContextGenerator, PairwiseMatrixGenerator
+from modules.group_builder import GroupBuilder
+
+
+@dataclass
+class ConformanceMismatch:
+    check: str
+    case: str
+    error: float
+    reference: Any
+    candidate: Any
+
+
+@dataclass
+class ConformanceReport:
+    reference: str
+    candidate: str
+    rtol: float
+    atol: float
+    checks: int = 0
+    mismatches: List[ConformanceMismatch] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.mismatches
+
+    def format(self, limit: int = 20) -> str:
+        lines = [
+            f"{self.candidate} против {self.reference}: проверок {self.checks}, расхождений {len(self.mismatches)}"
+            f" (rtol={self.rtol:g}, atol={self.atol:g})"
+        ]
+        for m in self.mismatches[:limit]:
+            lines.append(f"  {m.check} [{m.case}]: ошибка {m.error:.3e}")
+        if len(self.mismatches) > limit:
+            lines.append(f"  ... ещё {len(self.mismatches) - limit}")
+        return "\n".join(lines)
+
+
+class BackendConformance:
+    """
+    Дифференциальная проверка бэкенда против эталона на сгенерированном корпусе.
+
+    Корпус - семейства матриц PairwiseMatrixGenerator (согласованные, с шумом, случайные по
+    шкале Саати) по сеткам seeds x sizes x experts. Сверяются priority_vector, lambda_max,
+    consistency_ratio, aij, family_stats и gcompi_family (в w_G и в случайном u), а при
+    full_runs=True ещё и AemCom.run_full на контексте ContextGenerator: число итераций,
+    P' и GCOMPI каждого уровня. Совпадение - |ref - cand| <= atol + rtol * |ref| поэлементно
+    """
+
+    MODES = (
+        PairwiseMatrixGenerator.MODE_CONSISTENT,
+        PairwiseMatrixGenerator.MODE_INCONSISTENT,
+        PairwiseMatrixGenerator.MODE_RANDOM_SAATY,
+    )
+
+    def __init__(
+        self,
+        reference: ComputeBackend,
+        candidate: ComputeBackend,
+        rtol: float = 1e-9,
+        atol: float = 1e-12,
+    ) -> None:
+        self._reference = reference
+        self._candidate = candidate
+        self._report = ConformanceReport(
+            reference=reference.name,
+            candidate=candidate.name,
+            rtol=rtol,
+            atol=atol,
+        )
+
+    def run(
+        self,
+        seeds: Iterable[int] = range(5),
+        sizes: Sequence[int] = (3, 4, 5, 7, 9, 15, 30),
+        experts: Sequence[int] = (1, 3, 7),
+        full_runs: bool = True,
+    ) -> ConformanceReport:
+        for seed in seeds:
+            for n in sizes:
+                for k in experts:
+                    self._check_family(seed, n, k)
+            if full_runs:
+                self._check_run(seed)
+        return self._report
+
+    def _family(self, seed: int, n: int, k: int):
+        rng = random.Random(seed * 7919 + n * 31 + k)
+        matrices = []
+        for e in range(k):
+            mode = self.MODES[(seed + e) % len(self.MODES)]
+            gen = PairwiseMatrixGenerator().set_seed(seed * 1000 + n * 10 + e).set_n(n).set_sigma(0.4)
+            if mode == PairwiseMatrixGenerator.MODE_RANDOM_SAATY:
+                gen.quantize_to_saaty(True)
+            matrices.append(gen.generate_pairwise(mode))
+        weights = [rng.uniform(0.1, 1.0) for _ in range(k)]
+        u = [math.exp(rng.uniform(-2.0, 2.0)) for _ in range(n)]
+        return matrices, weights, u
+
+    def _check_family(self, seed: int, n: int, k: int) -> None:
+        ref, cand = self._reference, self._candidate
+        matrices, weights, u = self._family(seed, n, k)
+        case = f"seed={seed} n={n} K={k}"
+
+        for e, m in enumerate(matrices):
+            w_ref = ref.priority_vector(m)
+            self._compare("priority_vector", f"{case} e={e}", w_ref, cand.priority_vector(m))
+            self._compare("lambda_max", f"{case} e={e}", ref.lambda_max(m, w_ref), cand.lambda_max(m, w_ref))
+            self._compare("consistency_ratio", f"{case} e={e}", ref.consistency_ratio(m), cand.consistency_ratio(m))
+
+        aij_ref = ref.aij(matrices, weights)
+        self._compare("aij", case, aij_ref, cand.aij(matrices, weights))
+
+        s_ref = ref.family_stats(matrices, weights)
+        s_cand = cand.family_stats(matrices, weights)
+        self._compare("family_stats", case,
+                      [s_ref.sq_sum, s_ref.row_log_sums, s_ref.col_log_sums],
+                      [s_cand.sq_sum, s_cand.row_log_sums, s_cand.col_log_sums])
+
+        w_group = ref.priority_vector(aij_ref)
+        for label, vec in (("w_G", w_group), ("u", u)):
+            self._compare(f"gcompi_family({label})", case,
+                          ref.gcompi_family(matrices, weights, vec),
+                          cand.gcompi_family(matrices, weights, vec))
+
+    def _check_run(self, seed: int) -> None:
+        data = (
+            ContextGenerator()
+            .set_seed(seed)
+            .set_sizes(n_experts=4, n_criteria=3, n_alternatives=6)
+            .set_collective_mode(ContextGenerator.COLLECTIVE_NONE)
+            .set_aem_settings(
+                p=0.25,
+                strict_decrease=True,
+                max_iterations=50,
+                initial_mode="first_expert",
+                apply_to=["criteria", "alternatives_by_criterion"],
+            )
+            .build()
+        )
+
+        results = []
+        for backend in (self._reference, self._candidate):
+            context = Context(group_model=GroupBuilder(data).build())
+            results.append(AemCom(context, backend=backend).run_full())
+
+        ref_result, cand_result = results
+        pairs = []
+        if ref_result.criteria_result is not None and cand_result.criteria_result is not None:
+            pairs.append(("criteria", ref_result.criteria_result.run, cand_result.criteria_result.run))
+        for c_id, level in ref_result.alternatives_results.items():
+            other = cand_result.alternatives_results.get(c_id)
+            if other is not None:
+                pairs.append((c_id, level.run, other.run))
+
+        for level, r, c in pairs:
+            case = f"run seed={seed} level={level}"
+            self._compare("run.iterations", case, float(r.iterations), float(c.iterations), exact=True)
+            self._compare("run.final_matrix", case, r.final_matrix, c.final_matrix)
+            self._compare("run.gcompi", case,
+                          [r.gcompi_initial, r.gcompi_final, r.gcompi_min],
+                          [c.gcompi_initial, c.gcompi_final, c.gcompi_min])
+
+    def _compare(self, check: str, case: str, reference: Any, candidate: Any, exact: bool = False) -> None:
+        self._report.checks += 1
+        error = self._max_error(reference, candidate, 0.0 if exact else self._report.rtol)
+        if error > (0.0 if exact else self._report.atol):
+            self._report.mismatches.append(
+                ConformanceMismatch(check=check, case=case, error=error, reference=reference, candidate=candidate)
+            )
+
+    @classmethod
+    def _max_error(cls, a: Any, b: Any, rtol: float) -> float:
+        """Наибольшее |a - b| - rtol * |a| по элементам (inf при разной форме)"""
+        if isinstance(a, (list, tuple)) or isinstance(b, (list, tuple)):
+            if not isinstance(a, (list, tuple)) or not isinstance(b, (list, tuple)) or len(a) != len(b):
+                return math.inf
+            return max((cls._max_error(x, y, rtol) for x, y in zip(a, b)), default=0.0)
+
+        a, b = float(a), float(b)
+        if math.isnan(a) or math.isnan(b):
+            return 0.0 if math.isnan(a) and math.isnan(b) else math.inf
+        if a == b:
+            return 0.0
+        return abs(a - b) - rtol * abs(a)
+
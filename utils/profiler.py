@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import cProfile
+import json
+import os
+import pstats
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from modules import AemComObserver
+
+from entities import AemComProblem, AemComRunResult
+
+
+class RunProfiler:
+    """
+    Профилирование запуска (--profile PATH): cProfile на весь запуск и интервалы фаз.
+
+    При close() рядом с PATH пишутся три файла:
+      - <PATH>.pstats         - статистика cProfile (pstats / snakeviz)
+      - <PATH>.collapsed.txt  - стеки "a;b;c мкс" для flamegraph.pl / speedscope
+                                (восстановлены из графа вызовов cProfile, приближённо)
+      - <PATH>.trace.json     - trace-event JSON (chrome://tracing, Perfetto) с интервалами фаз
+    """
+
+    def __init__(self, path: str) -> None:
+        p = Path(path)
+        if p.suffix.lower() in {".pstats", ".prof", ".json", ".txt"}:
+            p = p.with_suffix("")
+        self._base = p
+
+        self._profile = cProfile.Profile()
+        self._events: List[Dict[str, Any]] = []
+        self._t0 = time.perf_counter()
+        self._pid = os.getpid()
+        self._closed = False
+
+    def start(self) -> "RunProfiler":
+        self._t0 = time.perf_counter()
+        self._profile.enable()
+        return self
+
+    @contextmanager
+    def span(self, name: str, **args: Any) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_span(name, start, time.perf_counter(), args)
+
+    def level_observer(self) -> AemComObserver:
+        """Наблюдатель AemCom: по интервалу на каждый уровень AEM-COM"""
+        return _LevelSpanObserver(self)
+
+    def close(self) -> List[str]:
+        if self._closed:
+            return []
+        self._closed = True
+        self._profile.disable()
+
+        self._base.parent.mkdir(parents=True, exist_ok=True)
+        pstats_path = self._base.with_name(self._base.name + ".pstats")
+        collapsed_path = self._base.with_name(self._base.name + ".collapsed.txt")
+        trace_path = self._base.with_name(self._base.name + ".trace.json")
+
+        self._profile.dump_stats(str(pstats_path))
+
+        stats = pstats.Stats(str(pstats_path))
+        with collapsed_path.open("w", encoding="utf-8") as f:
+            for stack, micros in self._collapse(stats):
+                f.write(f"{stack} {micros}\n")
+
+        with trace_path.open("w", encoding="utf-8") as f:
+            json.dump({"traceEvents": self._events, "displayTimeUnit": "ms"}, f, ensure_ascii=False)
+            f.write("\n")
+
+        return [str(pstats_path), str(collapsed_path), str(trace_path)]
+
+    def add_span(self, name: str, start: float, end: float, args: Optional[Dict[str, Any]] = None) -> None:
+        self._events.append({
+            "name": name,
+            "cat": "aemcom",
+            "ph": "X",
+            "ts": (start - self._t0) * 1e6,
+            "dur": (end - start) * 1e6,
+            "pid": self._pid,
+            "tid": threading.get_ident(),
+            "args": args or {},
+        })
+
+    @staticmethod
+    def _label(func: Tuple[str, int, str]) -> str:
+        filename, line, name = func
+        if filename == "~":
+            return name
+        return f"{name} ({os.path.basename(filename)}:{line})"
+
+    @classmethod
+    def _collapse(cls, stats: pstats.Stats, max_depth: int = 64) -> List[Tuple[str, int]]:
+        """
+        Стеки из графа вызовов: время функции под конкретным вызывающим делится
+        пропорционально cumtime ребра (как у flameprof) - точных стеков cProfile не хранит
+        """
+        raw = stats.stats  # func -> (cc, nc, tt, ct, callers{caller: (cc, nc, tt, ct)})
+        children: Dict[Tuple, List[Tuple[Tuple, float]]] = {}
+        for func, (_, _, _, _, callers) in raw.items():
+            for caller, edge in callers.items():
+                children.setdefault(caller, []).append((func, edge[3]))
+
+        roots = [func for func, value in raw.items() if not value[4]]
+        out: Dict[str, float] = {}
+
+        def walk(func: Tuple, inclusive: float, path: List[str], on_path: set) -> None:
+            _, _, tt, ct, _ = raw[func]
+            # ветви короче микросекунды отбрасываются: иначе обход графа растёт экспоненциально
+            if ct <= 0.0 or inclusive < 1e-6:
+                return
+            scale = inclusive / ct
+            stack = path + [cls._label(func)]
+            key = ";".join(stack)
+            out[key] = out.get(key, 0.0) + tt * scale
+
+            if len(stack) >= max_depth:
+                return
+            for child, edge_ct in children.get(func, []):
+                if child in on_path:
+                    continue
+                walk(child, edge_ct * scale, stack, on_path | {child})
+
+        for root in roots:
+            walk(root, raw[root][3], [], {root})
+
+        return [(stack, int(seconds * 1e6)) for stack, seconds in out.items() if seconds * 1e6 >= 1.0]
+
+
+class _LevelSpanObserver(AemComObserver):
+    def __init__(self, profiler: RunProfiler) -> None:
+        super().__init__()
+        self._profiler = profiler
+        self._starts: Dict[Optional[str], float] = {}
+
+    def on_level_start(self, problem: AemComProblem) -> None:
+        self._starts[problem.criterion_id] = time.perf_counter()
+
+    def on_level_finished(self, problem: AemComProblem, run: AemComRunResult) -> None:
+        start = self._starts.pop(problem.criterion_id, None)
+        if start is None:
+            return
+        name = "aem_com:criteria" if problem.criterion_id is None else f"aem_com:{problem.criterion_id}"
+        self._profiler.add_span(
+            name,
+            start,
+            time.perf_counter(),
+            {"n": len(problem.items), "iterations": run.iterations, "termination_reason": run.termination_reason},
+        )